@@ -0,0 +1,295 @@
+"""Offline analytics for the bot's data volume.
+
+Streams pokemon_data.json, levels.json and battle_stats.json from every guild
+under the data directory without loading whole files, and prints histograms and
+percentiles for the economy.
+
+    python analytics.py [DATA_DIR] [--guild ID] [--workers N] [--csv]
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from json.decoder import scanstring
+
+DEFAULT_DATA_DIR = "/app/data"
+CHUNK_SIZE = 1 << 16
+RARITIES = ["common", "uncommon", "rare", "legendary", "unknown"]
+PERCENTILES = [50, 90, 99]
+
+# =========================
+# STREAMING JSON
+# =========================
+class JsonStream:
+    """Reads members of JSON objects one at a time, buffering at most one value."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}, got {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def key(self):
+        self.expect('"')
+        while True:
+            try:
+                key, end = scanstring(self.buf, self.pos)
+                break
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+        self.pos = end
+        self.expect(":")
+        return key
+
+    def members(self):
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.key()
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("}")
+                return
+
+    def items(self, path=()):
+        """Yields (key, value) for the object at path, e.g. ("pokedex",)."""
+        if not path:
+            for key in self.members():
+                yield key, self.value()
+            return
+        for key in self.members():
+            if key == path[0]:
+                yield from self.items(path[1:])
+            else:
+                self.value()
+
+def stream_items(path, keys=()):
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        yield from JsonStream(f).items(keys)
+
+# =========================
+# AGGREGATES
+# =========================
+class Sketch:
+    """Mergeable log-bucket histogram with ~1% relative error on percentiles."""
+    GAMMA = 1.02
+
+    def __init__(self):
+        self.buckets = Counter()  # ceil(log_GAMMA(value)) -> count, positive values only
+        self.zero_count = 0  # values <= 0, kept apart since bucket 0 holds (1/GAMMA, 1]
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        value = float(value)
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            self.buckets[math.ceil(math.log(value, self.GAMMA))] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p / 100 * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return min(0.0, self.max)
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen > rank:
+                return min(self.max, self.GAMMA ** bucket)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+class Stats:
+    def __init__(self):
+        self.guilds = 0
+        self.catches = Counter()           # rarity -> catches
+        self.shiny = Counter()             # rarity -> shiny catches
+        self.species = Counter()
+        self.catches_per_user = Sketch()
+        self.xp = Sketch()
+        self.levels = Counter()
+        self.fights_per_user = Sketch()
+        self.win_rates = Counter()         # decile -> users
+
+    def merge(self, other):
+        self.guilds += other.guilds
+        for name in ("catches", "shiny", "species", "levels", "win_rates"):
+            getattr(self, name).update(getattr(other, name))
+        for name in ("catches_per_user", "xp", "fights_per_user"):
+            getattr(self, name).merge(getattr(other, name))
+        return self
+
+def analyze_guild(path):
+    stats = Stats()
+    stats.guilds = 1
+    for _, entries in stream_items(os.path.join(path, "pokemon_data.json"), ("pokedex",)):
+        stats.catches_per_user.add(len(entries))
+        for entry in entries:
+            rarity = entry.get("rarity", "unknown")
+            stats.catches[rarity] += 1
+            stats.species[entry.get("name", "?")] += 1
+            if entry.get("shiny"):
+                stats.shiny[rarity] += 1
+    for _, data in stream_items(os.path.join(path, "levels.json"), ("levels",)):
+        stats.xp.add(data.get("xp", 0))
+        stats.levels[data.get("level", 0)] += 1
+    for _, data in stream_items(os.path.join(path, "battle_stats.json")):
+        fights = data.get("wins", 0) + data.get("losses", 0)
+        stats.fights_per_user.add(fights)
+        if fights:
+            stats.win_rates[min(9, data.get("wins", 0) * 10 // fights)] += 1
+    return stats
+
+def guild_dirs(data_dir, guild=None):
+    root = os.path.join(data_dir, "guilds")
+    if not os.path.isdir(root):
+        return []
+    names = [guild] if guild else sorted(os.listdir(root))
+    return [os.path.join(root, name) for name in names if os.path.isdir(os.path.join(root, name))]
+
+# =========================
+# REPORT
+# =========================
+def report_rows(stats, shiny_rate):
+    rows = [("data", "guilds", stats.guilds)]
+    total = sum(stats.catches.values())
+    shiny_total = sum(stats.shiny.values())
+    rows.append(("catches", "total", total))
+    for rarity in RARITIES + sorted(set(stats.catches) - set(RARITIES)):
+        if stats.catches[rarity]:
+            rows.append(("catches", rarity, stats.catches[rarity]))
+            rows.append(("catches", f"{rarity}_share", f"{stats.catches[rarity] / total:.4f}"))
+    rows.append(("shiny", "total", shiny_total))
+    rows.append(("shiny", "observed_rate", f"{shiny_total / total:.4f}" if total else "0"))
+    rows.append(("shiny", "expected_rate", f"{shiny_rate:.4f}"))
+    if total:
+        # Normal approximation to the binomial; |z| > 3 means SHINY_RATE is not what players see
+        sigma = math.sqrt(total * shiny_rate * (1 - shiny_rate)) or 1.0
+        rows.append(("shiny", "z_score", f"{(shiny_total - total * shiny_rate) / sigma:.2f}"))
+    for name, count in stats.species.most_common(10):
+        rows.append(("species_top10", name, count))
+    for label, sketch in (("catches_per_user", stats.catches_per_user), ("xp", stats.xp), ("fights_per_user", stats.fights_per_user)):
+        rows.append((label, "users", sketch.count))
+        rows.append((label, "mean", f"{sketch.mean():.1f}"))
+        for p in PERCENTILES:
+            rows.append((label, f"p{p}", f"{sketch.percentile(p):.0f}"))
+        rows.append((label, "max", f"{sketch.max:.0f}" if sketch.count else "0"))
+    for level in sorted(stats.levels):
+        rows.append(("level_histogram", level, stats.levels[level]))
+    for decile in range(10):
+        if stats.win_rates[decile]:
+            rows.append(("win_rate_histogram", f"{decile * 10}-{decile * 10 + 9}%", stats.win_rates[decile]))
+    return rows
+
+def print_table(rows):
+    section = None
+    width = max((len(str(metric)) for _, metric, _ in rows), default=0)
+    for row_section, metric, value in rows:
+        if row_section != section:
+            section = row_section
+            print(f"\n== {section} ==")
+        print(f"  {str(metric):<{width}}  {value}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Economy analytics for the bot's data volume")
+    parser.add_argument("data_dir", nargs="?", default=os.getenv("VOLUME_PATH", DEFAULT_DATA_DIR))
+    parser.add_argument("--guild", help="only analyze this guild ID")
+    parser.add_argument("--workers", type=int, default=1, help="processes to spread guilds across")
+    parser.add_argument("--shiny-rate", type=float, default=float(os.getenv("SHINY_RATE", 0.01)))
+    parser.add_argument("--csv", action="store_true", help="print section,metric,value CSV")
+    args = parser.parse_args(argv)
+
+    dirs = guild_dirs(args.data_dir, args.guild)
+    if not dirs:
+        print(f"No guild data found under {args.data_dir}", file=sys.stderr)
+        return 1
+    stats = Stats()
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for partial in pool.map(analyze_guild, dirs):
+                stats.merge(partial)
+    else:
+        for path in dirs:
+            stats.merge(analyze_guild(path))
+
+    rows = report_rows(stats, args.shiny_rate)
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["section", "metric", "value"])
+        writer.writerows(rows)
+    else:
+        print_table(rows)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
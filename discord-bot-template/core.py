@@ -0,0 +1,2759 @@
+import os
+import json
+import asyncio
+import heapq
+import itertools
+import discord
+import yarl
+import numpy as np
+import shutil  # Added import for shutil
+import hashlib
+import ctypes
+import ctypes.util
+import struct
+from discord.ext import commands
+from discord.ext.commands import CommandOnCooldown, MissingPermissions, MissingRole
+import time
+from dotenv import load_dotenv
+import logging
+import logging.handlers
+import queue
+import atexit
+import signal
+import bisect
+import mmap
+import random
+import re
+import sys
+import threading
+import types
+import gc
+import tracemalloc
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Setup logging to file and console
+# Logging is configured before .env is loaded so startup is captured; set these in the process environment.
+LOG_FILE = os.getenv("LOG_FILE", "bot_errors.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()              # "text" or "json" (one object per line)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 5 * 1024 * 1024))  # Rotate the log file at this size
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", 5))                    # Rotated files to keep
+LOG_RATE = float(os.getenv("LOG_RATE", 5))                        # Sustained INFO lines/second per call site
+LOG_BURST = int(os.getenv("LOG_BURST", 20))                       # INFO lines a call site may emit at once
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", 100))        # Once over the rate, keep 1 in N lines
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "site": f"{record.filename}:{record.lineno}",
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class CallSiteRateLimit(logging.Filter):
+    """Token bucket per call site for records below WARNING; over the rate, samples 1 in sample_every."""
+
+    def __init__(self, rate, burst, sample_every):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = max(1, sample_every)
+        self.sites = {}  # (pathname, lineno) -> [tokens, last refill, suppressed]
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        site = self.sites.get((record.pathname, record.lineno))
+        if site is None:
+            site = self.sites[(record.pathname, record.lineno)] = [float(self.burst), now, 0]
+        site[0] = min(self.burst, site[0] + (now - site[1]) * self.rate)
+        site[1] = now
+        if site[0] >= 1:
+            site[0] -= 1
+        elif (site[2] + 1) % self.sample_every:
+            site[2] += 1
+            return False
+        if site[2]:
+            record.msg = f"{record.getMessage()} [{site[2]} similar suppressed]"
+            record.args = None
+            site[2] = 0
+        return True
+
+log_formatter = JsonLogFormatter() if LOG_FORMAT == "json" else logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+log_file_handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+log_stream_handler = logging.StreamHandler()
+for log_handler in (log_file_handler, log_stream_handler):
+    log_handler.setFormatter(log_formatter)
+# Callers only enqueue; a background thread formats and does the file/console I/O
+log_queue = queue.SimpleQueue()
+log_queue_handler = logging.handlers.QueueHandler(log_queue)
+log_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # Only merges args and tracebacks into the message
+log_queue_handler.addFilter(CallSiteRateLimit(LOG_RATE, LOG_BURST, LOG_SAMPLE_EVERY))
+log_listener = logging.handlers.QueueListener(log_queue, log_file_handler, log_stream_handler, respect_handler_level=True)
+logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO), handlers=[log_queue_handler])
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Create volume directory if needed
+VOLUME_PATH = os.getenv("VOLUME_PATH", "/app/data")  # Matches your mount path
+os.makedirs(VOLUME_PATH, exist_ok=True)
+
+# One-time initialization: Add default files to volume if not initialized
+initialized_flag = os.path.join(VOLUME_PATH, "initialized.txt")
+if not os.path.exists(initialized_flag):
+    local_files = {
+        "levels.json": '{"_config": {"message_xp": 5, "catch_xp": 20, "meme_xp": 10, "joke_xp": 10, "duel_win_xp": 30, "battle_win_xp": 25, "announce_levelup": true}, "levels": {}}',
+        "notify_data.json": '{"streamers": [], "youtube_channels": {}}',
+        "permanent_channels.json": '{"streamers": [], "youtube_channels": {}}',
+        "pokemon_data.json": '{"pokedex": {}, "streaks": {}}',
+        "memes.json": '[]',
+        "jokes.json": '[]',
+        "config.json": '{"prefixes": {}}',
+        "battle_stats.json": '{}',
+        "toptrainer.json": '{"top_trainer_id": null, "shiny_trainer_id": null}',
+    }
+    for filename, content in local_files.items():
+        file_path = os.path.join(VOLUME_PATH, filename)
+        if not os.path.exists(file_path):
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            logging.info(f"Added initial {filename} to volume at {file_path}")
+    
+    # Copy any existing local files (if present in the container)
+    local_data_dir = "."  # Current directory
+    for filename in local_files.keys():
+        local_path = os.path.join(local_data_dir, filename)
+        volume_path = os.path.join(VOLUME_PATH, filename)
+        if os.path.exists(local_path) and os.path.realpath(local_data_dir) != os.path.realpath(VOLUME_PATH):
+            shutil.copy(local_path, volume_path)
+            logging.info(f"Copied {filename} from local to volume")
+    
+    # Mark initialization as complete
+    with open(initialized_flag, "w") as f:
+        f.write("Initialized")
+# Debug .env loading
+print(f"Current working directory: {os.getcwd()}")
+print(f"Attempting to load .env from: {os.path.abspath('.env')}")
+env_file = ".env"
+if not load_dotenv(env_file):
+    logging.error(f"Failed to load .env file at {os.path.abspath(env_file)}. Ensure it exists and is readable.")
+else:
+    logging.info(f"Loaded .env file from {os.path.abspath(env_file)}")
+
+logging.info(f"Running bot from: {os.path.abspath(__file__)}")
+logging.info("Bot starting up...")
+
+# =========================
+# ENV VARS
+# =========================
+DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
+NOTIFY_CHANNEL_ID = int(os.getenv("NOTIFY_CHANNEL_ID", 0))     # Fallback channel
+POKEMON_CHANNEL_ID = int(os.getenv("POKEMON_CHANNEL_ID", 0))   # Pokémon spawns
+GUILD_ID = int(os.getenv("GUILD_ID", 0))                       # Role management
+SHINY_RATE = float(os.getenv("SHINY_RATE", 0.01))              # Default 1%
+TWITCH_INTERVAL = int(os.getenv("TWITCH_INTERVAL", 2))         # Minutes
+YOUTUBE_INTERVAL = int(os.getenv("YOUTUBE_INTERVAL", 30))      # Minutes
+TWITCH_CHANNEL_ID = int(os.getenv("TWITCH_CHANNEL_ID", NOTIFY_CHANNEL_ID))  # Twitch notifications
+YOUTUBE_CHANNEL_ID = int(os.getenv("YOUTUBE_CHANNEL_ID", NOTIFY_CHANNEL_ID)) # YouTube notifications
+JOKE_CHANNEL_ID = int(os.getenv("JOKE_CHANNEL_ID", 0))         # Daily jokes (replaces MEME_CHANNEL_ID)
+SPAWN_INTERVAL = int(os.getenv("SPAWN_INTERVAL", 30))          # Minutes between spawns (per guild default)
+JOKE_TIME = os.getenv("JOKE_TIME", "08:00")                    # Daily joke time, HH:MM in BOT_TIMEZONE
+BOT_TIMEZONE = os.getenv("BOT_TIMEZONE", "UTC")                # Default timezone for daily schedules
+
+# Twitch / YouTube
+TWITCH_CLIENT_ID = os.getenv("TWITCH_CLIENT_ID")
+TWITCH_SECRET = os.getenv("TWITCH_SECRET")
+YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
+
+# Pokémon spawn and catch rates
+SPAWN_COMMON = float(os.getenv("SPAWN_COMMON", 0.60))
+SPAWN_UNCOMMON = float(os.getenv("SPAWN_UNCOMMON", 0.25))
+SPAWN_RARE = float(os.getenv("SPAWN_RARE", 0.10))
+SPAWN_LEGENDARY = float(os.getenv("SPAWN_LEGENDARY", 0.05))
+CATCH_COMMON = float(os.getenv("CATCH_COMMON", 0.80))
+CATCH_UNCOMMON = float(os.getenv("CATCH_UNCOMMON", 0.60))
+CATCH_RARE = float(os.getenv("CATCH_RARE", 0.35))
+CATCH_LEGENDARY = float(os.getenv("CATCH_LEGENDARY", 0.15))
+CATCH_SHINY = float(os.getenv("CATCH_SHINY", 0.10))
+CATCH_WINDOW = float(os.getenv("CATCH_WINDOW", 3))             # Seconds to collect catch attempts per spawn
+CATCH_COOLDOWN = int(os.getenv("CATCH_COOLDOWN", 10))          # Default seconds between catch attempts per user (setcatchcd)
+TRADE_TTL = int(os.getenv("TRADE_TTL", 60))                    # Seconds a trade offer stays open
+TRADE_BOOK_MAX = int(os.getenv("TRADE_BOOK_MAX", 10000))       # Max open trade offers across all guilds
+
+# Data export / import
+EXPORT_BATCH = int(os.getenv("EXPORT_BATCH", 500))             # Users serialized or applied per batch
+
+# Volume snapshots
+SNAPSHOT_INTERVAL = int(os.getenv("SNAPSHOT_INTERVAL", 60))    # Minutes between snapshots of the data volume
+SNAPSHOT_KEEP_HOURLY = int(os.getenv("SNAPSHOT_KEEP_HOURLY", 24))  # Newest snapshot of each of the last N hours
+SNAPSHOT_KEEP_DAILY = int(os.getenv("SNAPSHOT_KEEP_DAILY", 7))     # Newest snapshot of each of the last N days
+
+# Shutdown
+SHUTDOWN_DEADLINE = float(os.getenv("SHUTDOWN_DEADLINE", 20))  # Seconds from SIGTERM until the process exits
+SHUTDOWN_FLUSH_GRACE = float(os.getenv("SHUTDOWN_FLUSH_GRACE", 3))  # Extra seconds a late flush gets before the gateway closes
+
+# Hot reload
+WATCH_INTERVAL = int(os.getenv("WATCH_INTERVAL", 5))           # Seconds between mtime checks when inotify is unavailable
+
+# Meme link health
+MEME_CHECK_INTERVAL = int(os.getenv("MEME_CHECK_INTERVAL", 30))       # Minutes between meme link checks (0 disables them)
+MEME_CHECK_TTL = int(os.getenv("MEME_CHECK_TTL", 24))                 # Hours a link check result stays valid
+MEME_CHECK_BATCH = int(os.getenv("MEME_CHECK_BATCH", 500))            # Max links checked per pass
+MEME_CHECK_CONCURRENCY = int(os.getenv("MEME_CHECK_CONCURRENCY", 8))  # Max requests in flight at once
+MEME_CHECK_TIMEOUT = float(os.getenv("MEME_CHECK_TIMEOUT", 10))       # Seconds per link check
+
+# Event traces (loadtest/replay.py)
+TRACE_EVENTS = int(os.getenv("TRACE_EVENTS", 0))               # 1 records anonymized traffic from startup (or use `trace on`)
+TRACE_MAX_MB = int(os.getenv("TRACE_MAX_MB", 200))             # Recording stops once a trace file reaches this size
+
+# Profiling
+PROFILE_HZ = int(os.getenv("PROFILE_HZ", 100))                 # Stack samples per second while `profile` runs
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", 120))  # Longest window `profile` accepts
+MEMSTATS_INTERVAL = int(os.getenv("MEMSTATS_INTERVAL", 0))     # Minutes between memory trend log lines (0 disables, or `memstats watch`)
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", 1))   # Stack depth kept per allocation by `memstats alloc on`
+
+# Local Discord stand-in for load tests (loadtest/fake_discord.py); leave unset in production
+DISCORD_API_BASE = os.getenv("DISCORD_API_BASE", "")
+
+# Per-guild data cache
+GUILD_CACHE_TTL = int(os.getenv("GUILD_CACHE_TTL", 3600))      # Seconds idle before a guild is evicted
+GUILD_CACHE_MAX = int(os.getenv("GUILD_CACHE_MAX", 200))       # Max guilds resident in memory
+
+# Role colors
+POKEMON_MASTER_COLOR = os.getenv("POKEMON_MASTER_COLOR", "0000FF")  # Default blue
+SHINY_MASTER_COLOR = os.getenv("SHINY_MASTER_COLOR", "800080")      # Default purple
+
+# Debug environment variables
+logging.info(f"DEBUG: EXPORT_BATCH={EXPORT_BATCH}, CATCH_COOLDOWN={CATCH_COOLDOWN}")
+logging.info(f"DEBUG: WATCH_INTERVAL={WATCH_INTERVAL}, SHUTDOWN_DEADLINE={SHUTDOWN_DEADLINE}")
+logging.info(f"DEBUG: MEME_CHECK_INTERVAL={MEME_CHECK_INTERVAL}, MEME_CHECK_TTL={MEME_CHECK_TTL}, MEME_CHECK_BATCH={MEME_CHECK_BATCH}, MEME_CHECK_CONCURRENCY={MEME_CHECK_CONCURRENCY}")
+logging.info(f"DEBUG: PROFILE_HZ={PROFILE_HZ}, PROFILE_MAX_SECONDS={PROFILE_MAX_SECONDS}")
+logging.info(f"DEBUG: MEMSTATS_INTERVAL={MEMSTATS_INTERVAL}, TRACEMALLOC_FRAMES={TRACEMALLOC_FRAMES}")
+logging.info(f"DEBUG: TRACE_EVENTS={TRACE_EVENTS}, TRACE_MAX_MB={TRACE_MAX_MB}")
+logging.info(f"DEBUG: SNAPSHOT_INTERVAL={SNAPSHOT_INTERVAL}, SNAPSHOT_KEEP_HOURLY={SNAPSHOT_KEEP_HOURLY}, SNAPSHOT_KEEP_DAILY={SNAPSHOT_KEEP_DAILY}")
+logging.info(f"DEBUG: DISCORD_TOKEN={'Set' if DISCORD_TOKEN else 'Not set'}")
+logging.info(f"DEBUG: DISCORD_API_BASE={DISCORD_API_BASE or 'discord.com'}")
+logging.info(f"DEBUG: NOTIFY_CHANNEL_ID={NOTIFY_CHANNEL_ID}")
+logging.info(f"DEBUG: TWITCH_CHANNEL_ID={TWITCH_CHANNEL_ID}")
+logging.info(f"DEBUG: YOUTUBE_CHANNEL_ID={YOUTUBE_CHANNEL_ID}")
+logging.info(f"DEBUG: JOKE_CHANNEL_ID={JOKE_CHANNEL_ID}")
+logging.info(f"DEBUG: SPAWN_INTERVAL={SPAWN_INTERVAL}, JOKE_TIME={JOKE_TIME}, BOT_TIMEZONE={BOT_TIMEZONE}")
+logging.info(f"DEBUG: TWITCH_CLIENT_ID={'Set' if TWITCH_CLIENT_ID else 'Not set'}")
+logging.info(f"DEBUG: TWITCH_SECRET={'Set' if TWITCH_SECRET else 'Not set'}")
+logging.info(f"DEBUG: YOUTUBE_API_KEY={'Set' if YOUTUBE_API_KEY else 'Not set'}")
+logging.info(f"DEBUG: SPAWN_COMMON={SPAWN_COMMON}, SPAWN_UNCOMMON={SPAWN_UNCOMMON}, SPAWN_RARE={SPAWN_RARE}, SPAWN_LEGENDARY={SPAWN_LEGENDARY}")
+logging.info(f"DEBUG: CATCH_COMMON={CATCH_COMMON}, CATCH_UNCOMMON={CATCH_UNCOMMON}, CATCH_RARE={CATCH_RARE}, CATCH_LEGENDARY={CATCH_LEGENDARY}, CATCH_SHINY={CATCH_SHINY}, CATCH_WINDOW={CATCH_WINDOW}")
+logging.info(f"DEBUG: TRADE_TTL={TRADE_TTL}, TRADE_BOOK_MAX={TRADE_BOOK_MAX}")
+logging.info(f"DEBUG: GUILD_CACHE_TTL={GUILD_CACHE_TTL}, GUILD_CACHE_MAX={GUILD_CACHE_MAX}")
+logging.info(f"DEBUG: POKEMON_MASTER_COLOR={POKEMON_MASTER_COLOR}, SHINY_MASTER_COLOR={SHINY_MASTER_COLOR}")
+
+STARTUP_LOG_CHANNEL_ID = int(os.getenv("STARTUP_LOG_CHANNEL_ID", 0))
+
+if not DISCORD_TOKEN:
+    logging.error("DISCORD_TOKEN not set in .env")
+    exit(1)
+
+# =========================
+# DATA FILES
+# =========================
+NOTIFY_FILE = os.path.join(VOLUME_PATH, "notify_data.json")
+PERMANENT_CHANNELS_FILE = os.path.join(VOLUME_PATH, "permanent_channels.json")
+POKEMON_FILE = os.path.join(VOLUME_PATH, "pokemon_data.json")
+MEME_FILE = os.path.join(VOLUME_PATH, "memes.json")
+JOKE_FILE = os.path.join(VOLUME_PATH, "jokes.json")
+MEME_NDJSON = os.path.join(VOLUME_PATH, "memes.ndjson")  # One meme per line; memes.json edits are converted into it
+JOKE_NDJSON = os.path.join(VOLUME_PATH, "jokes.ndjson")
+MEME_HEALTH_FILE = os.path.join(VOLUME_PATH, "meme_health.json")  # url -> last link check result
+CONFIG_FILE = os.path.join(VOLUME_PATH, "config.json")
+BATTLE_STATS_FILE = os.path.join(VOLUME_PATH, "battle_stats.json")
+TOPTRAINER_FILE = os.path.join(VOLUME_PATH, "toptrainer.json")
+LEVELS_FILE = os.path.join(VOLUME_PATH, "levels.json")
+
+# JSON file handling without filelock
+def load_json_file(path, default):
+    start_time = time.time()
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                logging.info(f"Loaded {path} in {time.time() - start_time:.2f} seconds")
+                return data
+        logging.info(f"File {path} not found, using default: {default}")
+        return default
+    except json.JSONDecodeError as e:
+        logging.error(f"JSON decode error in {path}: {e}. Reverting to default.")
+        return default
+    except Exception as e:
+        logging.error(f"Error loading {path}: {e}")
+        return default
+
+def save_json_file(path, data):
+    start_time = time.time()
+    try:
+        # Write a temp file and rename over the old one, so a failed write never truncates the data
+        # and snapshots hard-linked to the old file keep its contents
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+        logging.info(f"Saved {path} in {time.time() - start_time:.2f} seconds")
+    except Exception as e:
+        logging.error(f"Error saving {path}: {e}")
+        raise Exception(f"Could not save {path}: {e}")
+
+config = load_json_file(CONFIG_FILE, {"prefixes": {}})
+
+# =========================
+# DISCORD BOT
+# =========================
+def get_prefix(bot, message):
+    guild_id = str(message.guild.id) if message.guild else "default"
+    return config.get("prefixes", {}).get(guild_id, "!")
+
+if DISCORD_API_BASE:
+    # REST calls and the gateway connection both go to the stand-in instead of discord.com
+    discord.http.Route.BASE = f"{DISCORD_API_BASE.rstrip('/')}/api/v10"
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(DISCORD_API_BASE.rstrip("/").replace("http", "ws", 1) + "/gateway")
+    logging.warning(f"Using Discord stand-in at {DISCORD_API_BASE}")
+
+intents = discord.Intents.default()
+intents.message_content = True
+intents.guilds = True
+intents.members = True
+bot = commands.Bot(command_prefix=get_prefix, intents=intents)
+
+# Track bot state
+bot.is_shutdown = False
+bot.pokemon_spawning = False
+
+# =========================
+# EXTENSION HOOKS
+# =========================
+# Subsystems live in extensions/ and can be reloaded with `reload <extension>`. Core code reaches them
+# only through these hooks, and their in-memory state is handed from the old module to the new one.
+EXTENSIONS = ["extensions.pokemon", "extensions.notifiers", "extensions.fun", "extensions.levels", "extensions.admin"]
+global_job_hooks = {}  # extension -> fn() scheduling its bot-wide jobs
+guild_job_hooks = {}   # extension -> fn(guild_id) scheduling its per-guild jobs
+reload_hooks = {}      # extension -> fn(guild_id or None) after config or guild data was reloaded from disk
+memory_hooks = {}      # extension -> fn() returning {label: object} of its in-memory state, sized by memstats
+extension_state = {}   # extension -> {global name: value} stashed by teardown for the next setup
+
+def setup_extension(extension, namespace, global_jobs=None, guild_jobs=None, on_reload=None, memory=None):
+    # Called from an extension's setup(): restore handed-off state, add its commands and hooks
+    namespace.update(extension_state.pop(extension, {}))
+    for obj in list(namespace.values()):
+        # Star-imported names include commands defined elsewhere; only add this module's own
+        if isinstance(obj, commands.Command) and obj.module == extension:
+            bot.add_command(obj)
+    for hooks, hook in ((global_job_hooks, global_jobs), (guild_job_hooks, guild_jobs), (reload_hooks, on_reload), (memory_hooks, memory)):
+        if hook:
+            hooks[extension] = hook
+    # Reloaded while connected: re-add jobs now so the scheduler calls the new module's code
+    if bot.is_ready():
+        if global_jobs:
+            global_jobs()
+        if guild_jobs:
+            for guild in bot.guilds:
+                guild_jobs(guild.id)
+    namespace["_extension_ready"] = True
+
+def teardown_extension(extension, namespace, state=(), job_prefixes=()):
+    # Called from an extension's teardown(); discord.py removes its commands and listeners itself.
+    # A module whose setup failed has nothing worth handing on.
+    if namespace.get("_extension_ready"):
+        extension_state[extension] = {name: namespace[name] for name in state}
+    for hooks in (global_job_hooks, guild_job_hooks, reload_hooks, memory_hooks):
+        hooks.pop(extension, None)
+    # Keep next fire times so a reloaded extension picks up its schedule where it left off
+    for prefix in job_prefixes:
+        scheduler.remove_prefix(prefix, keep_next_fire=True)
+
+def run_reload_hooks(guild_id=None):
+    for hook in list(reload_hooks.values()):
+        hook(guild_id)
+
+# Safety: clear any commands if reloaded
+for cmd in list(bot.commands):
+    bot.remove_command(cmd.name)
+logging.info("Commands reset on startup")
+
+bot.remove_command("pokemonstatus")
+bot.remove_command("commands")
+
+# =========================
+# PERSISTENCE HELPERS
+# =========================
+def load_notify_data():
+    notify_data = load_json_file(NOTIFY_FILE, {"streamers": [], "youtube_channels": {}})
+    permanent_data = load_json_file(PERMANENT_CHANNELS_FILE, {"streamers": [], "youtube_channels": {}})
+    notify_data["streamers"] = list(set(notify_data.get("streamers", []) + permanent_data.get("streamers", [])))
+    for ch_id in permanent_data.get("youtube_channels", {}):
+        if ch_id not in notify_data.get("youtube_channels", {}):
+            notify_data["youtube_channels"][ch_id] = permanent_data["youtube_channels"][ch_id]
+    save_json_file(NOTIFY_FILE, notify_data)
+    return notify_data
+
+def save_notify_data(d):
+    save_json_file(NOTIFY_FILE, d)
+    permanent_data = {
+        "streamers": d.get("streamers", []),
+        "youtube_channels": {ch_id: "" for ch_id in d.get("youtube_channels", {})}
+    }
+    save_json_file(PERMANENT_CHANNELS_FILE, permanent_data)
+
+notify_data = load_notify_data()
+streamers = notify_data.get("streamers", [])
+youtube_channels = notify_data.get("youtube_channels", {})  # {channel_id: last_video_id}
+
+# Load data from volume
+config = load_json_file(CONFIG_FILE, {"prefixes": {}})
+
+# =========================
+# CONTENT STORE
+# =========================
+# Memes and jokes live in NDJSON files that are memory-mapped; only a uint64 array of line
+# offsets stays in memory and a record is decoded when it is picked, so a corpus of millions
+# of entries costs megabytes. The index is cached next to the file, keyed by size and mtime.
+INDEX_CHUNK = 64 << 20  # Bytes scanned for newlines per step while indexing
+PICK_TRIES = 50  # Records skipped (unreadable or rejected) before a pick gives up
+
+class ShuffleBag:
+    """Walks a random permutation of range(n) in O(1) memory (Feistel network with cycle walking)."""
+    ROUNDS = 4
+
+    def __init__(self, n, generation=0):
+        self.n = n
+        self.generation = generation
+        bits = max(2, (n - 1).bit_length())
+        self.half_bits = (bits + 1) // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        self.shuffle()
+
+    def shuffle(self):
+        self.keys = [random.getrandbits(64) for _ in range(self.ROUNDS)]
+        self.pos = 0
+
+    def permute(self, x):
+        left, right = x >> self.half_bits, x & self.half_mask
+        for key in self.keys:
+            mixed = ((right ^ key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+            left, right = right, left ^ ((mixed >> 32) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def next(self):
+        # Every item is drawn once per pass; a fresh order starts when the pool is exhausted
+        if self.pos >= self.n:
+            self.shuffle()
+        x = self.permute(self.pos)
+        # The permutation covers the next power of 4 above n, so this loops fewer than 4 times on average
+        while x >= self.n:
+            x = self.permute(x)
+        self.pos += 1
+        return x
+
+class ContentStore:
+    def __init__(self, path, legacy_path=None, label="items"):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.index_path = path + ".idx"
+        self.label = label
+        self.stamp = None
+        self.data = (None, np.zeros(0, dtype=np.uint64), 0)  # (mmap, line offsets, generation)
+        self.bags = {}  # bag key (guild ID) -> ShuffleBag for the current generation
+
+    def __len__(self):
+        return len(self.data[1])
+
+    def migrate_legacy(self):
+        # memes.json / jokes.json arrays are converted once, and again whenever they are edited
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return False
+        if os.path.exists(self.path) and os.path.getmtime(self.path) >= os.path.getmtime(self.legacy_path):
+            return False
+        with open(self.legacy_path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        if not isinstance(items, list):
+            raise ValueError(f"{os.path.basename(self.legacy_path)} must be a list")
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        logging.info(f"Converted {len(items)} {self.label} from {self.legacy_path} to {self.path}")
+        return True
+
+    @staticmethod
+    def build_index(mm):
+        size = len(mm)
+        newlines = [np.flatnonzero(np.frombuffer(mm, dtype=np.uint8, count=min(INDEX_CHUNK, size - offset), offset=offset) == 10).astype(np.uint64) + np.uint64(offset)
+                    for offset in range(0, size, INDEX_CHUNK)]
+        ends = np.concatenate(newlines + [np.array([size], dtype=np.uint64)])
+        starts = np.concatenate(([np.uint64(0)], ends[:-1] + np.uint64(1)))
+        # Blank lines (and the empty tail after a final newline) are not records
+        return starts[ends > starts]
+
+    def load_index(self, key):
+        try:
+            cached = np.load(self.index_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if cached.dtype != np.uint64 or len(cached) < 2 or tuple(int(v) for v in cached[:2]) != key:
+            return None
+        return cached[2:]
+
+    def save_index(self, key, index):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.concatenate((np.array(key, dtype=np.uint64), index)))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logging.error(f"Could not cache index {self.index_path}: {e}")
+
+    def load(self):
+        """Maps the current file (converting the legacy JSON first); returns (old count, new count) or None if unchanged."""
+        self.migrate_legacy()
+        if not os.path.exists(self.path):
+            open(self.path, "a").close()
+        start_time = time.time()
+        with open(self.path, "rb") as f:
+            st = os.fstat(f.fileno())
+            stamp = (st.st_size, st.st_mtime_ns, st.st_ino)
+            if stamp == self.stamp:
+                return None
+            if st.st_size == 0:
+                mm, index = None, np.zeros(0, dtype=np.uint64)
+            else:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                index = self.load_index(stamp[:2])
+                if index is None:
+                    index = self.build_index(mm)
+                    self.save_index(stamp[:2], index)
+        old = len(self)
+        # One reference swap: a pick running concurrently sees either the old or the new corpus
+        self.data = (mm, index, self.data[2] + 1)
+        self.stamp = stamp
+        logging.info(f"Loaded {len(index)} {self.label} from {self.path} in {time.time() - start_time:.2f} seconds")
+        return old, len(index)
+
+    def get(self, i, data=None):
+        mm, index, _ = data or self.data
+        start = int(index[i])
+        end = mm.find(b"\n", start)
+        try:
+            return json.loads(mm[start:end if end != -1 else len(mm)])
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logging.error(f"Skipping unreadable record at byte {start} of {self.path}: {e}")
+            return None
+
+    def pick(self, bag_key, accept=None):
+        """Next item from bag_key's shuffled pass that accept() allows; nothing repeats until every item was drawn."""
+        data = self.data
+        n = len(data[1])
+        if n == 0:
+            return None
+        bag = self.bags.get(bag_key)
+        if bag is None or bag.generation != data[2]:
+            bag = self.bags[bag_key] = ShuffleBag(n, data[2])
+        for _ in range(min(n, PICK_TRIES)):
+            item = self.get(bag.next(), data)
+            if item is not None and (accept is None or accept(item)):
+                return item
+        return None
+
+meme_store = ContentStore(MEME_NDJSON, MEME_FILE, "memes")
+joke_store = ContentStore(JOKE_NDJSON, JOKE_FILE, "jokes")
+CONTENT_STORE_FILES = {MEME_FILE: meme_store, MEME_NDJSON: meme_store, JOKE_FILE: joke_store, JOKE_NDJSON: joke_store}
+
+def load_content_stores():
+    for store in (meme_store, joke_store):
+        try:
+            store.load()
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load {store.label} from {store.path}: {e}")
+
+load_content_stores()
+
+# =========================
+# GUILD DATA
+# =========================
+# Economy state (pokedex, streaks, levels, battle stats, top trainers) is kept per guild
+# under VOLUME_PATH/guilds/<guild_id>/ using the same file names as the legacy global files.
+GUILDS_PATH = os.path.join(VOLUME_PATH, "guilds")
+os.makedirs(GUILDS_PATH, exist_ok=True)
+
+POKEDEX_GROUPS = ["shiny", "legendary", "rare", "uncommon", "common"]
+
+class PokedexSummary:
+    """Per-species catch counts for one user, grouped like the pokedex embed (shinies get their own group)."""
+
+    def __init__(self, entries=()):
+        self.groups = {group: {} for group in POKEDEX_GROUPS}  # group -> {species: count}
+        self.totals = {group: 0 for group in POKEDEX_GROUPS}
+        for entry in entries:
+            self.add(entry)
+
+    @staticmethod
+    def group_of(entry):
+        return "shiny" if entry["shiny"] else entry["rarity"]
+
+    def add(self, entry):
+        group = self.group_of(entry)
+        counts = self.groups[group]
+        counts[entry["name"]] = counts.get(entry["name"], 0) + 1
+        self.totals[group] += 1
+
+    def remove(self, entry):
+        group = self.group_of(entry)
+        counts = self.groups[group]
+        counts[entry["name"]] -= 1
+        if counts[entry["name"]] <= 0:
+            del counts[entry["name"]]
+        self.totals[group] -= 1
+
+    def total(self):
+        return sum(self.totals.values())
+
+class OwnershipIndex:
+    """Guild-wide inverted index of who owns what, so collection queries touch only the owners they return.
+
+    Postings are keyed by (species, rarity, shiny); each key is also filed under its species, rarity,
+    shiny flag and types (from POKEMON_STATS), so a filter narrows to a handful of keys before any owner is read.
+    """
+
+    def __init__(self, pokedex=None):
+        self.postings = {}  # (species, rarity, shiny) -> {user_id: count}
+        self.facets = {}  # ("species"|"rarity"|"shiny"|"type", value) -> {key: None}
+        self.trainers = {}  # user_id -> number of Pokémon owned
+        for user_id, entries in (pokedex or {}).items():
+            for entry in entries:
+                self.add(user_id, entry)
+
+    @staticmethod
+    def key_of(entry):
+        return entry["name"], entry["rarity"], bool(entry["shiny"])
+
+    @staticmethod
+    def facets_of(key):
+        name, rarity, shiny = key
+        types = POKEMON_STATS.get(name, {}).get("types", [])
+        return [("species", name), ("rarity", rarity), ("shiny", shiny)] + [("type", t) for t in types]
+
+    @staticmethod
+    def bump(counts, user_id, n):
+        count = counts.get(user_id, 0) + n
+        if count > 0:
+            counts[user_id] = count
+        else:
+            counts.pop(user_id, None)
+
+    def add(self, user_id, entry):
+        key = self.key_of(entry)
+        owners = self.postings.get(key)
+        if owners is None:
+            owners = self.postings[key] = {}
+            for facet in self.facets_of(key):
+                self.facets.setdefault(facet, {})[key] = None
+        self.bump(owners, user_id, 1)
+        self.bump(self.trainers, user_id, 1)
+
+    def remove(self, user_id, entry):
+        key = self.key_of(entry)
+        owners = self.postings.get(key)
+        if owners is None:
+            return
+        self.bump(owners, user_id, -1)
+        self.bump(self.trainers, user_id, -1)
+        if not owners:
+            del self.postings[key]
+            for facet in self.facets_of(key):
+                keys = self.facets[facet]
+                del keys[key]
+                if not keys:
+                    del self.facets[facet]
+
+    def keys(self, species=None, rarity=None, shiny=None, type_=None):
+        """Posting keys matching every given filter, scanning the smallest facet only."""
+        wanted = [facet for facet in (("species", species), ("rarity", rarity), ("shiny", shiny), ("type", type_)) if facet[1] is not None]
+        if not wanted:
+            return list(self.postings)
+        smallest = min((self.facets.get(facet, {}) for facet in wanted), key=len)
+        return [key for key in smallest if all(key in self.facets.get(facet, {}) for facet in wanted)]
+
+    def owned(self, keys, user_id=None):
+        """(user_id, key, count) rows for the given keys, for one user or for every owner."""
+        rows = []
+        for key in keys:
+            owners = self.postings[key]
+            if user_id is None:
+                rows.extend((uid, key, count) for uid, count in owners.items())
+            elif user_id in owners:
+                rows.append((user_id, key, owners[user_id]))
+        return rows
+
+    def lacking(self, keys):
+        """Trainers who own none of the given keys."""
+        owners = set()
+        for key in keys:
+            owners.update(self.postings[key])
+        return [uid for uid in self.trainers if uid not in owners]
+
+class GuildData:
+    def __init__(self, guild_id: str):
+        self.guild_id = guild_id
+        self.path = os.path.join(GUILDS_PATH, guild_id)
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, exist_ok=True)
+            if guild_id == str(GUILD_ID):
+                self.migrate_legacy()
+        poke = load_json_file(self.file(POKEMON_FILE), {"pokedex": {}, "streaks": {}})
+        self.pokedex = poke.get("pokedex", {})
+        self.streaks = poke.get("streaks", {})
+        self.levels = load_json_file(self.file(LEVELS_FILE), {"levels": {}}).get("levels", {})
+        self.battle_stats = load_json_file(self.file(BATTLE_STATS_FILE), {})
+        self.toptrainer = load_json_file(self.file(TOPTRAINER_FILE), {"top_trainer_id": None, "shiny_trainer_id": None})
+        self.summaries = {}  # user_id -> PokedexSummary, built on first view and kept in sync by add/remove_pokemon
+        self.ownership = None  # OwnershipIndex, built on the first search and kept in sync the same way
+        self.battle_log = BattleLog(os.path.join(self.path, "battles"))
+        self.last_access = time.monotonic()
+        self.pins = 0  # long operations holding this object across awaits; pinned guilds are never evicted
+
+    def file(self, global_path):
+        return os.path.join(self.path, os.path.basename(global_path))
+
+    def migrate_legacy(self):
+        # Data from before guild partitioning belongs to the home guild (GUILD_ID)
+        for path in (POKEMON_FILE, BATTLE_STATS_FILE, TOPTRAINER_FILE):
+            if os.path.exists(path):
+                shutil.copy(path, self.file(path))
+        legacy_levels = load_json_file(LEVELS_FILE, {}).get("levels", {})
+        save_json_file(self.file(LEVELS_FILE), {"levels": legacy_levels})
+        logging.info(f"Migrated legacy data files into guild {self.guild_id}")
+
+    def summary(self, user_id) -> PokedexSummary:
+        summary = self.summaries.get(user_id)
+        if summary is None:
+            summary = self.summaries[user_id] = PokedexSummary(self.pokedex.get(user_id, []))
+        return summary
+
+    def ownership_index(self) -> OwnershipIndex:
+        if self.ownership is None:
+            self.ownership = OwnershipIndex(self.pokedex)
+        return self.ownership
+
+    def add_pokemon(self, user_id, entry):
+        self.pokedex.setdefault(user_id, []).append(entry)
+        if user_id in self.summaries:
+            self.summaries[user_id].add(entry)
+        if self.ownership is not None:
+            self.ownership.add(user_id, entry)
+
+    def remove_pokemon(self, user_id, entry):
+        self.pokedex[user_id].remove(entry)
+        if user_id in self.summaries:
+            self.summaries[user_id].remove(entry)
+        if self.ownership is not None:
+            self.ownership.remove(user_id, entry)
+
+    def replace_pokemon(self, user_id, entries):
+        # Wholesale replacement for imports; entries=None drops the user's collection
+        old = self.pokedex.pop(user_id, [])
+        if entries is not None:
+            self.pokedex[user_id] = entries
+        self.summaries.pop(user_id, None)
+        if self.ownership is not None:
+            for entry in old:
+                self.ownership.remove(user_id, entry)
+            for entry in entries or ():
+                self.ownership.add(user_id, entry)
+
+    def swap_pokemon(self, user_a, give_a, user_b, give_b):
+        # Build both new collections before touching either, so a missing Pokémon or a failed
+        # save leaves the pokedex exactly as it was. Raises ValueError if an entry is missing.
+        new_a = list(self.pokedex.get(user_a, []))
+        new_b = list(self.pokedex.get(user_b, []))
+        for entry in give_a:
+            new_a.remove(entry)
+        for entry in give_b:
+            new_b.remove(entry)
+        new_a.extend(give_b)
+        new_b.extend(give_a)
+        old_a, old_b = self.pokedex.get(user_a), self.pokedex.get(user_b)
+        self.pokedex[user_a], self.pokedex[user_b] = new_a, new_b
+        try:
+            self.save_pokemon()
+        except Exception:
+            self.pokedex[user_a], self.pokedex[user_b] = old_a, old_b
+            raise
+        for user_id, removed, added in ((user_a, give_a, give_b), (user_b, give_b, give_a)):
+            summary = self.summaries.get(user_id)
+            if summary:
+                for entry in removed:
+                    summary.remove(entry)
+                for entry in added:
+                    summary.add(entry)
+            if self.ownership is not None:
+                for entry in removed:
+                    self.ownership.remove(user_id, entry)
+                for entry in added:
+                    self.ownership.add(user_id, entry)
+
+    def save_pokemon(self):
+        save_json_file(self.file(POKEMON_FILE), {"pokedex": self.pokedex, "streaks": self.streaks})
+
+    def save_levels(self):
+        save_json_file(self.file(LEVELS_FILE), {"levels": self.levels})
+
+    def save_battle_stats(self):
+        save_json_file(self.file(BATTLE_STATS_FILE), self.battle_stats)
+
+    def save_toptrainer(self):
+        save_json_file(self.file(TOPTRAINER_FILE), self.toptrainer)
+
+    def save_all(self):
+        self.save_pokemon()
+        self.save_levels()
+        self.save_battle_stats()
+        self.save_toptrainer()
+
+class GuildStore:
+    """Loads guilds on first access and keeps at most max_guilds resident, evicting idle ones after ttl seconds."""
+
+    def __init__(self, ttl, max_guilds):
+        self.ttl = ttl
+        self.max_guilds = max_guilds
+        self._guilds = OrderedDict()  # guild_id -> GuildData, least recently used first
+
+    def get(self, guild_id) -> GuildData:
+        guild_id = str(guild_id)
+        gd = self._guilds.get(guild_id)
+        if gd is None:
+            gd = GuildData(guild_id)
+            self._guilds[guild_id] = gd
+            logging.info(f"Loaded guild {guild_id} ({len(self._guilds)} resident)")
+            for old_id, old in list(self._guilds.items()):
+                if len(self._guilds) <= self.max_guilds:
+                    break
+                if old_id != guild_id and self.evict(old_id, old):
+                    logging.info(f"Evicted guild {old_id} (LRU, max {self.max_guilds} resident)")
+        else:
+            self._guilds.move_to_end(guild_id)
+        gd.last_access = time.monotonic()
+        return gd
+
+    @contextmanager
+    def pinned(self, guild_id):
+        # For operations that keep a GuildData across awaits (import, export): another guild's load
+        # can't evict it meanwhile, so later commands see the same object instead of a fresh copy from disk
+        gd = self.get(guild_id)
+        gd.pins += 1
+        try:
+            yield gd
+        finally:
+            gd.pins -= 1
+
+    def evict(self, guild_id, gd):
+        # Saves are eager, so this mostly rewrites identical data; pinned guilds and guilds that fail to save stay resident
+        if gd.pins:
+            return False
+        try:
+            gd.save_all()
+        except Exception as e:
+            logging.error(f"Failed to save guild {guild_id} on eviction, keeping it resident: {e}")
+            return False
+        del self._guilds[guild_id]
+        return True
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.ttl
+        evicted = []
+        for guild_id, gd in list(self._guilds.items()):
+            if gd.last_access > cutoff:
+                break
+            if self.evict(guild_id, gd):
+                evicted.append(guild_id)
+        return evicted
+
+    def resident(self):
+        return list(self._guilds.values())
+
+    def peek(self, guild_id):
+        # The resident GuildData, without loading it or counting as an access
+        return self._guilds.get(str(guild_id))
+
+    def drop(self, guild_id):
+        # Forget a guild without saving, so its next access reloads from disk
+        self._guilds.pop(str(guild_id), None)
+
+    def clear(self):
+        self._guilds.clear()
+
+    def __len__(self):
+        return len(self._guilds)
+
+guild_store = GuildStore(GUILD_CACHE_TTL, GUILD_CACHE_MAX)
+
+def get_guild_data(guild) -> GuildData:
+    # DMs fall back to the home guild
+    return guild_store.get(guild.id if guild else GUILD_ID)
+
+def guild_setting(guild_id, key, default=None):
+    # Per-guild settings live in config.json as {key: {guild_id: value}}, like prefixes
+    return config.get(key, {}).get(str(guild_id), default)
+
+def set_guild_setting(guild_id, key, value):
+    config.setdefault(key, {})[str(guild_id)] = value
+    save_json_file(CONFIG_FILE, config)
+
+async def sweep_guild_cache():
+    rate_limiter.sweep()
+    evicted = guild_store.evict_idle()
+    if evicted:
+        logging.info(f"Evicted {len(evicted)} idle guilds, {len(guild_store)} resident")
+
+# =========================
+# SCHEDULER
+# =========================
+# A single heap-driven loop owns every recurring job (spawns, daily jokes, notifier sweeps,
+# cache sweeps), so per-guild schedules cost one heap entry each instead of one sleeping task.
+SCHEDULE_FILE = os.path.join(VOLUME_PATH, "schedule.json")
+SCHEDULE_PERSIST_INTERVAL = 60  # seconds between writes of next-fire times; also caps the loop's sleep
+
+def get_zone(tz_name):
+    try:
+        return ZoneInfo(tz_name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        logging.error(f"Unknown timezone {tz_name}, using UTC")
+        return timezone.utc
+
+def next_daily_time(at, tz_name, after):
+    zone = get_zone(tz_name)
+    hour, minute = (int(part) for part in at.split(":"))
+    local = datetime.fromtimestamp(after, zone)
+    target = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target.timestamp() <= after:
+        target = (local + timedelta(days=1)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return target.timestamp()
+
+class ScheduledJob:
+    def __init__(self, key, callback, interval=None, daily_at=None, tz=None):
+        self.key = key
+        self.callback = callback  # async callable with no arguments
+        self.interval = interval  # seconds, for repeating jobs
+        self.daily_at = daily_at  # "HH:MM" local time in tz, for daily jobs
+        self.tz = tz
+        self.next_fire = 0.0
+        self.seq = 0
+        self.running = False
+
+    def compute_next(self, after):
+        if self.daily_at:
+            return next_daily_time(self.daily_at, self.tz, after)
+        return after + self.interval
+
+class Scheduler:
+    def __init__(self, path):
+        self.path = path
+        self.jobs = {}  # key -> ScheduledJob
+        self._heap = []  # (next_fire, seq, key); entries whose seq no longer matches the job are stale
+        self._seq = itertools.count()
+        self._next_fires = load_json_file(path, {})  # key -> epoch seconds, survives restarts
+        self._dirty = False
+        self._last_persist = 0.0
+        self._wake = asyncio.Event()
+        self._task = None
+        self.running_tasks = set()  # callbacks in flight, drained on shutdown
+
+    def add(self, key, callback, interval=None, daily_at=None, tz=None, delay=None, reset=False):
+        job = ScheduledJob(key, callback, interval=interval, daily_at=daily_at, tz=tz)
+        now = time.time()
+        saved = None if reset else self._next_fires.get(key)
+        if saved is not None:
+            next_fire = max(saved, now)  # Missed while offline: fire once right away
+        elif delay is not None:
+            next_fire = now + delay
+        else:
+            next_fire = job.compute_next(now)
+        self.jobs[key] = job
+        self._push(job, next_fire)
+        return job
+
+    def remove(self, key, keep_next_fire=False):
+        job = self.jobs.pop(key, None)
+        if not keep_next_fire and self._next_fires.pop(key, None) is not None:
+            self._dirty = True
+        return job is not None
+
+    def remove_prefix(self, prefix, keep_next_fire=False):
+        for key in [k for k in self.jobs if k.startswith(prefix)]:
+            self.remove(key, keep_next_fire)
+
+    def _push(self, job, next_fire):
+        job.next_fire = next_fire
+        job.seq = next(self._seq)
+        heapq.heappush(self._heap, (next_fire, job.seq, job.key))
+        self._next_fires[job.key] = next_fire
+        self._dirty = True
+        self._wake.set()
+
+    def due(self, now=None):
+        now = time.time() if now is None else now
+        return sorted((job for job in self.jobs.values() if job.next_fire <= now), key=lambda job: job.next_fire)
+
+    def upcoming(self, limit=10):
+        return heapq.nsmallest(limit, self.jobs.values(), key=lambda job: job.next_fire)
+
+    def pop_due(self, now):
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, key = heapq.heappop(self._heap)
+            job = self.jobs.get(key)
+            if job is None or job.seq != seq:
+                continue
+            self._push(job, job.compute_next(now))
+            fired.append(job)
+        return fired
+
+    def _fire(self, job):
+        if job.running:
+            logging.warning(f"Scheduled job {job.key} is still running, skipping this run")
+            return
+        job.running = True
+        task = asyncio.create_task(job.callback())
+        self.running_tasks.add(task)
+        task.add_done_callback(partial(self._finished, job))
+
+    def _finished(self, job, task):
+        job.running = False
+        self.running_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logging.error(f"Scheduled job {job.key} failed: {task.exception()}")
+
+    def persist(self):
+        save_json_file(self.path, self._next_fires)
+        self._dirty = False
+        self._last_persist = time.time()
+
+    async def run(self):
+        await bot.wait_until_ready()
+        while True:
+            self._wake.clear()
+            now = time.time()
+            for job in self.pop_due(now):
+                self._fire(job)
+            if self._dirty and now - self._last_persist >= SCHEDULE_PERSIST_INTERVAL:
+                self.persist()
+            delay = SCHEDULE_PERSIST_INTERVAL
+            if self._heap:
+                delay = min(delay, max(0, self._heap[0][0] - now))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.is_running():
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._dirty:
+            self.persist()
+
+scheduler = Scheduler(SCHEDULE_FILE)
+
+# =========================
+# LOCKS
+# =========================
+# Sections that must not interleave across an await take keyed locks: a spawn announcement and the
+# previous catch window's results, or a trade's ownership check, swap and confirmation. Keys are per
+# user or per spawn, so unrelated users never wait on each other.
+class KeyedLocks:
+    def __init__(self):
+        self._locks = {}  # key -> [asyncio.Lock, holders + waiters]
+        self.stats = {}  # key kind -> {"acquired", "contended", "wait_total", "wait_max"}
+
+    def _ref(self, key):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        return entry[0]
+
+    def _unref(self, key):
+        entry = self._locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._locks[key]
+
+    @asynccontextmanager
+    async def hold(self, *keys):
+        # Always acquire in sorted order so two-party operations can't deadlock
+        keys = sorted(set(keys))
+        acquired = []
+        try:
+            for key in keys:
+                lock = self._ref(key)
+                stats = self.stats.setdefault(key[0], {"acquired": 0, "contended": 0, "wait_total": 0.0, "wait_max": 0.0})
+                if lock.locked():
+                    stats["contended"] += 1
+                    start = time.monotonic()
+                    try:
+                        await lock.acquire()
+                    except BaseException:
+                        self._unref(key)
+                        raise
+                    waited = time.monotonic() - start
+                    stats["wait_total"] += waited
+                    stats["wait_max"] = max(stats["wait_max"], waited)
+                else:
+                    await lock.acquire()
+                stats["acquired"] += 1
+                acquired.append(key)
+            yield
+        finally:
+            for key in reversed(acquired):
+                self._locks[key][0].release()
+                self._unref(key)
+
+    def live(self):
+        return len(self._locks)
+
+locks = KeyedLocks()
+
+def user_lock(guild_id, user_id):
+    return ("user", str(guild_id), str(user_id))
+
+def spawn_lock(guild_id):
+    return ("spawn", str(guild_id))
+
+# =========================
+# RATE LIMITS
+# =========================
+# Commands that cost a save (catch, meme, joke, battle, duel) are throttled per (guild, user, command)
+# before the handler runs. A bucket is one "full again at" timestamp (GCRA, the token-bucket equivalent),
+# so a bucket that has refilled carries no information and is dropped by the periodic sweep.
+DEFAULT_RATE_LIMITS = {  # command -> (uses, per seconds); per-guild overrides live in config.json
+    "catch": (1, CATCH_COOLDOWN),
+    "meme": (3, 30),
+    "joke": (3, 30),
+    "battle": (2, 60),
+    "duel": (2, 60),
+}
+
+class RateLimiter:
+    def __init__(self):
+        self.buckets = {}  # (guild_id, user_id, command) -> monotonic time the bucket is full again
+        self.limited = 0
+
+    def rule(self, guild_id, command):
+        rule = guild_setting(guild_id, "rate_limits", {}).get(command)
+        return tuple(rule) if rule is not None else DEFAULT_RATE_LIMITS.get(command)
+
+    def hit(self, guild_id, user_id, command):
+        """Takes a use; returns 0 if allowed, otherwise the seconds until one is free."""
+        rule = self.rule(guild_id, command)
+        if not rule or rule[0] <= 0 or rule[1] <= 0:
+            return 0.0
+        uses, per = rule
+        interval = per / uses
+        now = time.monotonic()
+        key = (guild_id, user_id, command)
+        full_at = max(self.buckets.get(key, now), now)
+        # Allowed while fewer than `uses` intervals are outstanding
+        wait = full_at - now - (per - interval)
+        if wait > 1e-6:
+            self.limited += 1
+            return wait
+        self.buckets[key] = full_at + interval
+        return 0.0
+
+    def sweep(self):
+        now = time.monotonic()
+        self.buckets = {key: full_at for key, full_at in self.buckets.items() if full_at > now}
+
+rate_limiter = RateLimiter()
+
+def set_rate_limit(guild_id, command, rule):
+    # rule is (uses, per seconds); (0, x) turns the limit off and None restores the default
+    limits = dict(guild_setting(guild_id, "rate_limits", {}))
+    if rule is None:
+        limits.pop(command, None)
+    else:
+        limits[command] = list(rule)
+    set_guild_setting(guild_id, "rate_limits", limits)
+
+@bot.check_once
+async def enforce_rate_limits(ctx):
+    # check_once runs once per invocation, ahead of argument parsing and the handler
+    guild_id = ctx.guild.id if ctx.guild else 0
+    retry_after = rate_limiter.hit(guild_id, ctx.author.id, ctx.command.qualified_name)
+    if retry_after:
+        uses, per = rate_limiter.rule(guild_id, ctx.command.qualified_name)
+        raise CommandOnCooldown(commands.Cooldown(uses, per), retry_after, commands.BucketType.member)
+    return True
+
+# =========================
+# FULL GEN 1 LIST (151)
+# =========================
+ALL_GEN1 = [
+    "Bulbasaur","Ivysaur","Venusaur","Charmander","Charmeleon","Charizard",
+    "Squirtle","Wartortle","Blastoise","Caterpie","Metapod","Butterfree",
+    "Weedle","Kakuna","Beedrill","Pidgey","Pidgeotto","Pidgeot",
+    "Rattata","Raticate","Spearow","Fearow","Ekans","Arbok",
+    "Pikachu","Raichu","Sandshrew","Sandslash","Nidoran-F","Nidorina","Nidoqueen",
+    "Nidoran-M","Nidorino","Nidoking","Clefairy","Clefable","Vulpix","Ninetales",
+    "Jigglypuff","Wigglytuff","Zubat","Golbat","Oddish","Gloom","Vileplume",
+    "Paras","Parasect","Venonat","Venomoth","Diglett","Dugtrio","Meowth","Persian",
+    "Psyduck","Golduck","Mankey","Primeape","Growlithe","Arcanine","Poliwag","Poliwhirl","Poliwrath",
+    "Abra","Kadabra","Alakazam","Machop","Machoke","Machamp","Bellsprout","Weepinbell","Victreebel",
+    "Tentacool","Tentacruel","Geodude","Graveler","Golem","Ponyta","Rapidash","Slowpoke","Slowbro",
+    "Magnemite","Magneton","Farfetch'd","Doduo","Dodrio","Seel","Dewgong","Grimer","Muk","Shellder","Cloyster",
+    "Gastly","Haunter","Gengar","Onix","Drowzee","Hypno","Krabby","Kingler","Voltorb","Electrode",
+    "Exeggcute","Exeggutor","Cubone","Marowak","Hitmonlee","Hitmonchan","Lickitung","Koffing","Weezing","Rhyhorn","Rhydon",
+    "Chansey","Tangela","Kangaskhan","Horsea","Seadra","Goldeen","Seaking","Staryu","Starmie","Mr. Mime","Scyther","Jynx","Electabuzz","Magmar","Pinsir","Tauros",
+    "Magikarp","Gyarados","Lapras","Ditto","Eevee","Vaporeon","Jolteon","Flareon","Porygon",
+    "Omanyte","Omastar","Kabuto","Kabutops","Aerodactyl","Snorlax","Articuno","Zapdos","Moltres","Dratini","Dragonair","Dragonite","Mewtwo","Mew"
+]
+
+# Rarity sets
+LEGENDARY = {"Articuno","Zapdos","Moltres","Mewtwo","Mew"}
+RARE = {
+    "Bulbasaur","Ivysaur","Venusaur","Charmander","Charmeleon","Charizard",
+    "Squirtle","Wartortle","Blastoise",
+    "Gengar","Alakazam","Machamp","Gyarados",
+    "Omastar","Kabutops","Aerodactyl",
+    "Lapras","Snorlax","Chansey","Ditto",
+    "Dratini","Dragonair","Dragonite","Raichu"
+}
+UNCOMMON = {
+    "Pikachu","Vulpix","Ninetales","Jigglypuff","Wigglytuff","Growlithe","Arcanine","Abra","Kadabra",
+    "Bellsprout","Weepinbell","Victreebel","Tentacruel","Golem","Rapidash","Slowbro","Magneton",
+    "Farfetch'd","Dodrio","Dewgong","Muk","Cloyster","Haunter","Hypno","Kingler","Electrode","Exeggutor",
+    "Marowak","Lickitung","Weezing","Rhydon","Tangela","Kangaskhan","Seadra","Seaking","Starmie",
+    "Mr. Mime","Scyther","Jynx","Electabuzz","Magmar","Pinsir","Tauros","Porygon","Eevee","Vaporeon","Jolteon","Flareon"
+}
+
+POKEMON_RARITIES = {
+    "legendary": sorted(list(LEGENDARY)),
+    "rare": sorted(list(RARE - LEGENDARY)),
+    "uncommon": sorted(list(UNCOMMON - RARE - LEGENDARY)),
+    "common": sorted([p for p in ALL_GEN1 if p not in (LEGENDARY | RARE | UNCOMMON)])
+}
+CATCH_RATES = {
+    "common": CATCH_COMMON,
+    "uncommon": CATCH_UNCOMMON,
+    "rare": CATCH_RARE,
+    "legendary": CATCH_LEGENDARY
+}
+SPAWN_WEIGHTS = {
+    "common": SPAWN_COMMON,
+    "uncommon": SPAWN_UNCOMMON,
+    "rare": SPAWN_RARE,
+    "legendary": SPAWN_LEGENDARY
+}
+SPECIES_RARITY = {name: rarity for rarity, names in POKEMON_RARITIES.items() for name in names}
+SPECIES_BY_LOWER = {name.lower(): name for name in ALL_GEN1}
+
+# Gen 1 Type Chart (effectiveness: attacking type -> defending type)
+TYPE_CHART = {
+    "Normal": {"Rock": 0.5, "Ghost": 0},
+    "Fire": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 2, "Bug": 2, "Rock": 0.5, "Dragon": 0.5},
+    "Water": {"Fire": 2, "Water": 0.5, "Grass": 0.5, "Ground": 2, "Rock": 2, "Dragon": 0.5},
+    "Grass": {"Fire": 0.5, "Water": 2, "Grass": 0.5, "Poison": 0.5, "Ground": 2, "Flying": 0.5, "Bug": 0.5, "Rock": 2, "Dragon": 0.5},
+    "Electric": {"Water": 2, "Grass": 0.5, "Electric": 0.5, "Ground": 0, "Flying": 2, "Dragon": 0.5},
+    "Ice": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 0.5, "Ground": 2, "Flying": 2, "Dragon": 2},
+    "Fighting": {"Normal": 2, "Ice": 2, "Poison": 0.5, "Flying": 0.5, "Psychic": 0.5, "Bug": 0.5, "Rock": 2, "Ghost": 0},
+    "Poison": {"Grass": 2, "Poison": 0.5, "Ground": 0.5, "Bug": 2, "Rock": 0.5, "Ghost": 0.5},
+    "Ground": {"Fire": 2, "Electric": 2, "Grass": 0.5, "Poison": 2, "Flying": 0, "Bug": 0.5, "Rock": 2},
+    "Flying": {"Electric": 0.5, "Grass": 2, "Fighting": 2, "Bug": 2, "Rock": 0.5},
+    "Psychic": {"Fighting": 2, "Poison": 2, "Psychic": 0.5, "Ghost": 0},  # Gen 1: Psychic immune to Ghost
+    "Bug": {"Fire": 0.5, "Grass": 2, "Fighting": 0.5, "Poison": 2, "Flying": 0.5, "Psychic": 2, "Ghost": 0.5, "Rock": 0.5},
+    "Rock": {"Fire": 2, "Ice": 2, "Fighting": 0.5, "Ground": 0.5, "Flying": 2, "Bug": 2},
+    "Ghost": {"Normal": 0, "Psychic": 0, "Ghost": 2},  # Gen 1 bug: Ghost not effective on Psychic
+    "Dragon": {"Dragon": 2},
+}
+
+# Pokémon Stats: name -> {"types": list, "bst": int}
+POKEMON_STATS = {
+    "Bulbasaur": {"types": ["Grass", "Poison"], "bst": 318},
+    "Ivysaur": {"types": ["Grass", "Poison"], "bst": 405},
+    "Venusaur": {"types": ["Grass", "Poison"], "bst": 525},
+    "Charmander": {"types": ["Fire"], "bst": 309},
+    "Charmeleon": {"types": ["Fire"], "bst": 405},
+    "Charizard": {"types": ["Fire", "Flying"], "bst": 534},
+    "Squirtle": {"types": ["Water"], "bst": 314},
+    "Wartortle": {"types": ["Water"], "bst": 405},
+    "Blastoise": {"types": ["Water"], "bst": 530},
+    "Caterpie": {"types": ["Bug"], "bst": 195},
+    "Metapod": {"types": ["Bug"], "bst": 205},
+    "Butterfree": {"types": ["Bug", "Flying"], "bst": 395},
+    "Weedle": {"types": ["Bug", "Poison"], "bst": 195},
+    "Kakuna": {"types": ["Bug", "Poison"], "bst": 205},
+    "Beedrill": {"types": ["Bug", "Poison"], "bst": 395},
+    "Pidgey": {"types": ["Normal", "Flying"], "bst": 251},
+    "Pidgeotto": {"types": ["Normal", "Flying"], "bst": 349},
+    "Pidgeot": {"types": ["Normal", "Flying"], "bst": 479},
+    "Rattata": {"types": ["Normal"], "bst": 253},
+    "Raticate": {"types": ["Normal"], "bst": 413},
+    "Spearow": {"types": ["Normal", "Flying"], "bst": 262},
+    "Fearow": {"types": ["Normal", "Flying"], "bst": 442},
+    "Ekans": {"types": ["Poison"], "bst": 288},
+    "Arbok": {"types": ["Poison"], "bst": 438},
+    "Pikachu": {"types": ["Electric"], "bst": 320},
+    "Raichu": {"types": ["Electric"], "bst": 485},
+    "Sandshrew": {"types": ["Ground"], "bst": 300},
+    "Sandslash": {"types": ["Ground"], "bst": 450},
+    "Nidoran-F": {"types": ["Poison"], "bst": 275},
+    "Nidorina": {"types": ["Poison"], "bst": 365},
+    "Nidoqueen": {"types": ["Poison", "Ground"], "bst": 505},
+    "Nidoran-M": {"types": ["Poison"], "bst": 273},
+    "Nidorino": {"types": ["Poison"], "bst": 365},
+    "Nidoking": {"types": ["Poison", "Ground"], "bst": 505},
+    "Clefairy": {"types": ["Normal"], "bst": 323},
+    "Clefable": {"types": ["Normal"], "bst": 483},
+    "Vulpix": {"types": ["Fire"], "bst": 299},
+    "Ninetales": {"types": ["Fire"], "bst": 505},
+    "Jigglypuff": {"types": ["Normal"], "bst": 270},
+    "Wigglytuff": {"types": ["Normal"], "bst": 435},
+    "Zubat": {"types": ["Poison", "Flying"], "bst": 245},
+    "Golbat": {"types": ["Poison", "Flying"], "bst": 455},
+    "Oddish": {"types": ["Grass", "Poison"], "bst": 320},
+    "Gloom": {"types": ["Grass", "Poison"], "bst": 395},
+    "Vileplume": {"types": ["Grass", "Poison"], "bst": 490},
+    "Paras": {"types": ["Bug", "Grass"], "bst": 285},
+    "Parasect": {"types": ["Bug", "Grass"], "bst": 405},
+    "Venonat": {"types": ["Bug", "Poison"], "bst": 305},
+    "Venomoth": {"types": ["Bug", "Poison"], "bst": 450},
+    "Diglett": {"types": ["Ground"], "bst": 265},
+    "Dugtrio": {"types": ["Ground"], "bst": 405},
+    "Meowth": {"types": ["Normal"], "bst": 290},
+    "Persian": {"types": ["Normal"], "bst": 440},
+    "Psyduck": {"types": ["Water"], "bst": 320},
+    "Golduck": {"types": ["Water"], "bst": 500},
+    "Mankey": {"types": ["Fighting"], "bst": 305},
+    "Primeape": {"types": ["Fighting"], "bst": 455},
+    "Growlithe": {"types": ["Fire"], "bst": 350},
+    "Arcanine": {"types": ["Fire"], "bst": 555},
+    "Poliwag": {"types": ["Water"], "bst": 300},
+    "Poliwhirl": {"types": ["Water"], "bst": 385},
+    "Poliwrath": {"types": ["Water", "Fighting"], "bst": 510},
+    "Abra": {"types": ["Psychic"], "bst": 310},
+    "Kadabra": {"types": ["Psychic"], "bst": 400},
+    "Alakazam": {"types": ["Psychic"], "bst": 500},
+    "Machop": {"types": ["Fighting"], "bst": 305},
+    "Machoke": {"types": ["Fighting"], "bst": 405},
+    "Machamp": {"types": ["Fighting"], "bst": 505},
+    "Bellsprout": {"types": ["Grass", "Poison"], "bst": 300},
+    "Weepinbell": {"types": ["Grass", "Poison"], "bst": 390},
+    "Victreebel": {"types": ["Grass", "Poison"], "bst": 490},
+    "Tentacool": {"types": ["Water", "Poison"], "bst": 335},
+    "Tentacruel": {"types": ["Water", "Poison"], "bst": 515},
+    "Geodude": {"types": ["Rock", "Ground"], "bst": 300},
+    "Graveler": {"types": ["Rock", "Ground"], "bst": 390},
+    "Golem": {"types": ["Rock", "Ground"], "bst": 495},
+    "Ponyta": {"types": ["Fire"], "bst": 410},
+    "Rapidash": {"types": ["Fire"], "bst": 500},
+    "Slowpoke": {"types": ["Water", "Psychic"], "bst": 315},
+    "Slowbro": {"types": ["Water", "Psychic"], "bst": 490},
+    "Magnemite": {"types": ["Electric"], "bst": 325},
+    "Magneton": {"types": ["Electric"], "bst": 465},
+    "Farfetch'd": {"types": ["Normal", "Flying"], "bst": 352},
+    "Doduo": {"types": ["Normal", "Flying"], "bst": 310},
+    "Dodrio": {"types": ["Normal", "Flying"], "bst": 460},
+    "Seel": {"types": ["Water"], "bst": 325},
+    "Dewgong": {"types": ["Water", "Ice"], "bst": 475},
+    "Grimer": {"types": ["Poison"], "bst": 325},
+    "Muk": {"types": ["Poison"], "bst": 500},
+    "Shellder": {"types": ["Water"], "bst": 305},
+    "Cloyster": {"types": ["Water", "Ice"], "bst": 525},
+    "Gastly": {"types": ["Ghost", "Poison"], "bst": 310},
+    "Haunter": {"types": ["Ghost", "Poison"], "bst": 405},
+    "Gengar": {"types": ["Ghost", "Poison"], "bst": 500},
+    "Onix": {"types": ["Rock", "Ground"], "bst": 385},
+    "Drowzee": {"types": ["Psychic"], "bst": 328},
+    "Hypno": {"types": ["Psychic"], "bst": 483},
+    "Krabby": {"types": ["Water"], "bst": 325},
+    "Kingler": {"types": ["Water"], "bst": 475},
+    "Voltorb": {"types": ["Electric"], "bst": 330},
+    "Electrode": {"types": ["Electric"], "bst": 480},
+    "Exeggcute": {"types": ["Grass", "Psychic"], "bst": 325},
+    "Exeggutor": {"types": ["Grass", "Psychic"], "bst": 520},
+    "Cubone": {"types": ["Ground"], "bst": 320},
+    "Marowak": {"types": ["Ground"], "bst": 425},
+    "Hitmonlee": {"types": ["Fighting"], "bst": 455},
+    "Hitmonchan": {"types": ["Fighting"], "bst": 455},
+    "Lickitung": {"types": ["Normal"], "bst": 385},
+    "Koffing": {"types": ["Poison"], "bst": 340},
+    "Weezing": {"types": ["Poison"], "bst": 490},
+    "Rhyhorn": {"types": ["Ground", "Rock"], "bst": 345},
+    "Rhydon": {"types": ["Ground", "Rock"], "bst": 485},
+    "Chansey": {"types": ["Normal"], "bst": 450},
+    "Tangela": {"types": ["Grass"], "bst": 435},
+    "Kangaskhan": {"types": ["Normal"], "bst": 490},
+    "Horsea": {"types": ["Water"], "bst": 295},
+    "Seadra": {"types": ["Water"], "bst": 440},
+    "Goldeen": {"types": ["Water"], "bst": 320},
+    "Seaking": {"types": ["Water"], "bst": 450},
+    "Staryu": {"types": ["Water"], "bst": 340},
+    "Starmie": {"types": ["Water", "Psychic"], "bst": 520},
+    "Mr. Mime": {"types": ["Psychic"], "bst": 460},
+    "Scyther": {"types": ["Bug", "Flying"], "bst": 500},
+    "Jynx": {"types": ["Ice", "Psychic"], "bst": 455},
+    "Electabuzz": {"types": ["Electric"], "bst": 490},
+    "Magmar": {"types": ["Fire"], "bst": 495},
+    "Pinsir": {"types": ["Bug"], "bst": 500},
+    "Tauros": {"types": ["Normal"], "bst": 490},
+    "Magikarp": {"types": ["Water"], "bst": 200},
+    "Gyarados": {"types": ["Water", "Flying"], "bst": 540},
+    "Lapras": {"types": ["Water", "Ice"], "bst": 535},
+    "Ditto": {"types": ["Normal"], "bst": 288},
+    "Eevee": {"types": ["Normal"], "bst": 325},
+    "Vaporeon": {"types": ["Water"], "bst": 525},
+    "Jolteon": {"types": ["Electric"], "bst": 525},
+    "Flareon": {"types": ["Fire"], "bst": 525},
+    "Porygon": {"types": ["Normal"], "bst": 395},
+    "Omanyte": {"types": ["Rock", "Water"], "bst": 355},
+    "Omastar": {"types": ["Rock", "Water"], "bst": 495},
+    "Kabuto": {"types": ["Rock", "Water"], "bst": 355},
+    "Kabutops": {"types": ["Rock", "Water"], "bst": 495},
+    "Aerodactyl": {"types": ["Rock", "Flying"], "bst": 515},
+    "Snorlax": {"types": ["Normal"], "bst": 540},
+    "Articuno": {"types": ["Ice", "Flying"], "bst": 580},
+    "Zapdos": {"types": ["Electric", "Flying"], "bst": 580},
+    "Moltres": {"types": ["Fire", "Flying"], "bst": 580},
+    "Dratini": {"types": ["Dragon"], "bst": 300},
+    "Dragonair": {"types": ["Dragon"], "bst": 420},
+    "Dragonite": {"types": ["Dragon", "Flying"], "bst": 600},
+    "Mewtwo": {"types": ["Psychic"], "bst": 680},
+    "Mew": {"types": ["Psychic"], "bst": 600},
+}
+
+def get_effectiveness(att_type, def_types):
+    eff = 1.0
+    for def_type in def_types:
+        eff *= TYPE_CHART.get(att_type, {}).get(def_type, 1.0)
+    return eff
+
+def guild_channel_id(guild_id, key, env_channel_id):
+    # Per-guild channel from config.json, else the env channel if it belongs to this guild
+    channel_id = guild_setting(guild_id, key)
+    if channel_id:
+        return int(channel_id)
+    channel = bot.get_channel(env_channel_id)
+    if channel and getattr(channel, "guild", None) and str(channel.guild.id) == str(guild_id):
+        return env_channel_id
+    return 0
+
+# =========================
+# BATTLE HISTORY
+# =========================
+# Every battle and duel is appended to a fixed-width columnar log under guilds/<id>/battles/,
+# one file per column, so stats can memory-map just the columns they need.
+BATTLE_LOG_COLUMNS = {
+    "ts": np.uint32,         # unix seconds
+    "user_a": np.uint64,     # challenger
+    "user_b": np.uint64,     # opponent
+    "species_a": np.uint8,   # index into ALL_GEN1, NO_SPECIES for duels
+    "species_b": np.uint8,
+    "shiny": np.uint8,       # bit 0: a's Pokémon shiny, bit 1: b's
+    "a_won": np.uint8,
+    "kind": np.uint8,        # BATTLE_KIND_*
+}
+BATTLE_KIND_BATTLE = 0
+BATTLE_KIND_DUEL = 1
+NO_SPECIES = 255
+SPECIES_INDEX = {name: i for i, name in enumerate(ALL_GEN1)}
+FARMING_MIN_BATTLES = int(os.getenv("FARMING_MIN_BATTLES", 20))  # Pair battles before a pair is flagged
+
+class BattleLog:
+    def __init__(self, path):
+        self.path = path
+
+    def column_path(self, column):
+        return os.path.join(self.path, f"{column}.bin")
+
+    def append(self, kind, user_a, user_b, pokemon_a, pokemon_b, a_won):
+        row = {
+            "ts": int(time.time()),
+            "user_a": int(user_a),
+            "user_b": int(user_b),
+            "species_a": SPECIES_INDEX[pokemon_a["name"]] if pokemon_a else NO_SPECIES,
+            "species_b": SPECIES_INDEX[pokemon_b["name"]] if pokemon_b else NO_SPECIES,
+            "shiny": (1 if pokemon_a and pokemon_a["shiny"] else 0) | (2 if pokemon_b and pokemon_b["shiny"] else 0),
+            "a_won": 1 if a_won else 0,
+            "kind": kind,
+        }
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            for column, dtype in BATTLE_LOG_COLUMNS.items():
+                with open(self.column_path(column), "ab") as f:
+                    f.write(np.array([row[column]], dtype=dtype).tobytes())
+        except Exception as e:
+            logging.error(f"Failed to append to battle log {self.path}: {e}")
+
+    def columns(self):
+        # A crash mid-append can leave columns of different lengths; only whole rows are read
+        sizes = []
+        for column, dtype in BATTLE_LOG_COLUMNS.items():
+            path = self.column_path(column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            sizes.append(size // np.dtype(dtype).itemsize)
+        rows = min(sizes)
+        if rows == 0:
+            return {column: np.zeros(0, dtype=dtype) for column, dtype in BATTLE_LOG_COLUMNS.items()}
+        return {
+            column: np.memmap(self.column_path(column), dtype=dtype, mode="r", shape=(rows,))
+            for column, dtype in BATTLE_LOG_COLUMNS.items()
+        }
+
+# =========================
+# ROLE MANAGEMENT
+# =========================
+async def ensure_roles(guild: discord.Guild):
+    top_role = discord.utils.get(guild.roles, name="Top Trainer")
+    shiny_role = discord.utils.get(guild.roles, name="Shiny Master")
+    if not top_role:
+        top_role = await guild.create_role(name="Top Trainer", colour=discord.Colour(int(POKEMON_MASTER_COLOR, 16)))
+    if not shiny_role:
+        shiny_role = await guild.create_role(name="Shiny Master", colour=discord.Colour(int(SHINY_MASTER_COLOR, 16)))
+    return top_role, shiny_role
+
+async def update_roles(guild: discord.Guild):
+    if bot.is_shutdown:
+        return
+    if not guild:
+        return
+    gd = get_guild_data(guild)
+    pokedex = gd.pokedex
+    if not pokedex:
+        return
+    top_role, shiny_role = await ensure_roles(guild)
+    top_trainer_id = max(pokedex.items(), key=lambda kv: len(kv[1]))[0] if pokedex else None
+    shiny_counts = {uid: sum(1 for m in mons if m["shiny"]) for uid, mons in pokedex.items()}
+    shiny_trainer_id = max(shiny_counts, key=shiny_counts.get) if shiny_counts else None
+    max_shinies = shiny_counts[shiny_trainer_id] if shiny_trainer_id else 0
+
+    # Save to the guild's toptrainer.json
+    gd.toptrainer["top_trainer_id"] = top_trainer_id
+    gd.toptrainer["shiny_trainer_id"] = shiny_trainer_id
+    gd.save_toptrainer()
+
+    for member in guild.members:
+        member_id = str(member.id)
+        if top_role in member.roles and member_id != top_trainer_id:
+            await member.remove_roles(top_role)
+        if top_trainer_id and member_id == top_trainer_id and top_role not in member.roles:
+            await member.add_roles(top_role)
+        if shiny_role in member.roles and (member_id != shiny_trainer_id or max_shinies == 0):
+            await member.remove_roles(shiny_role)
+        if shiny_trainer_id and member_id == shiny_trainer_id and shiny_role not in member.roles and max_shinies > 0:
+            await member.add_roles(shiny_role)
+
+# =========================
+# SNAPSHOTS
+# =========================
+# Point-in-time copies of the whole volume under snapshots/<UTC timestamp>/. Files unchanged since the
+# previous snapshot are hard-linked to it, changed ones are copied, and a manifest of SHA-256 sums is written last.
+SNAPSHOTS_PATH = os.path.join(VOLUME_PATH, "snapshots")
+SNAPSHOT_MANIFEST = "manifest.json"
+APPEND_ONLY_DIRS = {"battles"}  # Appended in place, so snapshots copy a size-bounded prefix instead of linking
+SNAPSHOT_SKIP_DIRS = {"snapshots", "traces"}  # Top-level volume directories never snapshotted
+RESTORE_SKIP = {"schedule.json", "initialized.txt"}
+
+def file_digest(path, size=None):
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+def copy_prefix(src, dst, size):
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        remaining = size
+        while remaining > 0:
+            chunk = fin.read(min(1 << 20, remaining))
+            if not chunk:
+                break
+            fout.write(chunk)
+            remaining -= len(chunk)
+
+class Snapshotter:
+    def __init__(self, root, keep_hourly, keep_daily):
+        self.root = root
+        self.keep_hourly = keep_hourly
+        self.keep_daily = keep_daily
+        self.lock = asyncio.Lock()
+        self.last = None  # (name, copied, linked, seconds) of the last snapshot taken
+
+    def volume_files(self):
+        for dirpath, dirnames, filenames in os.walk(VOLUME_PATH):
+            if os.path.abspath(dirpath) == os.path.abspath(VOLUME_PATH):
+                dirnames[:] = [name for name in dirnames if name not in SNAPSHOT_SKIP_DIRS]
+            for filename in filenames:
+                if not filename.endswith(".tmp"):
+                    yield os.path.relpath(os.path.join(dirpath, filename), VOLUME_PATH)
+
+    @staticmethod
+    def append_only(rel):
+        return any(part in APPEND_ONLY_DIRS for part in rel.split(os.sep)[:-1])
+
+    def freeze(self):
+        # Runs on the event loop, which does all the writing, so this is the consistent point in time.
+        # Hard links pin each JSON file's current contents (saves replace rather than rewrite them).
+        name = base = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        suffix = 0
+        while os.path.exists(os.path.join(self.root, name)):
+            suffix += 1
+            name = f"{base}-{suffix}"
+        staging = os.path.join(self.root, f".staging-{name}")
+        os.makedirs(staging, exist_ok=True)
+        frozen = {}
+        for rel in self.volume_files():
+            src = os.path.join(VOLUME_PATH, rel)
+            if self.append_only(rel):
+                frozen[rel] = os.path.getsize(src)
+                continue
+            dst = os.path.join(staging, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copyfile(src, dst)
+            frozen[rel] = None
+        return name, staging, frozen
+
+    def build(self, name, staging, frozen):
+        # Runs in a worker thread
+        start = time.time()
+        previous = self.snapshots()
+        prev_name = previous[-1] if previous else None
+        prev_manifest = self.load_manifest(prev_name) if prev_name else {}
+        partial_path = os.path.join(self.root, f".partial-{name}")
+        manifest, copied_files, linked = {}, [], 0
+        for rel, size in frozen.items():
+            src = os.path.join(VOLUME_PATH, rel) if size is not None else os.path.join(staging, rel)
+            if size is None:
+                size = os.path.getsize(src)
+            digest = file_digest(src, size)
+            manifest[rel] = {"sha256": digest, "size": size}
+            dst = os.path.join(partial_path, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if prev_manifest.get(rel) == manifest[rel]:
+                os.link(os.path.join(self.root, prev_name, rel), dst)
+                linked += 1
+            else:
+                copy_prefix(src, dst, size)
+                copied_files.append(rel)
+        bad = self.verify_files(partial_path, manifest, copied_files)
+        if bad:
+            shutil.rmtree(partial_path, ignore_errors=True)
+            raise RuntimeError(f"checksum mismatch after copy: {', '.join(bad[:5])}")
+        with open(os.path.join(partial_path, SNAPSHOT_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({"created": name, "files": manifest}, f)
+        os.rename(partial_path, os.path.join(self.root, name))
+        shutil.rmtree(staging, ignore_errors=True)
+        self.last = (name, len(copied_files), linked, time.time() - start)
+        return self.last
+
+    def snapshots(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.startswith(".") and os.path.exists(os.path.join(self.root, name, SNAPSHOT_MANIFEST))
+        )
+
+    def load_manifest(self, name):
+        with open(os.path.join(self.root, name, SNAPSHOT_MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)["files"]
+
+    @staticmethod
+    def verify_files(path, manifest, rels):
+        bad = []
+        for rel in rels:
+            file_path = os.path.join(path, rel)
+            expected = manifest[rel]
+            if not os.path.exists(file_path) or os.path.getsize(file_path) != expected["size"] or file_digest(file_path) != expected["sha256"]:
+                bad.append(rel)
+        return bad
+
+    def verify(self, name, rels=None):
+        manifest = self.load_manifest(name)
+        return self.verify_files(os.path.join(self.root, name), manifest, list(manifest) if rels is None else rels)
+
+    def prune(self):
+        # Keep the newest snapshot in each of the last keep_hourly hours and keep_daily days
+        keep, hours, days = set(), set(), set()
+        for name in reversed(self.snapshots()):
+            hour, day = name[:11], name[:8]
+            if hour not in hours and len(hours) < self.keep_hourly:
+                hours.add(hour)
+                keep.add(name)
+            if day not in days and len(days) < self.keep_daily:
+                days.add(day)
+                keep.add(name)
+        removed = [name for name in self.snapshots() if name not in keep]
+        for name in removed:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        # Leftovers from a snapshot or restore interrupted by a crash
+        for name in os.listdir(self.root):
+            if name.startswith((".staging-", ".partial-", ".restore-")):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        return removed
+
+    def stage_restore(self, name, rels):
+        # Runs in a worker thread; copies (never links) so live appends can't reach back into the snapshot
+        staging = os.path.join(self.root, f".restore-{name}")
+        for rel in rels:
+            dst = os.path.join(staging, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copyfile(os.path.join(self.root, name, rel), dst)
+        return staging
+
+snapshotter = Snapshotter(SNAPSHOTS_PATH, SNAPSHOT_KEEP_HOURLY, SNAPSHOT_KEEP_DAILY)
+
+async def take_snapshot():
+    async with snapshotter.lock:
+        try:
+            name, staging, frozen = snapshotter.freeze()
+            name, copied, linked, elapsed = await asyncio.to_thread(snapshotter.build, name, staging, frozen)
+            removed = await asyncio.to_thread(snapshotter.prune)
+            logging.info(f"Snapshot {name}: {copied} copied, {linked} linked in {elapsed:.2f}s, pruned {len(removed)}")
+            return name
+        except Exception as e:
+            logging.error(f"Snapshot failed: {e}")
+            return None
+
+def reload_global_state():
+    # Re-read root files in place so every module-level reference sees the new contents
+    config.clear()
+    config.update(load_json_file(CONFIG_FILE, {"prefixes": {}}))
+    load_content_stores()
+    fresh = load_notify_data()
+    streamers[:] = fresh.get("streamers", [])
+    youtube_channels.clear()
+    youtube_channels.update(fresh.get("youtube_channels", {}))
+    notify_data.update(fresh, streamers=streamers, youtube_channels=youtube_channels)
+    load_level_config()
+    run_reload_hooks()
+
+# =========================
+# EVENT TRACES
+# =========================
+# Opt-in recording of incoming traffic for loadtest/replay.py. A session appends one compact JSON row per
+# event to traces/<UTC timestamp>.ndjson: [ms since start, kind, guild, channel, user, data]. Guilds, channels
+# and users are numbered in order of first sight and the mapping is never written, chat keeps only its length,
+# and command arguments keep only mentions (renumbered), numbers, Pokémon names and subcommand keywords.
+TRACES_PATH = os.path.join(VOLUME_PATH, "traces")
+TRACE_KEYWORDS = {"add", "remove", "list", "reset", "replace", "all", "on", "off", "clear", "grant", "revoke", "multiply",
+                  "confirm", "accept", "decline", "cancel", "guild", "status"}
+TRACE_WORDS = {word for name in ALL_GEN1 for word in name.lower().split()}  # "Mr. Mime" arrives as two tokens
+TRACE_MENTION = re.compile(r"<(@!?|@&|#)(\d+)>")
+TRACE_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+TRACE_PENDING_MAX = 10000  # Command messages awaiting their invoke; ones that never run (unknown, rate limited) age out
+
+class TraceRecorder:
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.file = None
+        self.path = None
+        self.start = 0.0
+        self.written = 0
+        self.rows = 0
+        self.ids = {"g": {}, "c": {}, "u": {}, "r": {}}  # kind -> real id -> trace number
+        self.received = OrderedDict()  # message id -> perf_counter when the command message arrived
+
+    @property
+    def active(self):
+        return self.file is not None
+
+    def begin(self):
+        if self.file:
+            return self.path
+        os.makedirs(self.root, exist_ok=True)
+        now = datetime.now(timezone.utc)
+        self.path = os.path.join(self.root, f"{now.strftime('%Y%m%d-%H%M%S')}.ndjson")
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.start = time.monotonic()
+        self.written = self.rows = 0
+        for mapping in self.ids.values():
+            mapping.clear()
+        self.received.clear()
+        self.write([0, "trace", 1, now.isoformat(timespec="seconds")])
+        logging.info(f"Recording event trace to {self.path}")
+        return self.path
+
+    def end(self):
+        if not self.file:
+            return
+        try:
+            self.file.close()
+        except OSError as e:
+            logging.error(f"Failed to close trace {self.path}: {e}")
+        self.file = None
+        logging.info(f"Stopped event trace {self.path}: {self.rows} rows, {self.written / 1e6:.1f} MB")
+
+    def elapsed_ms(self):
+        return int((time.monotonic() - self.start) * 1000)
+
+    def number(self, kind, real_id):
+        mapping = self.ids[kind]
+        return mapping.setdefault(int(real_id), len(mapping))
+
+    def write(self, row):
+        if not self.file:
+            return
+        line = json.dumps(row, separators=(",", ":")) + "\n"
+        try:
+            self.file.write(line)
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to write trace {self.path}, stopping: {e}")
+            self.end()
+            return
+        self.written += len(line)
+        self.rows += 1
+        if self.written >= self.max_bytes:
+            logging.warning(f"Trace {self.path} reached TRACE_MAX_MB, stopping")
+            self.end()
+
+    def scrub(self, text):
+        words = text.split()
+        if not words or words[0].lower() not in bot.all_commands:
+            return "_"
+        kept = [words[0].lower()]
+        for word in words[1:]:
+            mention = TRACE_MENTION.fullmatch(word)
+            if mention:
+                sigil = mention.group(1).replace("!", "")
+                kept.append(f"<{sigil}{self.number({'@': 'u', '#': 'c', '@&': 'r'}[sigil], mention.group(2))}>")
+            elif TRACE_NUMBER.fullmatch(word) or word.lower() in TRACE_WORDS or word.lower() in TRACE_KEYWORDS or word.lower() in bot.all_commands:
+                kept.append(word)
+            else:
+                kept.append("_")
+        return " ".join(kept)
+
+    def guild(self, guild):
+        if guild.id in self.ids["g"]:
+            return self.ids["g"][guild.id]
+        number = self.number("g", guild.id)
+        spawn_channel = guild_channel_id(guild.id, "spawn_channels", POKEMON_CHANNEL_ID)
+        self.write([self.elapsed_ms(), "guild", number, self.number("c", spawn_channel) if spawn_channel else None, None,
+                    guild_setting(guild.id, "spawn_intervals", SPAWN_INTERVAL)])
+        return number
+
+    def record_message(self, message):
+        guild = self.guild(message.guild)
+        prefix = get_prefix(bot, message)
+        if message.content.startswith(prefix):
+            data = "!" + self.scrub(message.content[len(prefix):])
+            self.received[message.id] = time.perf_counter()
+            if len(self.received) > TRACE_PENDING_MAX:
+                self.received.popitem(last=False)
+        else:
+            data = len(message.content)
+        self.write([self.elapsed_ms(), "m", guild, self.number("c", message.channel.id), self.number("u", message.author.id), data])
+
+    def record_command(self, ctx, started):
+        now = time.perf_counter()
+        received = self.received.pop(ctx.message.id, None)
+        total_ms = round((now - received) * 1000, 2) if received is not None else None
+        self.write([self.elapsed_ms(), "c", self.guild(ctx.guild), self.number("c", ctx.channel.id), self.number("u", ctx.author.id),
+                    [ctx.command.qualified_name, 0 if ctx.command_failed else 1, total_ms, round((now - started) * 1000, 2)]])
+
+trace_recorder = TraceRecorder(TRACES_PATH, TRACE_MAX_MB * 1024 * 1024)
+if TRACE_EVENTS:
+    trace_recorder.begin()
+
+# =========================
+# PROFILER
+# =========================
+# `profile <seconds>` samples every thread's Python stack from its own thread with sys._current_frames(),
+# so nothing is instrumented and a sample costs one stack walk per thread. Stacks are reported collapsed
+# (thread;root;...;leaf count), the input format of flamegraph.pl and speedscope.
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+IDLE_FRAMES = {  # (file, function) of leaf frames where a thread is parked waiting for work
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("handlers.py", "dequeue"),  # the log QueueListener
+}
+DISPATCH_FRAMES = {("events.py", "Handle._run"), ("thread.py", "_WorkItem.run")}  # event loop callbacks, executor jobs
+
+def short_path(path):
+    # Bot files relative to the bot directory, libraries from their package, the stdlib by file name
+    if path.startswith(BOT_DIR + os.sep):
+        return os.path.relpath(path, BOT_DIR)
+    path = path.split(f"{os.sep}site-packages{os.sep}")[-1]
+    return os.path.basename(path) if os.path.isabs(path) else path
+
+class SamplingProfiler:
+    def __init__(self):
+        self.running = None  # (monotonic start, seconds, requested by) while a profile is being taken
+        self.labels = {}  # code object -> "qualname (path:line)"
+
+    def label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            label = self.labels[code] = f"{code.co_qualname} ({short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    @staticmethod
+    def idle(code):
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+    def sample(self, seconds, hz, loop_thread):
+        # Runs in a worker thread; holds the GIL only while copying stacks
+        me = threading.get_ident()
+        stacks = Counter()  # (thread name, (root code, ..., leaf code)) -> samples
+        names = {}
+        samples = 0
+        interval = 1.0 / hz
+        start = next_at = time.monotonic()
+        while next_at < start + seconds:
+            if samples % hz == 0:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                thread = "event loop" if ident == loop_thread else names.get(ident, f"thread {ident}")
+                stacks[(thread, tuple(reversed(codes)))] += 1
+            samples += 1
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.monotonic()))
+        return stacks, samples, time.monotonic() - start
+
+    def run(self, seconds, hz, loop_thread, top):
+        self.labels = {}  # don't pin code objects of reloaded extensions between runs
+        stacks, samples, elapsed = self.sample(seconds, hz, loop_thread)
+        threads = {}  # thread name -> [samples, busy samples]
+        own, inclusive = Counter(), Counter()
+        busy = 0
+        for (thread, codes), count in stacks.items():
+            entry = threads.setdefault(thread, [0, 0])
+            entry[0] += count
+            if not codes or self.idle(codes[-1]):
+                continue
+            entry[1] += count
+            busy += count
+            own[codes[-1]] += count
+            # Inclusive counts start below the frame that dispatched the work, or run_forever and
+            # _bootstrap would top every list
+            first = 0
+            for depth, code in enumerate(codes):
+                if (os.path.basename(code.co_filename), code.co_qualname) in DISPATCH_FRAMES:
+                    first = depth + 1
+            for code in set(codes[first:]):
+                inclusive[code] += count
+        collapsed = "\n".join(f"{';'.join([thread, *map(self.label, codes)])} {count}" for (thread, codes), count in stacks.most_common())
+        return {
+            "samples": samples,
+            "elapsed": elapsed,
+            "busy": busy,
+            "threads": threads,
+            "own": [(self.label(code), count) for code, count in own.most_common(top)],
+            "inclusive": [(self.label(code), count) for code, count in inclusive.most_common(top)],
+            "collapsed": collapsed + "\n",
+        }
+
+    async def profile(self, seconds, hz, requested_by, top=15):
+        # Callers check self.running first; the check and this assignment happen without an await between them
+        self.running = (time.monotonic(), seconds, requested_by)
+        try:
+            return await asyncio.to_thread(self.run, seconds, hz, threading.get_ident(), top)
+        finally:
+            self.running = None
+
+profiler = SamplingProfiler()
+
+# =========================
+# MEMORY STATS
+# =========================
+# `memstats` sums sys.getsizeof over everything reachable from each in-memory state structure, counting
+# objects shared between structures once and never following references out into discord.py's client,
+# modules or code. The walk runs on the event loop in steps of SIZE_WALK_STEP objects, so a big guild can't
+# stall it; entries that change between steps are sized as they are when reached. The periodic trend log
+# only takes lengths.
+SIZE_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType, types.CodeType,
+                   types.FrameType, asyncio.AbstractEventLoop, discord.Client, discord.Guild, logging.Logger, threading.Thread)
+SIZE_SKIP_ATTRS = {"_state", "guild", "_guild", "bot", "loop", "_loop"}  # back-references into the client
+SIZE_LEAF_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None), np.ndarray, mmap.mmap)
+MEMORY_TREND_SAMPLES = 48
+
+SIZE_WALK_STEP = 20000  # objects sized between yields to the event loop
+SIZE_SKIP, SIZE_LEAF, SIZE_DICT, SIZE_SEQUENCE, SIZE_OBJECT = range(5)
+size_kinds = {}  # type -> SIZE_* kind, decided once per type
+
+def size_kind(cls):
+    kind = size_kinds.get(cls)
+    if kind is None:
+        if issubclass(cls, SIZE_SKIP_TYPES):
+            kind = SIZE_SKIP
+        elif issubclass(cls, SIZE_LEAF_TYPES):
+            kind = SIZE_LEAF
+        elif issubclass(cls, dict):
+            kind = SIZE_DICT
+        elif issubclass(cls, (list, tuple, set, frozenset, deque)):
+            kind = SIZE_SEQUENCE
+        else:
+            kind = SIZE_OBJECT
+        size_kinds[cls] = kind
+    return kind
+
+def deep_sizeof(stack, seen, budget=None):
+    """Pops and sizes up to budget objects from stack, pushing what they reference; returns bytes counted.
+
+    Ids in seen are skipped and visited ids are added, so objects shared between structures count once.
+    Only objects with more than one referrer are tracked: one held just by its container (plus the local
+    and getrefcount's argument) can't be reached twice, and tracking every catch would cost more memory
+    than the structures being measured."""
+    total = 0
+    getsizeof = sys.getsizeof
+    getrefcount = sys.getrefcount
+    while stack and budget != 0:
+        obj = stack.pop()
+        shared = getrefcount(obj) > 3
+        if shared and id(obj) in seen:
+            continue
+        kind = size_kinds.get(type(obj)) or size_kind(type(obj))
+        if kind == SIZE_SKIP:
+            continue
+        if shared:
+            seen.add(id(obj))
+        total += getsizeof(obj)
+        if budget is not None:
+            budget -= 1
+        if kind == SIZE_DICT:
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif kind == SIZE_SEQUENCE:
+            stack.extend(obj)
+        elif kind == SIZE_OBJECT:
+            attrs = getattr(obj, "__dict__", None)
+            if isinstance(attrs, dict):
+                total += getsizeof(attrs)
+                stack.extend(value for name, value in attrs.items() if name not in SIZE_SKIP_ATTRS)
+            for cls in type(obj).__mro__:
+                slots = getattr(cls, "__slots__", ())
+                for name in (slots,) if isinstance(slots, str) else slots:
+                    if name not in SIZE_SKIP_ATTRS and name not in ("__dict__", "__weakref__"):
+                        stack.append(getattr(obj, name, None))
+    return total
+
+def state_structures():
+    """(label, [root objects]) for every in-memory structure memstats reports on, core first, then extensions."""
+    resident = guild_store.resident()
+    structures = [
+        ("pokedex", [gd.pokedex for gd in resident]),
+        ("pokedex summaries", [gd.summaries for gd in resident]),
+        ("ownership index", [gd.ownership for gd in resident if gd.ownership is not None]),
+        ("streaks", [gd.streaks for gd in resident]),
+        ("levels", [gd.levels for gd in resident]),
+        ("battle_stats", [gd.battle_stats for gd in resident]),
+        ("config", [config]),
+        ("notify_data", [notify_data]),
+        ("meme index", [meme_store]),
+        ("joke index", [joke_store]),
+        ("rate limit buckets", [rate_limiter.buckets]),
+        ("scheduler jobs", [scheduler.jobs]),
+        ("member cache", [bot._connection._users, *(guild._members for guild in bot.guilds)]),
+        ("message cache", [bot._connection._messages or ()]),
+    ]
+    for hook in list(memory_hooks.values()):
+        structures.extend((label, [obj]) for label, obj in hook().items())
+    return structures
+
+def process_rss():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def format_bytes(n, sign=False):
+    prefix = "+" if sign and n > 0 else ""
+    for unit in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{prefix}{n:.0f} {unit}" if unit == "B" else f"{prefix}{n:.1f} {unit}"
+        n /= 1024
+    return f"{prefix}{n:.2f} GB"
+
+class MemoryStats:
+    def __init__(self):
+        self.sizes = {}  # label -> (bytes, entries) from the previous memstats
+        self.types = Counter()  # type name -> live objects at the previous memstats
+        self.snapshot = None  # tracemalloc snapshot from the previous memstats
+        self.trend = deque(maxlen=MEMORY_TREND_SAMPLES)  # (unix time, rss, {label: entries}) from the trend log
+
+    async def measure(self):
+        seen = set()
+        sizes = {}
+        for label, roots in state_structures():
+            total, entries = sizes.get(label, (0, None))
+            for root in roots:
+                if hasattr(root, "__len__"):
+                    entries = (entries or 0) + len(root)
+                stack = [root]
+                while stack:
+                    total += deep_sizeof(stack, seen, SIZE_WALK_STEP)
+                    await asyncio.sleep(0)
+            sizes[label] = (total, entries)
+        return sizes
+
+    @staticmethod
+    def count_types():
+        # gc only tracks containers, so this counts dicts, lists and class instances but not strs or ints
+        return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+    @staticmethod
+    def take_snapshot():
+        snapshot = tracemalloc.take_snapshot()
+        return snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")))
+
+    async def report(self, top=10):
+        """Measures everything and returns the results next to the previous report's, which it then replaces."""
+        sizes = await self.measure()
+        types_now = await asyncio.to_thread(self.count_types)
+        snapshot = await asyncio.to_thread(self.take_snapshot) if tracemalloc.is_tracing() else None
+        if snapshot is not None and self.snapshot is not None:
+            allocations = snapshot.compare_to(self.snapshot, "lineno")[:top]
+        else:
+            allocations = snapshot.statistics("lineno")[:top] if snapshot is not None else None
+        result = {
+            "rss": process_rss(),
+            "sizes": [(label, size, entries, size - self.sizes[label][0] if label in self.sizes else None) for label, (size, entries) in sizes.items()],
+            "types": [(name, count, count - self.types[name] if self.types else None) for name, count in types_now.most_common(top)],
+            "objects": sum(types_now.values()),
+            "allocations": allocations,
+            "traced": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+        }
+        self.sizes, self.types, self.snapshot = sizes, types_now, snapshot
+        return result
+
+    def set_alloc_tracing(self, enabled):
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self.snapshot = None
+
+    async def log_trend(self):
+        # Cheap enough to run every few minutes: lengths and RSS only, no deep walk
+        now = time.time()
+        rss = process_rss()
+        entries = {}
+        for label, roots in state_structures():
+            entries[label] = entries.get(label, 0) + sum(len(root) for root in roots if hasattr(root, "__len__"))
+        self.trend.append((now, rss, entries))
+        first_time, first_rss, first_entries = self.trend[0]
+        hours = (now - first_time) / 3600
+        parts = [f"RSS {format_bytes(rss)}"]
+        if tracemalloc.is_tracing():
+            parts.append(f"traced {format_bytes(tracemalloc.get_traced_memory()[0])}")
+        if hours > 0:
+            span = f"{hours * 60:.0f} min" if hours < 1 else f"{hours:.1f} h"
+            parts[0] += f" ({format_bytes((rss - first_rss) / hours, sign=True)}/h over {span})"
+            growing = sorted(((count - first_entries.get(label, 0)) / hours, label) for label, count in entries.items())
+            parts.extend(f"{label} {entries[label]} ({rate:+.0f}/h)" for rate, label in reversed(growing[-5:]) if rate > 0)
+        logging.info(f"Memory trend: {', '.join(parts)}")
+
+memory_stats = MemoryStats()
+
+# =========================
+# HOT RELOAD
+# =========================
+# Root data files edited on the volume are re-read, validated and swapped in place without a restart.
+# Our own saves trigger the watcher too; those reload to identical contents and are ignored.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+RELOAD_DEBOUNCE = 0.5  # Seconds to let a burst of writes settle before reloading
+
+def validate_config(data):
+    if not isinstance(data, dict):
+        return "expected an object"
+    for key, value in data.items():
+        if not isinstance(value, dict):
+            return f"{key} must be an object keyed by server ID"
+    return None
+
+def validate_level_config(data):
+    if not isinstance(data, dict) or not isinstance(data.get("_config", {}), dict):
+        return "expected an object with a _config object"
+    for key, value in data.get("_config", {}).items():
+        if key not in LEVEL_CONFIG:
+            return f"unknown XP setting {key}"
+        if key == "level_curve" and value not in LEVEL_CURVES:
+            return f"level_curve must be one of {', '.join(LEVEL_CURVES)}"
+        if key == "level_curve_base" and (not isinstance(value, int) or value < 1):
+            return "level_curve_base must be a positive integer"
+        if type(value) is not type(LEVEL_CONFIG[key]) or (isinstance(value, int) and not isinstance(value, bool) and value < 0):
+            return f"{key} must be a {'true/false' if isinstance(LEVEL_CONFIG[key], bool) else 'non-negative integer'}"
+    return None
+
+def validate_notify(data):
+    if not isinstance(data, dict) or not isinstance(data.get("streamers", []), list) or not isinstance(data.get("youtube_channels", {}), dict):
+        return "expected streamers as a list and youtube_channels as an object"
+    return None
+
+def apply_config(data):
+    if data == config:
+        return None
+    changed = sorted(key for key in set(data) | set(config) if data.get(key) != config.get(key))
+    config.clear()
+    config.update(data)
+    run_reload_hooks()
+    for guild in bot.guilds:
+        schedule_guild_jobs(guild.id)
+    return f"changed {', '.join(changed)}"
+
+def apply_level_config(data):
+    new_config = {**LEVEL_CONFIG, **data.get("_config", {})}
+    changed = [f"{key} {LEVEL_CONFIG[key]} → {value}" for key, value in new_config.items() if LEVEL_CONFIG[key] != value]
+    if not changed:
+        return None
+    LEVEL_CONFIG.update(new_config)
+    curve = (LEVEL_CONFIG["level_curve"], LEVEL_CONFIG["level_curve_base"])
+    if curve != (level_curve.name, level_curve.base):
+        level_curve.configure(*curve)
+        track_task(recompute_all_levels(level_curve))
+    return ", ".join(changed)
+
+def apply_notify(data):
+    if sorted(data.get("streamers", [])) == sorted(streamers) and data.get("youtube_channels", {}).keys() == youtube_channels.keys():
+        return None
+    # Merge with permanent_channels.json the same way startup does
+    fresh = load_notify_data()
+    streamers[:] = fresh.get("streamers", [])
+    for ch_id in list(youtube_channels):
+        if ch_id not in fresh.get("youtube_channels", {}):
+            del youtube_channels[ch_id]
+    for ch_id, last_video in fresh.get("youtube_channels", {}).items():
+        youtube_channels.setdefault(ch_id, last_video)
+    return f"{len(streamers)} streamers, {len(youtube_channels)} YouTube channels"
+
+RELOADABLE_FILES = {
+    CONFIG_FILE: (validate_config, apply_config),
+    LEVELS_FILE: (validate_level_config, apply_level_config),
+    NOTIFY_FILE: (validate_notify, apply_notify),
+}
+
+def read_json_strict(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class FileWatcher:
+    """Watches files through inotify on their directories, or by polling mtimes where inotify is unavailable."""
+
+    def __init__(self, paths, callback):
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.callback = callback
+        self.stamps = {path: self.stamp(path) for path in self.paths}
+        self.fd = None
+        self.dirs = {}  # watch descriptor -> directory
+        self.pending = set()
+        self.flush_handle = None
+
+    @staticmethod
+    def stamp(path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            return None
+
+    def inotify_active(self):
+        return self.fd is not None
+
+    def start(self):
+        if self.fd is not None:
+            return
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            for directory in {os.path.dirname(path) for path in self.paths}:
+                wd = libc.inotify_add_watch(fd, directory.encode(), IN_CLOSE_WRITE | IN_MOVED_TO)
+                if wd < 0:
+                    os.close(fd)
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+                self.dirs[wd] = directory
+            asyncio.get_running_loop().add_reader(fd, self._on_readable)
+            self.fd = fd
+            logging.info(f"Watching {len(self.paths)} data files with inotify")
+        except (OSError, AttributeError) as e:
+            self.dirs.clear()
+            logging.info(f"inotify unavailable ({e}), polling data files every {WATCH_INTERVAL}s")
+
+    def _on_readable(self):
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(buf):
+            wd, _, _, length = INOTIFY_EVENT.unpack_from(buf, offset)
+            offset += INOTIFY_EVENT.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            path = os.path.join(self.dirs.get(wd, ""), name)
+            if path in self.paths:
+                self.pending.add(path)
+        if self.pending and self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(RELOAD_DEBOUNCE, self._flush)
+
+    def _flush(self):
+        self.flush_handle = None
+        changed, self.pending = self.pending, set()
+        for path in changed:
+            self.stamps[path] = self.stamp(path)
+        track_task(self.callback(changed))
+
+    def stop(self):
+        if self.fd is None:
+            return
+        asyncio.get_running_loop().remove_reader(self.fd)
+        os.close(self.fd)
+        self.fd = None
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+    async def poll(self):
+        changed = set()
+        for path in self.paths:
+            stamp = self.stamp(path)
+            if stamp != self.stamps[path]:
+                self.stamps[path] = stamp
+                changed.add(path)
+        if changed:
+            await self.callback(changed)
+
+async def reload_changed_files(paths):
+    report = []
+    # Meme/joke edits re-map their store; the conversion from .json rewrites the .ndjson, which is then a no-op
+    for store in {CONTENT_STORE_FILES[path] for path in paths if path in CONTENT_STORE_FILES}:
+        try:
+            change = await asyncio.to_thread(store.load)
+        except (OSError, ValueError) as e:
+            report.append(f"❌ {os.path.basename(store.path)}: {e}, keeping the loaded version")
+            continue
+        if change:
+            report.append(f"🔄 {os.path.basename(store.path)}: {change[0]} → {change[1]} {store.label}")
+    for path in sorted(set(paths) & set(RELOADABLE_FILES)):
+        validate, apply = RELOADABLE_FILES[path]
+        name = os.path.basename(path)
+        try:
+            data = await asyncio.to_thread(read_json_strict, path)
+        except FileNotFoundError:
+            continue
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            report.append(f"❌ {name}: invalid JSON ({e}), keeping the loaded version")
+            continue
+        error = validate(data)
+        if error:
+            report.append(f"❌ {name}: {error}, keeping the loaded version")
+            continue
+        # Swapped in on the loop in one step, so commands never see a partial update
+        change = apply(data)
+        if change:
+            report.append(f"🔄 {name}: {change}")
+    if not report:
+        return
+    for line in report:
+        (logging.error if line.startswith("❌") else logging.info)(f"Hot reload: {line[2:]}")
+    channel = bot.get_channel(STARTUP_LOG_CHANNEL_ID or NOTIFY_CHANNEL_ID)
+    if channel:
+        try:
+            await channel.send("\n".join(report))
+        except discord.HTTPException as e:
+            logging.error(f"Failed to report hot reload: {e}")
+
+file_watcher = FileWatcher([*RELOADABLE_FILES, *CONTENT_STORE_FILES], reload_changed_files)
+
+# =========================
+# LEVELS SYSTEM
+# =========================
+# XP config is global and stays in the root levels.json; per-user levels live in each guild's levels.json
+LEVEL_CONFIG = {
+    "message_xp": 5,
+    "catch_xp": 20,
+    "meme_xp": 10,
+    "joke_xp": 10,
+    "duel_win_xp": 30,
+    "battle_win_xp": 25,
+    "announce_levelup": True,
+    "level_curve": "quadratic",
+    "level_curve_base": 25
+}
+
+# Level curves: XP needed to reach a level. Levels are looked up with bisect in a precomputed
+# threshold table instead of being derived per message, and a curve change re-levels every
+# stored user in one vectorized pass (see recompute_all_levels).
+LEVEL_CURVES = {
+    "quadratic": lambda level, base: base * level * level,          # level = sqrt(xp / base)
+    "triangular": lambda level, base: base * level * (level + 1) // 2,  # each level costs base more than the last
+    "linear": lambda level, base: base * level,                     # every level costs base
+}
+MAX_LEVEL = 1000
+
+class LevelCurve:
+    def __init__(self, name, base):
+        self.configure(name, base)
+
+    def configure(self, name, base):
+        # Rebuilt in place so modules holding a reference see the new curve
+        thresholds = [LEVEL_CURVES[name](level, base) for level in range(MAX_LEVEL + 1)]
+        self.name, self.base = name, base
+        self.thresholds, self.table = thresholds, np.array(thresholds, dtype=np.int64)
+
+    def level_for(self, xp):
+        return bisect.bisect_right(self.thresholds, xp) - 1
+
+    def levels_for(self, xp):
+        return np.searchsorted(self.table, xp, side="right") - 1
+
+    def xp_for(self, level):
+        return self.thresholds[min(level, MAX_LEVEL)]
+
+level_curve = LevelCurve(LEVEL_CONFIG["level_curve"], LEVEL_CONFIG["level_curve_base"])
+
+def load_level_config():
+    data = load_json_file(LEVELS_FILE, {"_config": {}})
+    error = validate_level_config(data)
+    if error:
+        logging.error(f"Ignoring XP config in {LEVELS_FILE}: {error}")
+    else:
+        LEVEL_CONFIG.update(data.get("_config", {}))
+    level_curve.configure(LEVEL_CONFIG["level_curve"], LEVEL_CONFIG["level_curve_base"])
+
+def save_level_config():
+    # Read-modify-write so legacy "levels" in the root file are preserved
+    data = load_json_file(LEVELS_FILE, {})
+    data["_config"] = LEVEL_CONFIG
+    save_json_file(LEVELS_FILE, data)
+
+load_level_config()
+
+# guild_id -> product of the XP boost windows active right now. Kept current by the levels extension's
+# scheduled window boundaries, so add_xp doesn't look at config on every message.
+xp_multipliers = {}
+
+def add_xp(gd: GuildData, user_id: str, amount: int):
+    levels = gd.levels
+    user = levels.get(user_id, {"xp": 0, "level": 0})
+    amount = round(amount * xp_multipliers.get(gd.guild_id, 1))
+    user["xp"] += amount
+    new_level = level_curve.level_for(user["xp"])
+    leveled_up = new_level > user.get("level", 0)
+    user["level"] = new_level
+    levels[user_id] = user
+    gd.save_levels()
+    logging.info(f"XP added for user {user_id}: +{amount} XP, now Level {user['level']} ({user['xp']} XP)")
+    return user, leveled_up
+
+def recompute_levels(levels, curve, apply=True):
+    """Sets every user's level from their XP on curve; returns (users, raised, lowered)."""
+    users = list(levels.values())
+    if not users:
+        return 0, 0, 0
+    xp = np.fromiter((user.get("xp", 0) for user in users), dtype=np.int64, count=len(users))
+    old = np.fromiter((user.get("level", 0) for user in users), dtype=np.int64, count=len(users))
+    new = curve.levels_for(xp)
+    if apply:
+        for i in np.flatnonzero(new != old):
+            users[i]["level"] = int(new[i])
+    return len(users), int((new > old).sum()), int((new < old).sum())
+
+def bulk_xp(gd: GuildData, user_ids, action, value):
+    """Grants, revokes or multiplies XP for user_ids in one vectorized pass and one write; returns (users, raised, lowered)."""
+    levels = gd.levels
+    if action == "grant":
+        for user_id in user_ids:
+            levels.setdefault(user_id, {"xp": 0, "level": 0})
+    users = [levels[user_id] for user_id in user_ids if user_id in levels]
+    if not users:
+        return 0, 0, 0
+    xp = np.fromiter((user.get("xp", 0) for user in users), dtype=np.int64, count=len(users))
+    old = np.fromiter((user.get("level", 0) for user in users), dtype=np.int64, count=len(users))
+    if action == "grant":
+        xp += int(value)
+    elif action == "revoke":
+        xp = np.maximum(xp - int(value), 0)
+    else:
+        xp = np.rint(xp * value).astype(np.int64)
+    new = level_curve.levels_for(xp)
+    for user, user_xp, level in zip(users, xp.tolist(), new.tolist()):
+        user["xp"], user["level"] = user_xp, level
+    gd.save_levels()
+    return len(users), int((new > old).sum()), int((new < old).sum())
+
+def recompute_levels_file(path, curve, apply):
+    # Runs in a worker thread: a guild that isn't resident is re-leveled on disk rather than loaded whole
+    levels = load_json_file(path, {"levels": {}}).get("levels", {})
+    counts = recompute_levels(levels, curve, apply)
+    if apply and (counts[1] or counts[2]):
+        save_json_file(path, {"levels": levels})
+    return counts
+
+async def recompute_all_levels(curve, apply=True):
+    """Re-levels every guild's users on curve with one write per changed guild; apply=False only counts."""
+    guild_ids = set(os.listdir(GUILDS_PATH)) if os.path.isdir(GUILDS_PATH) else set()
+    guild_ids.update(gd.guild_id for gd in guild_store.resident())
+    totals = [0, 0, 0]
+    start_time = time.time()
+    for guild_id in sorted(guild_ids):
+        gd = guild_store.peek(guild_id)
+        if gd is None:
+            path = os.path.join(GUILDS_PATH, guild_id, os.path.basename(LEVELS_FILE))
+            if not os.path.exists(path):
+                continue
+            counts = await asyncio.to_thread(recompute_levels_file, path, curve, apply)
+            # A guild loaded while the thread ran may hold levels read before the rewrite, and its saves win
+            # from now on, so it gets re-leveled in memory too; the thread's pass still supplies the counts
+            gd = guild_store.peek(guild_id)
+            if gd is not None and apply and any(recompute_levels(gd.levels, curve)[1:]):
+                gd.save_levels()
+        else:
+            # No awaits within a resident guild, so add_xp can't interleave with its read-modify-write
+            counts = recompute_levels(gd.levels, curve, apply)
+            if apply and (counts[1] or counts[2]):
+                gd.save_levels()
+            await asyncio.sleep(0)
+        totals = [total + count for total, count in zip(totals, counts)]
+    logging.info(f"{'Recomputed' if apply else 'Previewed'} levels on {curve.name}/{curve.base} for {len(guild_ids)} guilds in {time.time() - start_time:.2f}s: {totals[0]} users, {totals[1]} up, {totals[2]} down")
+    return tuple(totals)
+
+# =========================
+# SHUTDOWN
+# =========================
+# SIGTERM (Railway stopping the container) and shutdownbot both stop intake, let in-flight work finish,
+# flush every resident data store and then close the gateway, all within SHUTDOWN_DEADLINE seconds (plus SHUTDOWN_FLUSH_GRACE for a late flush).
+bot.shutting_down = False
+inflight_commands = set()  # tasks currently running a command
+background_tasks = set()   # fire-and-forget work (catch windows, hot reloads) drained on shutdown
+
+def track_task(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+@bot.before_invoke
+async def track_command_start(ctx):
+    inflight_commands.add(asyncio.current_task())
+    ctx.invoked_at = time.perf_counter()
+
+@bot.after_invoke
+async def track_command_end(ctx):
+    inflight_commands.discard(asyncio.current_task())
+    if trace_recorder.active and ctx.guild:
+        trace_recorder.record_command(ctx, ctx.invoked_at)
+
+async def drain_tasks(tasks, timeout, label):
+    tasks = {task for task in tasks if not task.done() and task is not asyncio.current_task()}
+    if not tasks:
+        return
+    _, pending = await asyncio.wait(tasks, timeout=max(0.0, timeout))
+    for task in pending:
+        task.cancel()
+    if pending:
+        logging.warning(f"Shutdown: cancelled {len(pending)} {label} still running at the drain deadline")
+
+def flush_stores(pending=None):
+    # Runs in a worker thread once handlers have drained, so nothing mutates the stores meanwhile.
+    # Saves are normally eager, so this mostly rewrites identical data; it catches anything a failed save left behind.
+    # `pending` holds the labels not yet written, so a caller that stops waiting can say what was left.
+    saves = [(f"guild {gd.guild_id}", gd.save_all) for gd in guild_store.resident()]
+    saves += [
+        ("notify data", lambda: save_notify_data(notify_data)),
+        ("config", lambda: save_json_file(CONFIG_FILE, config)),
+        ("XP config", save_level_config),
+        ("schedule", scheduler.persist),
+        ("event trace", trace_recorder.end),
+    ]
+    pending = set() if pending is None else pending
+    pending.update(label for label, _ in saves)
+    failures = []
+    for label, save in saves:
+        try:
+            save()
+        except Exception as e:
+            failures.append(f"{label}: {e}")
+        pending.discard(label)
+    return failures
+
+async def prepare_shutdown(reason):
+    """Runs every shutdown phase except closing the gateway; returns the stores that failed to save."""
+    if bot.shutting_down:
+        return []
+    bot.shutting_down = True
+    start = phase_start = time.monotonic()
+    deadline = start + SHUTDOWN_DEADLINE
+    drain_deadline = start + SHUTDOWN_DEADLINE / 2  # Draining gets half the budget so the flush always has time
+
+    def phase_done(name):
+        nonlocal phase_start
+        now = time.monotonic()
+        logging.info(f"Shutdown: {name} took {(now - phase_start) * 1000:.0f} ms")
+        phase_start = now
+
+    logging.info(f"Shutdown started ({reason}), deadline {SHUTDOWN_DEADLINE:.0f}s")
+    bot.is_shutdown = True
+    bot.pokemon_spawning = False
+    scheduler.stop()
+    file_watcher.stop()
+    phase_done("stopping intake, scheduler and file watcher")
+    await drain_tasks(inflight_commands, drain_deadline - time.monotonic(), "command handlers")
+    phase_done("draining command handlers")
+    await drain_tasks(scheduler.running_tasks | background_tasks, drain_deadline - time.monotonic(), "jobs and background tasks")
+    phase_done("draining jobs and background tasks")
+    # A worker thread can't be cancelled: past the deadline it gets a short grace before the gateway closes,
+    # and whatever it still hasn't written by then is logged by name
+    pending = set()
+    flush = asyncio.ensure_future(asyncio.to_thread(flush_stores, pending))
+    done, _ = await asyncio.wait({flush}, timeout=max(0.1, deadline - time.monotonic()))
+    if not done:
+        logging.warning(f"Shutdown: flush passed the deadline with {len(pending)} stores unwritten, waiting up to {SHUTDOWN_FLUSH_GRACE:.0f}s more")
+        done, _ = await asyncio.wait({flush}, timeout=SHUTDOWN_FLUSH_GRACE)
+    if done:
+        failures = flush.result()
+    else:
+        failures = [f"{label}: still being written when the gateway closed" for label in sorted(pending.copy())]
+    for failure in failures:
+        logging.error(f"Shutdown: failed to save {failure}")
+    phase_done(f"flushing {len(guild_store)} guilds and global files")
+    return failures
+
+async def graceful_shutdown(reason):
+    if bot.shutting_down:
+        logging.info(f"Shutdown already in progress, ignoring {reason}")
+        return
+    start = time.monotonic()
+    await prepare_shutdown(reason)
+    await bot.close()
+    logging.info(f"Shutdown complete in {(time.monotonic() - start) * 1000:.0f} ms")
+
+def install_signal_handlers():
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, lambda sig=sig: track_task(graceful_shutdown(sig.name)))
+        except NotImplementedError:
+            pass  # Windows event loops have no signal handlers; Ctrl+C still stops the bot
+
+# =========================
+# ERRORS + STARTUP
+# =========================
+@bot.event
+async def on_command_error(ctx, error):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if isinstance(error, CommandOnCooldown):
+        await ctx.reply(f"⏳ Wait {error.retry_after:.1f}s before reusing this.", delete_after=5, mention_author=False)
+    elif isinstance(error, commands.CommandNotFound):
+        await ctx.reply(f"❌ That command doesn’t exist. Try `{get_prefix(bot, ctx.message)}commands`.", delete_after=5, mention_author=False)
+    elif isinstance(error, MissingPermissions):
+        await ctx.reply("❌ You need admin permissions to use this command!", delete_after=5, mention_author=False)
+    elif isinstance(error, MissingRole):
+        await ctx.reply("❌ You need the Moderator role to use this command!", delete_after=5, mention_author=False)
+    else:
+        logging.error(f"Command error: {error}")
+        raise error
+
+@bot.event
+async def on_message(message):
+    # XP and other message listeners are added by extensions with bot.listen()
+    if bot.is_shutdown or message.author.bot or not message.guild:
+        return
+    if trace_recorder.active:
+        trace_recorder.record_message(message)
+    await bot.process_commands(message)
+
+def schedule_guild_jobs(guild_id):
+    for hook in list(guild_job_hooks.values()):
+        hook(guild_id)
+
+def schedule_all_jobs():
+    for hook in list(global_job_hooks.values()):
+        hook()
+    scheduler.add("guild_sweep", sweep_guild_cache, interval=300)
+    scheduler.add("snapshot", take_snapshot, interval=SNAPSHOT_INTERVAL * 60)
+    if MEMSTATS_INTERVAL > 0:
+        scheduler.add("memstats", memory_stats.log_trend, interval=MEMSTATS_INTERVAL * 60)
+    if not file_watcher.inotify_active():
+        scheduler.add("file_watch", file_watcher.poll, interval=WATCH_INTERVAL)
+    for guild in bot.guilds:
+        schedule_guild_jobs(guild.id)
+
+@bot.event
+async def on_guild_join(guild):
+    schedule_guild_jobs(guild.id)
+    logging.info(f"Joined guild {guild.id}, scheduled its jobs")
+
+@bot.event
+async def on_guild_remove(guild):
+    for key in [k for k in scheduler.jobs if k.endswith(f":{guild.id}")]:
+        scheduler.remove(key)
+    logging.info(f"Removed from guild {guild.id}, unscheduled its jobs")
+
+@bot.event
+async def on_ready():
+    bot.is_shutdown = False
+    logging.info(f"Bot ready as {bot.user}")
+    logging.info(f"{len(bot.commands)} commands registered")
+    channel = bot.get_channel(STARTUP_LOG_CHANNEL_ID or NOTIFY_CHANNEL_ID)
+    if channel:
+        await channel.send(f"✅ Bot ready as {bot.user}\n✅ {len(bot.commands)} commands registered")
+    else:
+        logging.error(f"Startup: Notify channel ID {STARTUP_LOG_CHANNEL_ID or NOTIFY_CHANNEL_ID} not found")
+    bot.pokemon_spawning = True
+    file_watcher.start()
+    schedule_all_jobs()
+    if not scheduler.is_running():
+        scheduler.start()
+        logging.info(f"Auto-started scheduler with {len(scheduler.jobs)} jobs")
+    print(f"✅ Logged in as {bot.user} (ID: {bot.user.id})")
+
+async def load_extensions():
+    install_signal_handlers()
+    for extension in EXTENSIONS:
+        await bot.load_extension(extension)
+    logging.info(f"Loaded extensions: {', '.join(EXTENSIONS)}")
+
+bot.setup_hook = load_extensions
@@ -0,0 +1,679 @@
+import gzip
+import io
+import tempfile
+from core import *  # noqa: F401,F403 - shared config, data stores, helpers and the bot
+
+# =========================
+# ADMIN: DIAGNOSTICS
+# =========================
+@commands.command(name="lockstats")
+@commands.has_permissions(administrator=True)
+async def lockstats(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    embed = discord.Embed(title="🔒 Lock Contention", color=discord.Color.blue())
+    for kind, stats in sorted(locks.stats.items()):
+        contended = stats["contended"]
+        avg_wait = stats["wait_total"] / contended * 1000 if contended else 0.0
+        embed.add_field(
+            name=kind,
+            value=f"{stats['acquired']} acquired, {contended} contended\navg wait {avg_wait:.1f}ms, max {stats['wait_max'] * 1000:.1f}ms",
+            inline=True
+        )
+    embed.set_footer(text=f"{locks.live()} locks currently held or awaited")
+    await ctx.send(embed=embed)
+
+@commands.command(name="schedule")
+@commands.has_permissions(administrator=True)
+async def schedule_cmd(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    embed = discord.Embed(title="⏰ Scheduled Jobs", color=discord.Color.blue())
+    due = scheduler.due()
+    if due:
+        embed.add_field(name=f"Due now ({len(due)})", value="\n".join(job.key for job in due[:15]), inline=False)
+    upcoming = [f"`{job.key}` <t:{int(job.next_fire)}:R>" for job in scheduler.upcoming(15)]
+    embed.add_field(name=f"Upcoming ({len(scheduler.jobs)} total)", value="\n".join(upcoming) or "(none)", inline=False)
+    await ctx.send(embed=embed)
+
+def fit_field(lines, empty="(none)", limit=1024):
+    # Embed field values are capped at 1024 characters; rows that don't fit are dropped
+    kept = []
+    for line in lines:
+        if sum(len(existing) + 1 for existing in kept) + len(line) > limit:
+            break
+        kept.append(line)
+    return "\n".join(kept) or empty
+
+def profile_lines(rows, total):
+    return fit_field((f"`{count / total * 100:5.1f}%` {label[:80]}" for label, count in rows), "(no busy samples)")
+
+@commands.command(name="profile")
+@commands.has_permissions(administrator=True)
+async def profile_cmd(ctx, seconds: float = 10.0, top: int = 15):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if not ctx.guild or ctx.guild.id != GUILD_ID:
+        await ctx.send("❌ Profiling samples the whole process, so it can only be run from the home server.")
+        return
+    if not 1 <= seconds <= PROFILE_MAX_SECONDS:
+        await ctx.send(f"❌ Profile for 1 to {PROFILE_MAX_SECONDS} seconds.")
+        return
+    if profiler.running:
+        started, length, requested_by = profiler.running
+        await ctx.send(f"❌ A profile requested by {requested_by} is already running ({started + length - time.monotonic():.0f}s left).")
+        return
+    await ctx.send(f"🔬 Sampling every thread at {PROFILE_HZ} Hz for {seconds:g}s...")
+    result = await profiler.profile(seconds, PROFILE_HZ, ctx.author.display_name, max(1, min(top, 50)))
+    busy = result["busy"] or 1
+    embed = discord.Embed(title="🔬 Profile", color=discord.Color.blue(),
+                          description=f"{result['samples']} samples over {result['elapsed']:.1f}s, percentages are of busy samples across threads")
+    threads = sorted(result["threads"].items(), key=lambda item: -item[1][1])
+    embed.add_field(name="Threads (busy share of samples)", inline=False,
+                    value="\n".join(f"{name}: {b / n * 100:.0f}% busy" for name, (n, b) in threads[:10]))
+    embed.add_field(name="Top functions (self)", value=profile_lines(result["own"], busy), inline=False)
+    embed.add_field(name="Top functions (inclusive)", value=profile_lines(result["inclusive"], busy), inline=False)
+    data = result["collapsed"].encode("utf-8")
+    limit = ctx.guild.filesize_limit
+    if len(data) > limit:
+        # Stacks are sorted by count, so the cut drops the rarest ones
+        data = data[:data.rfind(b"\n", 0, limit - 1) + 1]
+    filename = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.collapsed.txt"
+    await ctx.send(embed=embed, file=discord.File(io.BytesIO(data), filename=filename))
+    logging.info(f"Profiled {seconds:g}s for {ctx.author.display_name}: {result['samples']} samples, {result['busy']} busy")
+
+@commands.command(name="memstats")
+@commands.has_permissions(administrator=True)
+async def memstats(ctx, action: str = None, value: str = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if not ctx.guild or ctx.guild.id != GUILD_ID:
+        await ctx.send("❌ Memory stats cover the whole process, so they can only be run from the home server.")
+        return
+    if action == "alloc" and value in ("on", "off"):
+        memory_stats.set_alloc_tracing(value == "on")
+        await ctx.send(f"🧠 Allocation tracing {'on' if value == 'on' else 'off'}." + (" Allocations from now on show up in `!memstats`." if value == "on" else ""))
+        return
+    if action == "watch" and value:
+        if value == "off":
+            scheduler.remove("memstats")
+            await ctx.send("🧠 Memory trend logging off.")
+            return
+        try:
+            minutes = float(value)
+        except ValueError:
+            minutes = 0
+        if minutes <= 0:
+            await ctx.send("❌ Use `!memstats watch <minutes>` or `!memstats watch off`.")
+            return
+        scheduler.add("memstats", memory_stats.log_trend, interval=minutes * 60, reset=True)
+        await ctx.send(f"🧠 Logging memory trends every {minutes:g} minutes.")
+        return
+    if action is not None:
+        await ctx.send("❌ Use `!memstats`, `!memstats alloc on|off` or `!memstats watch <minutes>|off`.")
+        return
+    result = await memory_stats.report()
+
+    def delta(change, fmt):
+        return f" ({fmt(change)})" if change else ""
+
+    embed = discord.Embed(title="🧠 Memory", color=discord.Color.blue(),
+                          description=f"RSS {format_bytes(result['rss'])}, {result['objects']} gc-tracked objects"
+                          + (f", {format_bytes(result['traced'])} traced" if result["traced"] is not None else "")
+                          + "\nChanges are since the previous `memstats`.")
+    rows = sorted(result["sizes"], key=lambda row: -row[1])
+    embed.add_field(name="State (deep size)", inline=False, value=fit_field(
+        f"`{format_bytes(size):>9}` {label}{f', {entries} entries' if entries is not None else ''}{delta(change, lambda c: format_bytes(c, sign=True))}"
+        for label, size, entries, change in rows))
+    embed.add_field(name="Objects by type", inline=False, value=fit_field(
+        f"`{count:>9}` {name}{delta(change, lambda c: f'{c:+d}')}" for name, count, change in result["types"]))
+    if result["allocations"] is None:
+        allocations = "Off. `!memstats alloc on` traces allocations from then on."
+    else:
+        allocations = fit_field((
+            f"`{format_bytes(stat.size):>9}` {short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}"
+            + delta(getattr(stat, "size_diff", 0), lambda c: format_bytes(c, sign=True))
+            for stat in result["allocations"]), "(nothing traced yet)")
+    embed.add_field(name="Top allocation sites (tracemalloc)", value=allocations, inline=False)
+    await ctx.send(embed=embed)
+
+@commands.command(name="trace")
+@commands.has_permissions(administrator=True)
+async def trace_cmd(ctx, action: str = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if action is None:
+        if trace_recorder.active:
+            await ctx.send(f"🎞️ Recording `{os.path.relpath(trace_recorder.path, VOLUME_PATH)}`: {trace_recorder.rows} events, "
+                           f"{trace_recorder.written / 1e6:.1f} MB in {trace_recorder.elapsed_ms() / 60000:.0f} min. Use `!trace off` to stop.")
+        else:
+            await ctx.send("🎞️ Not recording. Use `!trace on` to record anonymized traffic for `loadtest/replay.py`.")
+        return
+    if not ctx.guild or ctx.guild.id != GUILD_ID:
+        await ctx.send("❌ Traces cover every server, so recording can only be toggled from the home server.")
+        return
+    if action == "on":
+        path = trace_recorder.begin()
+        await ctx.send(f"🎞️ Recording anonymized traffic to `{os.path.relpath(path, VOLUME_PATH)}`.")
+    elif action == "off":
+        if not trace_recorder.active:
+            await ctx.send("🎞️ Not recording.")
+            return
+        trace_recorder.end()
+        await ctx.send(f"🎞️ Stopped. `{os.path.relpath(trace_recorder.path, VOLUME_PATH)}` has {trace_recorder.rows} events.")
+    else:
+        await ctx.send("❌ Use `!trace`, `!trace on` or `!trace off`.")
+
+# =========================
+# DATA EXPORT / IMPORT
+# =========================
+# Dumps are gzipped NDJSON: a header line, then one record per user with everything the guild holds for them.
+EXPORT_VERSION = 1
+PROGRESS_INTERVAL = 2  # Seconds between progress message edits
+
+def export_record(gd: GuildData, user_id):
+    record = {"user_id": user_id}
+    if user_id in gd.pokedex:
+        record["pokemon"] = gd.pokedex[user_id]
+    if user_id in gd.streaks:
+        record["streak"] = gd.streaks[user_id]
+    if user_id in gd.levels:
+        record["level"] = gd.levels[user_id]
+    if user_id in gd.battle_stats:
+        record["battle"] = gd.battle_stats[user_id]
+    return record
+
+def validate_record(record):
+    if not isinstance(record, dict):
+        return "not an object"
+    user_id = record.get("user_id")
+    if not isinstance(user_id, str) or not user_id.isdigit():
+        return "missing or invalid user_id"
+    pokemon = record.get("pokemon", [])
+    if not isinstance(pokemon, list):
+        return "pokemon is not a list"
+    for entry in pokemon:
+        if not isinstance(entry, dict) or entry.get("name") not in SPECIES_RARITY:
+            return f"unknown Pokémon {entry.get('name') if isinstance(entry, dict) else entry!r}"
+        if not isinstance(entry.get("shiny"), bool) or entry.get("rarity") != SPECIES_RARITY[entry["name"]]:
+            return f"bad shiny/rarity on {entry['name']}"
+    if not isinstance(record.get("streak", 0), int):
+        return "streak is not an integer"
+    level = record.get("level", {"xp": 0, "level": 0})
+    if not isinstance(level, dict) or not all(isinstance(level.get(k), int) and level[k] >= 0 for k in ("xp", "level")):
+        return "level needs non-negative xp and level"
+    battle = record.get("battle", {"wins": 0, "losses": 0})
+    if not isinstance(battle, dict) or not all(isinstance(battle.get(k), int) and battle[k] >= 0 for k in ("wins", "losses")):
+        return "battle needs non-negative wins and losses"
+    return None
+
+def read_import_batch(f, start_line):
+    # Runs in a worker thread; returns ([(line_no, record)], [(line_no, error)], last line_no, done)
+    records, errors = [], []
+    line_no = start_line
+    for _ in range(EXPORT_BATCH):
+        line = f.readline()
+        if not line:
+            return records, errors, line_no, True
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            errors.append((line_no, f"invalid JSON: {e.msg}"))
+            continue
+        error = validate_record(record)
+        if error:
+            errors.append((line_no, error))
+        else:
+            records.append((line_no, record))
+    return records, errors, line_no, False
+
+def apply_record(gd: GuildData, record):
+    user_id = record["user_id"]
+    gd.replace_pokemon(user_id, record.get("pokemon"))
+    for key, store in (("streak", gd.streaks), ("level", gd.levels), ("battle", gd.battle_stats)):
+        if key in record:
+            store[user_id] = record[key]
+        else:
+            store.pop(user_id, None)
+
+class ProgressMessage:
+    def __init__(self, message):
+        self.message = message
+        self.last_edit = time.monotonic()
+
+    async def update(self, content, force=False):
+        if force or time.monotonic() - self.last_edit >= PROGRESS_INTERVAL:
+            self.last_edit = time.monotonic()
+            try:
+                await self.message.edit(content=content)
+            except discord.HTTPException as e:
+                logging.error(f"Failed to update progress message: {e}")
+
+@commands.command(name="export")
+@commands.has_permissions(administrator=True)
+@commands.max_concurrency(1, commands.BucketType.guild)
+async def export_data(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    with guild_store.pinned(ctx.guild.id) as gd:
+        user_ids = sorted(set(gd.pokedex) | set(gd.streaks) | set(gd.levels) | set(gd.battle_stats))
+        progress = ProgressMessage(await ctx.send(f"📦 Exporting {len(user_ids)} users..."))
+        fd, path = tempfile.mkstemp(prefix=f"export-{gd.guild_id}-", suffix=".ndjson.gz")
+        os.close(fd)
+        try:
+            gz = await asyncio.to_thread(gzip.open, path, "wb")
+            try:
+                header = {"type": "header", "version": EXPORT_VERSION, "guild_id": gd.guild_id, "exported_at": int(time.time()), "users": len(user_ids)}
+                await asyncio.to_thread(gz.write, (json.dumps(header) + "\n").encode("utf-8"))
+                for start in range(0, len(user_ids), EXPORT_BATCH):
+                    # Serialize on the loop so the guild can't change mid-record, compress and write in a thread
+                    batch = user_ids[start:start + EXPORT_BATCH]
+                    chunk = "".join(json.dumps(export_record(gd, uid)) + "\n" for uid in batch).encode("utf-8")
+                    await asyncio.to_thread(gz.write, chunk)
+                    await progress.update(f"📦 Exporting... {start + len(batch)}/{len(user_ids)} users")
+            finally:
+                await asyncio.to_thread(gz.close)
+            size = os.path.getsize(path)
+            limit = ctx.guild.filesize_limit if ctx.guild else 8 * 1024 * 1024
+            if size > limit:
+                await progress.update(f"❌ Export is {size / 1048576:.1f} MB, over this server's {limit / 1048576:.0f} MB upload limit.", force=True)
+                logging.error(f"Export for guild {gd.guild_id} too large to upload ({size} bytes)")
+                return
+            filename = f"rainbot-{gd.guild_id}-{time.strftime('%Y%m%d-%H%M%S')}.ndjson.gz"
+            await ctx.send(f"✅ Exported {len(user_ids)} users ({size / 1024:.0f} KB).", file=discord.File(path, filename=filename))
+            await progress.update(f"📦 Export complete: {len(user_ids)} users.", force=True)
+            logging.info(f"Exported {len(user_ids)} users for guild {gd.guild_id} ({size} bytes)")
+        finally:
+            os.remove(path)
+
+@commands.command(name="import")
+@commands.has_permissions(administrator=True)
+@commands.max_concurrency(1, commands.BucketType.guild)
+async def import_data(ctx, mode: str = "merge"):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if mode not in ("merge", "replace"):
+        await ctx.send("❌ Usage: `!import [replace]` with an export file attached. `replace` wipes users not in the file.")
+        return
+    if not ctx.message.attachments:
+        await ctx.send("❌ Attach a file produced by `!export`.")
+        return
+    with guild_store.pinned(ctx.guild.id) as gd:
+        progress = ProgressMessage(await ctx.send("📥 Downloading import file..."))
+        fd, path = tempfile.mkstemp(prefix=f"import-{gd.guild_id}-", suffix=".ndjson.gz")
+        os.close(fd)
+        try:
+            await ctx.message.attachments[0].save(path)
+            try:
+                f = await asyncio.to_thread(gzip.open, path, "rt", encoding="utf-8")
+                header = json.loads(await asyncio.to_thread(f.readline))
+            except (OSError, EOFError, json.JSONDecodeError, UnicodeDecodeError) as e:
+                await progress.update(f"❌ Not a valid export file: {e}", force=True)
+                return
+            try:
+                if not isinstance(header, dict) or header.get("type") != "header" or header.get("version") != EXPORT_VERSION:
+                    await progress.update("❌ Missing or unsupported export header.", force=True)
+                    return
+                total = header.get("users", "?")
+
+                # Validate everything before touching live data, so a bad file changes nothing
+                errors, done, line_no = [], False, 1
+                while not done:
+                    _, batch_errors, line_no, done = await asyncio.to_thread(read_import_batch, f, line_no)
+                    errors.extend(batch_errors)
+                if errors:
+                    listed = "\n".join(f"line {n}: {err}" for n, err in errors[:10])
+                    await progress.update(f"❌ Import rejected, {len(errors)} invalid record(s):\n{listed}", force=True)
+                    return
+            finally:
+                await asyncio.to_thread(f.close)
+
+            f = await asyncio.to_thread(gzip.open, path, "rt", encoding="utf-8")
+            try:
+                await asyncio.to_thread(f.readline)
+                imported, seen, done, line_no = 0, set(), False, 1
+                while not done:
+                    records, _, line_no, done = await asyncio.to_thread(read_import_batch, f, line_no)
+                    for _, record in records:
+                        apply_record(gd, record)
+                        seen.add(record["user_id"])
+                    imported += len(records)
+                    await progress.update(f"📥 Importing... {imported}/{total} users")
+            finally:
+                await asyncio.to_thread(f.close)
+
+            removed = 0
+            if mode == "replace":
+                stale = sorted((set(gd.pokedex) | set(gd.streaks) | set(gd.levels) | set(gd.battle_stats)) - seen)
+                for start in range(0, len(stale), EXPORT_BATCH):
+                    batch = stale[start:start + EXPORT_BATCH]
+                    for uid in batch:
+                        apply_record(gd, {"user_id": uid})
+                removed = len(stale)
+            gd.save_all()
+            await update_roles(ctx.guild)
+            summary = f"✅ Imported {imported} users" + (f", removed {removed} not in the file" if removed else "") + "."
+            if header.get("guild_id") != gd.guild_id:
+                summary += f" (Export came from server {header.get('guild_id')}.)"
+            await progress.update(summary, force=True)
+            logging.info(f"Imported {imported} users into guild {gd.guild_id} ({mode}, removed {removed})")
+        finally:
+            os.remove(path)
+
+@commands.command(name="snapshot")
+@commands.has_permissions(administrator=True)
+async def snapshot_cmd(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    name = await take_snapshot()
+    if name is None:
+        await ctx.send("❌ Snapshot failed, check the logs.")
+        return
+    _, copied, linked, elapsed = snapshotter.last
+    await ctx.send(f"📸 Snapshot `{name}` taken: {copied} files copied, {linked} unchanged ({elapsed:.1f}s).")
+
+@commands.command(name="restore")
+@commands.has_permissions(administrator=True)
+@commands.max_concurrency(1, commands.BucketType.default)
+async def restore(ctx, name: str = None, scope: str = "guild"):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    names = snapshotter.snapshots()
+    if name is None:
+        listed = "\n".join(f"`{n}`" for n in reversed(names[-15:])) or "(none yet)"
+        await ctx.send(f"📸 **Snapshots** (newest first, {len(names)} total):\n{listed}\nUse `!restore <name>` to restore this server, or `!restore <name> all` from the home server.")
+        return
+    if name not in names:
+        await ctx.send(f"❌ No snapshot named `{name}`. Use `!restore` to list them.")
+        return
+    if scope == "all" and (not ctx.guild or ctx.guild.id != GUILD_ID):
+        await ctx.send("❌ Restoring the whole volume is only allowed from the home server.")
+        return
+    prefix = "" if scope == "all" else os.path.join("guilds", str(ctx.guild.id if ctx.guild else GUILD_ID)) + os.sep
+    manifest = await asyncio.to_thread(snapshotter.load_manifest, name)
+    rels = [rel for rel in manifest if rel.startswith(prefix) and rel not in RESTORE_SKIP]
+    if not rels:
+        await ctx.send(f"❌ Snapshot `{name}` has no data for this server.")
+        return
+
+    progress = ProgressMessage(await ctx.send(f"🔍 Verifying `{name}`..."))
+    bad = await asyncio.to_thread(snapshotter.verify, name, rels)
+    if bad:
+        await progress.update(f"❌ Snapshot `{name}` failed verification ({len(bad)} files), not restoring: {', '.join(bad[:5])}", force=True)
+        return
+    await progress.update("📸 Taking a safety snapshot of the current data...", force=True)
+    safety = await take_snapshot()
+    if safety is None:
+        await progress.update("❌ Could not take a safety snapshot, not restoring.", force=True)
+        return
+    async with snapshotter.lock:
+        staging = await asyncio.to_thread(snapshotter.stage_restore, name, rels)
+        # Swap files in on the loop so no command sees a half-restored guild
+        for rel in rels:
+            dst = os.path.join(VOLUME_PATH, rel)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            os.replace(os.path.join(staging, rel), dst)
+        restored = set(rels)
+        stale = [rel for rel in snapshotter.volume_files() if rel.startswith(prefix) and rel not in restored and rel not in RESTORE_SKIP]
+        for rel in stale:
+            os.remove(os.path.join(VOLUME_PATH, rel))
+        await asyncio.to_thread(shutil.rmtree, staging, True)
+    if scope == "all":
+        guild_store.clear()
+        reload_global_state()
+    else:
+        guild_store.drop(ctx.guild.id)
+        run_reload_hooks(ctx.guild.id)
+    await progress.update(f"✅ Restored {len(rels)} files from `{name}` ({'whole volume' if scope == 'all' else 'this server'}). Previous state saved as `{safety}`.", force=True)
+    logging.info(f"Restored snapshot {name} ({scope}, {len(rels)} files, {len(stale)} removed) by {ctx.author.display_name}")
+
+# =========================
+# MODERATOR COMMANDS
+# =========================
+@commands.command(name="shutdownbot")
+@commands.has_role("Moderator")
+async def shutdownbot(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is already shut down.")
+        return
+    # Stop spawns, notifiers and daily jokes, finish in-flight work and save every resident store
+    failures = await prepare_shutdown(f"shutdownbot by {ctx.author.display_name}")
+    if failures:
+        await ctx.send(f"⚠️ Error saving data during shutdown: {', '.join(failures[:5])}")
+    # Log out
+    await ctx.send("🛑 Bot is shutting down...")
+    logging.info(f"Bot shutdown initiated by {ctx.author.display_name}")
+    await bot.close()
+
+@commands.command(name="restartbot")
+@commands.has_role("Moderator")
+async def restartbot(ctx):
+    if not bot.is_shutdown:
+        await ctx.send("❌ Bot is already running.")
+        return
+    bot.is_shutdown = False
+    bot.shutting_down = False
+    # Drop resident guilds so their data is reloaded from disk on next access
+    try:
+        guild_store.clear()
+        reload_global_state()
+        logging.info("Pokémon data reloaded during restart")
+    except Exception as e:
+        await ctx.send("⚠️ Error reloading Pokémon data during restart!")
+        logging.error(f"Failed to reload Pokémon data during restart: {e}")
+    # Restart scheduled jobs
+    bot.pokemon_spawning = True
+    file_watcher.start()
+    schedule_all_jobs()
+    scheduler.start()
+    logging.info("Scheduler restarted via restartbot")
+    # Restore roles from toptrainer.json
+    guild = ctx.guild or bot.get_guild(GUILD_ID)
+    toptrainer_data = get_guild_data(guild).toptrainer if guild else {}
+    if guild and (toptrainer_data.get("top_trainer_id") or toptrainer_data.get("shiny_trainer_id")):
+        await update_roles(guild)
+        logging.info("Restored top trainer roles from toptrainer.json")
+    await ctx.send(f"✅ Bot restarted by {ctx.author.mention}.")
+    logging.info(f"Bot restarted by {ctx.author.display_name}")
+
+# =========================
+# DM COMMAND MENUS
+# =========================
+@commands.command(name="commands")
+@commands.cooldown(1, 20, commands.BucketType.user)
+async def commands_list(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    embed = discord.Embed(title="📖 Commands", color=discord.Color.blue())
+    embed.add_field(
+        name="🎮 Pokémon Game",
+        value="`catch <name>`, `pokedex [@user]`, `dexsearch <filters>`, `top`, `battletop`, `trade @user <pokemon>[, ...] [for <pokemon>[, ...]]`, `accept [@user]`, `decline [@user]`, `canceltrade`, `battle @user`, `battlestats [@user]`",
+        inline=False
+    )
+    embed.add_field(
+        name="🤣 Fun Extras",
+        value="`meme`, `joke`",
+        inline=False
+    )
+    embed.add_field(
+        name="⭐ Levels System",
+        value="`level [@user]`, `leaderboard`, `duel @user`",
+        inline=False
+    )
+    embed.add_field(
+        name="🔔 Notifications",
+        value="Auto Twitch & YouTube alerts in set channels. Use `listfollows` to view followed channels.",
+        inline=False
+    )
+    embed.add_field(
+        name="⚙️ Admin/Moderator Commands",
+        value="Use `admincommands` for admin-only commands or `modcommands` for moderator commands.",
+        inline=False
+    )
+    embed.set_footer(text="Type admincommands or modcommands for full command lists if you have access.")
+    try:
+        await ctx.author.send(embed=embed)
+        await ctx.reply("📬 Sent you a DM with the commands!", mention_author=False)
+    except discord.Forbidden:
+        await ctx.reply(embed=embed, mention_author=False)
+
+@commands.command(name="admincommands")
+@commands.cooldown(1, 20, commands.BucketType.user)
+async def admin_commands(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    embed = discord.Embed(title="⚙️ Admin Commands", color=discord.Color.red())
+    embed.add_field(
+        name="🐾 Pokémon Control",
+        value="`startpokemon`, `stoppokemon`, `setspawnchannel #channel`, `setspawninterval <minutes>`, `setspawnweight <pokemon> [weight]`, `setshinyrate <rate> [pokemon]`, `spawnpool add|remove|reset`, `spawnevent add|remove|list`, `spawntest [samples]`, `setcatchwindow <seconds>`, `setcatchcd <seconds>`, `forceroles`",
+        inline=False
+    )
+    embed.add_field(
+        name="🔔 Notifications Management",
+        value="`addstreamer <twitch_name>`, `addyoutube <channel_id>`, `removestreamer <twitch_name>`, `removeyoutube <channel_id>`, `settwitchchannel #channel`, `setyoutubechannel #channel`, `setjokechannel #channel`, `setjoketime <HH:MM> [timezone]`, `checkmemes`, `listfollows`",
+        inline=False
+    )
+    embed.add_field(
+        name="⭐ Levels Management",
+        value="`setxp <type> <amount>`, `getxpconfig`, `setlevelcurve <curve> <base> [confirm]`, `bulkxp <grant|revoke|multiply> <amount> <@role|@user|all>...`, `xpboost <multiplier> <hours> [starts_in_hours]|list|clear`, `togglelevelup`, `resetlevel @user`, `resetalllevels confirm`",
+        inline=False
+    )
+    embed.add_field(
+        name="⚙️ Bot Config",
+        value="`setprefix <prefix>`, `setratelimit <command> [uses] [seconds]`, `ratelimits`, `schedule`, `lockstats`, `profile [seconds] [top]`, `memstats`, `memstats alloc on|off`, `memstats watch <minutes>|off`, `trace [on|off]`, `export`, `import [replace]`, `snapshot`, `restore [name] [all]`, `reload [extension]`",
+        inline=False
+    )
+    try:
+        await ctx.author.send(embed=embed)
+        await ctx.reply("📬 Sent you a DM with the admin commands!", mention_author=False)
+    except discord.Forbidden:
+        await ctx.reply(embed=embed, mention_author=False)
+
+@commands.command(name="modcommands")
+@commands.cooldown(1, 20, commands.BucketType.user)
+async def mod_commands(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    embed = discord.Embed(title="🛠️ Moderator Commands", color=discord.Color.orange())
+    embed.add_field(
+        name="⚙️ Bot Control",
+        value="`shutdownbot`, `restartbot`",
+        inline=False
+    )
+    try:
+        await ctx.author.send(embed=embed)
+        await ctx.reply("📬 Sent you a DM with the moderator commands!", mention_author=False)
+    except discord.Forbidden:
+        await ctx.reply(embed=embed, mention_author=False)
+
+# Custom Prefix
+@commands.command(name="setprefix")
+@commands.has_permissions(administrator=True)
+async def setprefix(ctx, prefix: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    guild_id = str(ctx.guild.id)
+    config.setdefault("prefixes", {})[guild_id] = prefix
+    save_json_file(CONFIG_FILE, config)
+    await ctx.send(f"✅ Command prefix set to `{prefix}`.")
+    logging.info(f"Prefix set to {prefix} for guild {guild_id}")
+
+# Rate limits
+@commands.command(name="setratelimit")
+@commands.has_permissions(administrator=True)
+async def set_rate_limit_cmd(ctx, command_name: str, uses: int = None, seconds: float = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    command = bot.get_command(command_name)
+    if command is None:
+        await ctx.send(f"❌ Unknown command `{command_name}`.")
+        return
+    name = command.qualified_name
+    if uses is None:
+        set_rate_limit(ctx.guild.id, name, None)
+        rule = rate_limiter.rule(ctx.guild.id, name)
+        await ctx.send(f"✅ `{name}` rate limit reset to the default ({f'{rule[0]} per {rule[1]:g}s' if rule else 'unlimited'}).")
+    elif uses < 0 or seconds is None or seconds < 0:
+        await ctx.send("❌ Usage: `setratelimit <command> <uses> <seconds>` (0 uses for no limit), or `setratelimit <command>` to reset.")
+        return
+    else:
+        set_rate_limit(ctx.guild.id, name, (uses, seconds))
+        await ctx.send(f"✅ `{name}` limited to {uses} per {seconds:g}s per user." if uses and seconds else f"✅ `{name}` is no longer rate limited.")
+    logging.info(f"Rate limit for {name} set to {rate_limiter.rule(ctx.guild.id, name)} in guild {ctx.guild.id}")
+
+@commands.command(name="ratelimits")
+@commands.has_permissions(administrator=True)
+async def rate_limits_cmd(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    names = sorted(set(DEFAULT_RATE_LIMITS) | set(guild_setting(ctx.guild.id, "rate_limits", {})))
+    lines = []
+    for name in names:
+        uses, per = rate_limiter.rule(ctx.guild.id, name)
+        lines.append(f"`{name}`: {f'{uses} per {per:g}s' if uses and per else 'unlimited'}")
+    lines.append(f"{rate_limiter.limited} commands rate limited since startup, {len(rate_limiter.buckets)} active buckets")
+    await ctx.send("⏳ **Rate limits (per user)**\n" + "\n".join(lines))
+
+# =========================
+# EXTENSIONS
+# =========================
+@commands.command(name="reload")
+@commands.has_permissions(administrator=True)
+async def reload_cmd(ctx, extension: str = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if extension is None:
+        loaded = ", ".join(f"`{name.split('.')[-1]}`" for name in EXTENSIONS if name in bot.extensions)
+        await ctx.send(f"🧩 Loaded extensions: {loaded}\nUse `!reload <extension>` or `!reload all`.")
+        return
+    if not ctx.guild or ctx.guild.id != GUILD_ID:
+        await ctx.send("❌ Reloading code is only allowed from the home server.")
+        return
+    targets = EXTENSIONS if extension == "all" else [f"extensions.{extension}"]
+    if extension != "all" and targets[0] not in EXTENSIONS:
+        await ctx.send(f"❌ Unknown extension `{extension}`. Use `!reload` to list them.")
+        return
+    results = []
+    for name in targets:
+        start = time.perf_counter()
+        try:
+            if name in bot.extensions:
+                await bot.reload_extension(name)
+            else:
+                await bot.load_extension(name)
+        except commands.ExtensionError as e:
+            # discord.py keeps the previous version loaded when a reload fails
+            results.append(f"❌ `{name}`: {e.__cause__ or e}")
+            logging.error(f"Failed to reload {name}: {e.__cause__ or e}")
+            continue
+        results.append(f"✅ `{name}` reloaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+        logging.info(f"Reloaded {name} by {ctx.author.display_name}")
+    await ctx.send("\n".join(results))
+
+# =========================
+# EXTENSION SETUP
+# =========================
+async def setup(bot):
+    setup_extension(__name__, globals())
+
+async def teardown(bot):
+    teardown_extension(__name__, globals())
@@ -0,0 +1,241 @@
+import aiohttp
+
+from core import *  # noqa: F401,F403 - shared config, data stores, helpers and the bot
+
+# =========================
+# ADMIN: JOKE SCHEDULE
+# =========================
+@commands.command(name="setjokechannel")
+@commands.has_permissions(administrator=True)
+async def set_joke_channel(ctx, channel: discord.TextChannel):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    set_guild_setting(ctx.guild.id, "joke_channels", channel.id)
+    schedule_daily_joke(ctx.guild.id)
+    await ctx.send(f"✅ Daily jokes will now go to {channel.mention}.")
+    logging.info(f"Joke channel set to {channel.id} for guild {ctx.guild.id}")
+
+@commands.command(name="setjoketime")
+@commands.has_permissions(administrator=True)
+async def set_joke_time(ctx, at: str, tz: str = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    try:
+        hour, minute = (int(part) for part in at.split(":"))
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(at)
+    except ValueError:
+        await ctx.send("❌ Time must be HH:MM, e.g. `08:00`.")
+        return
+    if tz:
+        try:
+            ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            await ctx.send(f"❌ Unknown timezone `{tz}`. Use an IANA name like `Europe/Berlin`.")
+            return
+        set_guild_setting(ctx.guild.id, "timezones", tz)
+    set_guild_setting(ctx.guild.id, "joke_times", f"{hour:02d}:{minute:02d}")
+    schedule_daily_joke(ctx.guild.id, reset=True)
+    tz_name = guild_setting(ctx.guild.id, "timezones", BOT_TIMEZONE)
+    await ctx.send(f"✅ Daily jokes will be posted at {hour:02d}:{minute:02d} ({tz_name}).")
+    logging.info(f"Joke time set to {hour:02d}:{minute:02d} {tz_name} for guild {ctx.guild.id}")
+
+# =========================
+# FUN COMMANDS: MEMES & JOKES
+# =========================
+@commands.command(name="meme")
+async def meme_cmd(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    meme = meme_store.pick(ctx.guild.id, accept=meme_is_good)
+    if meme is None:
+        await ctx.send("📭 No memes available." if not len(meme_store) else "📭 No working memes available right now.")
+        return
+    embed = discord.Embed(title=meme.get("title", "😂 Meme"), color=discord.Color.random())
+    if isinstance(meme, dict) and meme.get("url"):
+        embed.set_image(url=meme["url"])
+        await ctx.send(embed=embed)
+    else:
+        await ctx.send(f"📭 Meme could not be embedded: {meme.get('title', str(meme))}")
+    user, leveled_up = add_xp(get_guild_data(ctx.guild), str(ctx.author.id), LEVEL_CONFIG['meme_xp'])
+    if leveled_up and LEVEL_CONFIG.get('announce_levelup', True):
+        await ctx.send(f"🎉 {ctx.author.mention} leveled up to **Level {user['level']}**!")
+
+@commands.command(name="joke")
+async def joke_cmd(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    joke = joke_store.pick(ctx.guild.id)
+    if joke is None:
+        await ctx.send("📭 No jokes available.")
+        return
+    await send_joke(ctx, joke)
+    user, leveled_up = add_xp(get_guild_data(ctx.guild), str(ctx.author.id), LEVEL_CONFIG['joke_xp'])
+    if leveled_up and LEVEL_CONFIG.get('announce_levelup', True):
+        await ctx.send(f"🎉 {ctx.author.mention} leveled up to **Level {user['level']}**!")
+
+async def send_joke(destination, joke):
+    if isinstance(joke, dict):
+        setup = joke.get("setup")
+        punchline = joke.get("punchline")
+        text = joke.get("text")
+        if setup and punchline:
+            await destination.send(f"🤣 {setup}\n||{punchline}||")
+            return
+        elif text:
+            await destination.send(text)
+            return
+    await destination.send(str(joke))
+
+# Daily Joke Task
+def schedule_daily_joke(guild_id, reset=False):
+    key = f"joke:{guild_id}"
+    if not guild_channel_id(guild_id, "joke_channels", JOKE_CHANNEL_ID):
+        scheduler.remove(key)
+        return
+    at = guild_setting(guild_id, "joke_times", JOKE_TIME)
+    tz = guild_setting(guild_id, "timezones", BOT_TIMEZONE)
+    scheduler.add(key, partial(daily_joke, str(guild_id)), daily_at=at, tz=tz, reset=reset)
+
+async def daily_joke(guild_id):
+    if bot.is_shutdown:
+        return
+    channel_id = guild_channel_id(guild_id, "joke_channels", JOKE_CHANNEL_ID)
+    if channel_id == 0 or not len(joke_store):
+        logging.error(f"Daily joke skipped for guild {guild_id}: Invalid channel ID ({channel_id}) or no jokes ({len(joke_store)})")
+        return
+    channel = bot.get_channel(channel_id)
+    if not channel:
+        logging.error(f"Joke channel not found: ID {channel_id}")
+        return
+    joke = joke_store.pick(int(guild_id))
+    if joke is None:
+        logging.error(f"Daily joke skipped for guild {guild_id}: no readable jokes in {joke_store.path}")
+        return
+    await send_joke(channel, joke)
+    logging.info(f"Sent daily joke for guild {guild_id} at {datetime.utcnow()}")
+
+# =========================
+# MEME LINK HEALTH
+# =========================
+# A background pass HEAD-checks meme links through one pooled session and caches status and
+# content type per URL in meme_health.json; !meme only picks links that last checked out as media.
+LINK_RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}  # Transient: keep the old result, retry next pass
+LINK_NO_HEAD_STATUSES = {403, 405, 501}  # Hosts that refuse HEAD get a one-byte GET instead
+meme_health = load_json_file(MEME_HEALTH_FILE, {})  # url -> {"status", "type", "checked"}
+meme_check_lock = asyncio.Lock()
+
+def meme_url(meme):
+    url = meme.get("url") if isinstance(meme, dict) else None
+    return url if isinstance(url, str) and url else None
+
+def link_ok(entry):
+    return entry is not None and 200 <= entry["status"] < 400 and entry["type"].startswith(("image/", "video/"))
+
+def meme_is_good(meme):
+    if not MEME_CHECK_INTERVAL:
+        return meme_url(meme) is not None
+    return link_ok(meme_health.get(meme_url(meme)))
+
+def stale_meme_urls(now, limit):
+    # Runs in a thread: decodes records one at a time, so large corpora are never held in memory
+    ttl = MEME_CHECK_TTL * 3600
+    urls = []
+    seen = set()
+    for i in range(len(meme_store)):
+        url = meme_url(meme_store.get(i))
+        if url is None or url in seen:
+            continue
+        entry = meme_health.get(url)
+        if entry is None or now - entry["checked"] >= ttl:
+            seen.add(url)
+            urls.append(url)
+            if len(urls) >= limit:
+                break
+    return urls
+
+async def check_link(session, url):
+    """Returns (status, content type), or None if the host failed transiently."""
+    try:
+        async with session.head(url, allow_redirects=True) as resp:
+            status, content_type = resp.status, resp.content_type
+        if status in LINK_NO_HEAD_STATUSES:
+            async with session.get(url, allow_redirects=True, headers={"Range": "bytes=0-0"}) as resp:
+                status, content_type = resp.status, resp.content_type
+    except aiohttp.InvalidURL:
+        return 0, ""
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.info(f"Meme link check failed for {url}: {e!r}")
+        return None
+    if status in LINK_RETRY_STATUSES:
+        return None
+    return status, content_type
+
+async def check_meme_links():
+    """Checks up to MEME_CHECK_BATCH unchecked or expired links; returns (checked, good, retry later)."""
+    if bot.is_shutdown or not MEME_CHECK_INTERVAL or meme_check_lock.locked():
+        return None
+    async with meme_check_lock:
+        start_time = time.time()
+        urls = await asyncio.to_thread(stale_meme_urls, start_time, MEME_CHECK_BATCH)
+        if not urls:
+            return 0, 0, 0
+        connector = aiohttp.TCPConnector(limit=MEME_CHECK_CONCURRENCY)
+        timeout = aiohttp.ClientTimeout(total=MEME_CHECK_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers={"User-Agent": "RainBot meme link checker"}) as session:
+            results = await asyncio.gather(*(check_link(session, url) for url in urls))
+        now = time.time()
+        good = retry = 0
+        for url, result in zip(urls, results):
+            if result is None:
+                retry += 1
+                continue
+            meme_health[url] = {"status": result[0], "type": result[1], "checked": now}
+            good += link_ok(meme_health[url])
+        # Results for links that left the corpus age out instead of accumulating forever
+        expired = [url for url, entry in meme_health.items() if now - entry["checked"] >= 4 * MEME_CHECK_TTL * 3600]
+        for url in expired:
+            del meme_health[url]
+        await asyncio.to_thread(save_json_file, MEME_HEALTH_FILE, dict(meme_health))
+        logging.info(f"Checked {len(urls)} meme links in {now - start_time:.2f}s: {good} good, {len(urls) - good - retry} dead, {retry} to retry")
+        return len(urls), good, retry
+
+@commands.command(name="checkmemes")
+@commands.has_permissions(administrator=True)
+async def check_memes_cmd(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if not MEME_CHECK_INTERVAL:
+        await ctx.send("ℹ️ Meme link checks are disabled (MEME_CHECK_INTERVAL=0).")
+        return
+    result = await check_meme_links()
+    if result is None:
+        await ctx.send("⏳ A meme link check is already running, try again shortly.")
+        return
+    checked, good, retry = result
+    total_good = sum(1 for entry in meme_health.values() if link_ok(entry))
+    await ctx.send(
+        f"🔍 Checked {checked} links: {good} good, {checked - good - retry} dead, {retry} to retry.\n"
+        f"📊 Cache: {total_good} good / {len(meme_health) - total_good} dead of {len(meme_store)} memes."
+    )
+
+# =========================
+# EXTENSION SETUP
+# =========================
+HANDOFF_STATE = ["meme_health"]
+
+def schedule_meme_checks():
+    if MEME_CHECK_INTERVAL:
+        scheduler.add("meme_check", check_meme_links, interval=MEME_CHECK_INTERVAL * 60, delay=0)
+
+async def setup(bot):
+    setup_extension(__name__, globals(), global_jobs=schedule_meme_checks, guild_jobs=schedule_daily_joke,
+                    memory=lambda: {"meme link health": meme_health})
+
+async def teardown(bot):
+    teardown_extension(__name__, globals(), HANDOFF_STATE, job_prefixes=("joke:", "meme_check"))
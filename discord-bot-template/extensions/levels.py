@@ -0,0 +1,275 @@
+import math
+import random
+from typing import Union
+
+from core import *  # noqa: F401,F403 - shared config, data stores, helpers and the bot
+
+# =========================
+# LEVEL COMMANDS
+# =========================
+@commands.command(name="level")
+async def level_cmd(ctx, member: discord.Member = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    user = member or ctx.author
+    data = get_guild_data(ctx.guild).levels.get(str(user.id), {"xp": 0, "level": 0})
+    next_xp = level_curve.xp_for(data.get("level", 0) + 1)
+    await ctx.send(f"⭐ {user.display_name} - Level {data.get('level', 0)} ({data.get('xp', 0)} / {next_xp} XP)")
+
+@commands.command(name="leaderboard")
+async def leaderboard_cmd(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    levels = get_guild_data(ctx.guild).levels
+    if not levels:
+        await ctx.send("📭 No levels recorded yet!")
+        return
+    sorted_lvls = sorted(levels.items(), key=lambda kv: kv[1].get("xp", 0), reverse=True)
+    embed = discord.Embed(title="🏆 Level Leaderboard", color=discord.Color.gold())
+    for i, (uid, data) in enumerate(sorted_lvls[:10], 1):
+        try:
+            user = await bot.fetch_user(int(uid))
+            name = user.display_name
+        except Exception:
+            name = f"User {uid}"
+        embed.add_field(name=f"#{i} {name}", value=f"Level {data.get('level', 0)} ({data.get('xp', 0)} XP)", inline=False)
+    await ctx.send(embed=embed)
+
+@commands.command(name="duel")
+async def duel_cmd(ctx, opponent: discord.Member):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if opponent.id == ctx.author.id:
+        await ctx.send("❌ You cannot duel yourself!")
+        return
+    winner = random.choice([ctx.author, opponent])
+    gd = get_guild_data(ctx.guild)
+    user, leveled_up = add_xp(gd, str(winner.id), LEVEL_CONFIG["duel_win_xp"])
+    gd.battle_log.append(BATTLE_KIND_DUEL, ctx.author.id, opponent.id, None, None, winner.id == ctx.author.id)
+    await ctx.send(f"⚔️ {ctx.author.display_name} dueled {opponent.display_name}! **{winner.display_name}** wins and gains {LEVEL_CONFIG['duel_win_xp']} XP!")
+    if leveled_up and LEVEL_CONFIG.get('announce_levelup', True):
+        await ctx.send(f"🎉 {winner.mention} leveled up to **Level {user['level']}**!")
+    logging.info(f"Duel: {ctx.author.display_name} vs {opponent.display_name}, winner: {winner.display_name}")
+
+# Message XP
+async def award_message_xp(message):
+    if bot.is_shutdown or message.author.bot or not message.guild:
+        return
+    # Check if the message is a command
+    prefix = get_prefix(bot, message)
+    if not message.content.startswith(prefix):
+        user, leveled_up = add_xp(get_guild_data(message.guild), str(message.author.id), LEVEL_CONFIG["message_xp"])
+        if leveled_up and LEVEL_CONFIG.get('announce_levelup', True):
+            await message.channel.send(f"🎉 {message.author.mention} leveled up to **Level {user['level']}**!")
+
+# =========================
+# ADMIN: XP CONFIG / TOGGLES / RESETS
+# =========================
+@commands.command(name="setxp")
+@commands.has_permissions(administrator=True)
+async def setxp(ctx, xp_type: str, amount: int):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    key_map = {
+        "message": "message_xp",
+        "catch": "catch_xp",
+        "meme": "meme_xp",
+        "joke": "joke_xp",
+        "duel_win": "duel_win_xp",
+        "battle_win": "battle_win_xp"
+    }
+    if xp_type not in key_map:
+        await ctx.send("❌ Invalid type. Use one of: message, catch, meme, joke, duel_win, battle_win")
+        return
+    LEVEL_CONFIG[key_map[xp_type]] = amount
+    save_level_config()
+    await ctx.send(f"✅ Updated **{xp_type}** XP to {amount}.")
+    logging.info(f"Updated {xp_type} XP to {amount}")
+
+@commands.command(name="getxpconfig")
+@commands.has_permissions(administrator=True)
+async def getxpconfig(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    embed = discord.Embed(title="⚙️ XP Configuration", color=discord.Color.purple())
+    for key, value in LEVEL_CONFIG.items():
+        embed.add_field(name=key, value=str(value), inline=True)
+    await ctx.send(embed=embed)
+
+@commands.command(name="setlevelcurve")
+@commands.has_permissions(administrator=True)
+async def set_level_curve(ctx, name: str = None, base: int = None, confirm: str = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if name not in LEVEL_CURVES or base is None or base < 1:
+        await ctx.send(
+            f"📈 Current curve: **{level_curve.name}** (base {level_curve.base}), level 10 at {level_curve.xp_for(10)} XP.\n"
+            f"Usage: `setlevelcurve <{'|'.join(LEVEL_CURVES)}> <base> [confirm]`"
+        )
+        return
+    curve = LevelCurve(name, base)
+    if confirm != "confirm":
+        users, raised, lowered = await recompute_all_levels(curve, apply=False)
+        await ctx.send(
+            f"📈 **{name}** (base {base}) puts level 10 at {curve.xp_for(10)} XP (now {level_curve.xp_for(10)}).\n"
+            f"Of {users} users across all servers, {raised} would go up and {lowered} would go down a level or more.\n"
+            f"Type `setlevelcurve {name} {base} confirm` to apply."
+        )
+        return
+    LEVEL_CONFIG.update(level_curve=name, level_curve_base=base)
+    save_level_config()
+    level_curve.configure(name, base)
+    users, raised, lowered = await recompute_all_levels(level_curve)
+    await ctx.send(f"✅ Level curve set to **{name}** (base {base}). Re-leveled {users} users: {raised} up, {lowered} down.")
+    logging.info(f"Level curve set to {name}/{base} by {ctx.author}")
+
+# Bulk XP
+BULK_XP_ACTIONS = ("grant", "revoke", "multiply")
+ALL_TARGETS = ("all", "everyone")
+
+@commands.command(name="bulkxp")
+@commands.has_permissions(administrator=True)
+async def bulk_xp_cmd(ctx, action: str, value: float, *targets: Union[discord.Member, discord.Role, str]):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    action = action.lower()
+    if action not in BULK_XP_ACTIONS or not targets:
+        await ctx.send("❌ Usage: `bulkxp <grant|revoke|multiply> <amount> <@role|@user|all> ...`")
+        return
+    if value < 0 or (action == "multiply" and value > 100) or (action != "multiply" and value != int(value)):
+        await ctx.send("❌ Grant and revoke take a whole number of XP; multiply takes a factor between 0 and 100.")
+        return
+    gd = get_guild_data(ctx.guild)
+    user_ids = set()
+    for target in targets:
+        if isinstance(target, discord.Member):
+            members = [target]
+        elif isinstance(target, discord.Role):
+            members = target.members
+        elif target.lower() in ALL_TARGETS:
+            members = ctx.guild.members
+            user_ids.update(gd.levels)
+        else:
+            await ctx.send(f"❌ `{target}` is not a member, a role or `all`.")
+            return
+        user_ids.update(str(member.id) for member in members if not member.bot)
+    # One synchronous pass: no command can award XP halfway through
+    users, raised, lowered = bulk_xp(gd, sorted(user_ids), action, value)
+    verb = {"grant": f"Granted {int(value)} XP to", "revoke": f"Revoked {int(value)} XP from", "multiply": "Multiplied the XP of"}[action]
+    suffix = f" by {value:g}" if action == "multiply" else ""
+    await ctx.send(f"✅ {verb} {users} users{suffix}: {raised} leveled up, {lowered} leveled down.")
+    logging.info(f"Bulk XP {action} {value:g} for {users} users in guild {gd.guild_id} by {ctx.author}")
+
+# XP boost windows: stored per guild in config.json as [start, end, multiplier] and turned into
+# xp_multipliers entries by a scheduled job at each window boundary
+def refresh_xp_multiplier(guild_id):
+    now = time.time()
+    windows = [window for window in guild_setting(guild_id, "xp_boosts", []) if window[1] > now]
+    multiplier = math.prod(window[2] for window in windows if window[0] <= now)
+    if multiplier != 1:
+        xp_multipliers[str(guild_id)] = multiplier
+    else:
+        xp_multipliers.pop(str(guild_id), None)
+    boundaries = [t for window in windows for t in window[:2] if t > now]
+    key = f"xpboost:{guild_id}"
+    if boundaries:
+        # Each firing schedules the next boundary, so the interval is only a fallback
+        scheduler.add(key, partial(xp_boost_boundary, guild_id), interval=3600, delay=min(boundaries) - now, reset=True)
+    else:
+        scheduler.remove(key)
+    return windows
+
+async def xp_boost_boundary(guild_id):
+    refresh_xp_multiplier(guild_id)
+    logging.info(f"XP multiplier for guild {guild_id} is now {xp_multipliers.get(str(guild_id), 1):g}")
+
+@commands.command(name="xpboost")
+@commands.has_permissions(administrator=True)
+async def xp_boost_cmd(ctx, multiplier: str = "list", hours: float = None, starts_in: float = 0.0):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if multiplier == "clear":
+        set_guild_setting(ctx.guild.id, "xp_boosts", [])
+        refresh_xp_multiplier(ctx.guild.id)
+        await ctx.send("♻️ All XP boosts cleared.")
+        logging.info(f"XP boosts cleared for guild {ctx.guild.id}")
+        return
+    if multiplier != "list":
+        try:
+            factor = float(multiplier)
+        except ValueError:
+            factor = None
+        if factor is None or not 0 < factor <= 10 or hours is None or not 0 < hours <= 24 * 30 or starts_in < 0:
+            await ctx.send("❌ Usage: `xpboost <multiplier 0-10> <hours> [starts_in_hours]`, `xpboost list` or `xpboost clear`.")
+            return
+        start = time.time() + starts_in * 3600
+        windows = refresh_xp_multiplier(ctx.guild.id) + [[start, start + hours * 3600, factor]]
+        set_guild_setting(ctx.guild.id, "xp_boosts", windows)
+        logging.info(f"XP boost x{factor:g} for {hours:g}h starting in {starts_in:g}h for guild {ctx.guild.id}")
+    windows = refresh_xp_multiplier(ctx.guild.id)
+    if not windows:
+        await ctx.send("📭 No XP boosts scheduled.")
+        return
+    lines = [f"x{factor:g} from <t:{int(start)}:f> to <t:{int(end)}:f>" for start, end, factor in sorted(windows)]
+    await ctx.send(f"🚀 **XP boosts** (now x{xp_multipliers.get(str(ctx.guild.id), 1):g})\n" + "\n".join(lines))
+
+@commands.command(name="togglelevelup")
+@commands.has_permissions(administrator=True)
+async def toggle_levelup(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    LEVEL_CONFIG["announce_levelup"] = not LEVEL_CONFIG.get("announce_levelup", True)
+    state = "ON" if LEVEL_CONFIG["announce_levelup"] else "OFF"
+    save_level_config()
+    await ctx.send(f"🔔 Level-up announcements are now **{state}**.")
+    logging.info(f"Level-up announcements set to {state}")
+
+@commands.command(name="resetlevel")
+@commands.has_permissions(administrator=True)
+async def reset_level(ctx, member: discord.Member):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    user_id = str(member.id)
+    gd = get_guild_data(ctx.guild)
+    if user_id in gd.levels:
+        gd.levels[user_id] = {"xp": 0, "level": 0}
+        gd.save_levels()
+        await ctx.send(f"♻️ Reset {member.display_name}'s level and XP to 0.")
+        logging.info(f"Reset level for {member.display_name}")
+    else:
+        await ctx.send(f"⚠️ {member.display_name} has no recorded XP/level yet.")
+
+@commands.command(name="resetalllevels")
+@commands.has_permissions(administrator=True)
+async def reset_all_levels(ctx, confirm: str = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if confirm != "confirm":
+        await ctx.send("⚠️ This will reset ALL levels! Type `resetalllevels confirm` to proceed.")
+        return
+    gd = get_guild_data(ctx.guild)
+    gd.levels.clear()
+    gd.save_levels()
+    await ctx.send("♻️ All user levels and XP have been reset.")
+    logging.info(f"All levels reset for guild {gd.guild_id}")
+
+# =========================
+# EXTENSION SETUP
+# =========================
+async def setup(bot):
+    setup_extension(__name__, globals(), guild_jobs=refresh_xp_multiplier)
+    bot.add_listener(award_message_xp, "on_message")
+
+async def teardown(bot):
+    teardown_extension(__name__, globals(), job_prefixes=("xpboost:",))
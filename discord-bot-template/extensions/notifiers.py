@@ -0,0 +1,251 @@
+import requests
+from core import *  # noqa: F401,F403 - shared config, data stores, helpers and the bot
+
+# =========================
+# TWITCH NOTIFIER
+# =========================
+TWITCH_ACCESS_TOKEN = None
+TWITCH_TOKEN_EXPIRES = 0
+
+def get_twitch_token():
+    global TWITCH_ACCESS_TOKEN, TWITCH_TOKEN_EXPIRES
+    if not TWITCH_CLIENT_ID or not TWITCH_SECRET:
+        logging.error("Missing TWITCH_CLIENT_ID or TWITCH_SECRET in .env")
+        return None
+    url = "https://id.twitch.tv/oauth2/token"
+    params = {
+        "client_id": TWITCH_CLIENT_ID,
+        "client_secret": TWITCH_SECRET,
+        "grant_type": "client_credentials"
+    }
+    try:
+        r = requests.post(url, params=params, timeout=10)
+        r.raise_for_status()
+        data = r.json()
+        TWITCH_ACCESS_TOKEN = data.get("access_token")
+        TWITCH_TOKEN_EXPIRES = time.time() + data.get("expires_in", 3600) - 60
+        logging.info(f"Twitch token refreshed, expires at {time.ctime(TWITCH_TOKEN_EXPIRES)}")
+        return TWITCH_ACCESS_TOKEN
+    except requests.RequestException as e:
+        logging.error(f"Twitch token fetch error: {e}")
+        return None
+
+def twitch_headers():
+    global TWITCH_ACCESS_TOKEN, TWITCH_TOKEN_EXPIRES
+    current_time = time.time()
+    if not TWITCH_ACCESS_TOKEN or current_time >= TWITCH_TOKEN_EXPIRES:
+        TWITCH_ACCESS_TOKEN = get_twitch_token()
+    if not TWITCH_ACCESS_TOKEN:
+        logging.error("No valid Twitch access token available")
+        return {}
+    return {"Client-ID": TWITCH_CLIENT_ID, "Authorization": f"Bearer {TWITCH_ACCESS_TOKEN}"}
+
+last_twitch_status = {}  # streamer -> bool
+
+async def twitch_notifier():
+    if bot.is_shutdown:
+        return
+    if not TWITCH_CLIENT_ID or not TWITCH_SECRET:
+        logging.error("Twitch notifier skipped: Missing TWITCH_CLIENT_ID or TWITCH_SECRET")
+        return
+    if TWITCH_CHANNEL_ID == 0 or not streamers:
+        logging.error(f"Twitch notifier skipped: Invalid channel ID ({TWITCH_CHANNEL_ID}) or no streamers ({len(streamers)})")
+        return
+    channel = bot.get_channel(TWITCH_CHANNEL_ID)
+    if not channel:
+        logging.error(f"Notify channel not found: ID {TWITCH_CHANNEL_ID}")
+        return
+    logging.info(f"Checking Twitch for {len(streamers)} streamers: {', '.join(streamers)}")
+    for username in list(streamers):
+        try:
+            url = "https://api.twitch.tv/helix/streams"
+            resp = requests.get(url, headers=twitch_headers(), params={"user_login": username}, timeout=10)
+            resp.raise_for_status()
+            data = resp.json()
+            is_live = bool(data.get("data"))
+            was_live = last_twitch_status.get(username, False)
+            if is_live and not was_live:
+                await channel.send(f"@everyone 🎥 **{username} is LIVE on Twitch!** https://twitch.tv/{username}")
+                logging.info(f"Sent Twitch live notification for {username}")
+            elif not is_live and was_live:
+                logging.info(f"{username} went offline")
+            last_twitch_status[username] = is_live
+        except requests.RequestException as e:
+            logging.error(f"Twitch check error for {username}: {e}")
+            await channel.send(f"⚠️ Error checking Twitch status for {username}: {e}")
+        except Exception as e:
+            logging.error(f"Unexpected error in twitch_notifier for {username}: {e}")
+
+# =========================
+# YOUTUBE NOTIFIER
+# =========================
+async def youtube_notifier():
+    if bot.is_shutdown:
+        return
+    if not YOUTUBE_API_KEY:
+        logging.error("YouTube notifier skipped: Missing YOUTUBE_API_KEY")
+        return
+    if YOUTUBE_CHANNEL_ID == 0 or not youtube_channels:
+        logging.error(f"YouTube notifier skipped: Invalid channel ID ({YOUTUBE_CHANNEL_ID}) or no channels ({len(youtube_channels)})")
+        return
+    channel = bot.get_channel(YOUTUBE_CHANNEL_ID)
+    if not channel:
+        logging.error(f"Notify channel not found: ID {YOUTUBE_CHANNEL_ID}")
+        return
+    logging.info(f"Checking YouTube for {len(youtube_channels)} channels: {', '.join(youtube_channels.keys())}")
+    updated = False
+    for ch_id, last_vid in list(youtube_channels.items()):
+        try:
+            url = "https://www.googleapis.com/youtube/v3/search"
+            params = {
+                "part": "snippet",
+                "channelId": ch_id,
+                "maxResults": 1,
+                "order": "date",
+                "type": "video",
+                "key": YOUTUBE_API_KEY
+            }
+            r = requests.get(url, params=params, timeout=10)
+            r.raise_for_status()
+            data = r.json()
+            items = data.get("items", [])
+            if not items:
+                logging.info(f"No recent videos found for YouTube channel {ch_id}")
+                continue
+            vid = items[0]["id"]["videoId"]
+            title = items[0]["snippet"]["title"]
+            if not last_vid:
+                youtube_channels[ch_id] = vid
+                updated = True
+                logging.info(f"Initialized last video ID for YouTube channel {ch_id}: {vid}")
+            elif vid != last_vid:
+                youtube_channels[ch_id] = vid
+                updated = True
+                await channel.send(f"▶️ New YouTube upload: **{title}**\nhttps://youtu.be/{vid}")
+                logging.info(f"Sent YouTube notification for channel {ch_id}, video {vid}")
+        except requests.RequestException as e:
+            if hasattr(e, 'response') and e.response is not None:
+                logging.error(f"YouTube check error for {ch_id}: {e}, Status: {e.response.status_code}, Response: {e.response.text}")
+            else:
+                logging.error(f"YouTube check error for {ch_id}: {e}")
+    if updated:
+        notify_data["youtube_channels"] = youtube_channels
+        save_notify_data(notify_data)
+
+# =========================
+# ADMIN: ADD/REMOVE STREAMERS/YT
+# =========================
+@commands.command(name="addstreamer")
+@commands.has_permissions(administrator=True)
+async def add_streamer(ctx, twitch_name: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    name = twitch_name.lower()
+    if name in streamers:
+        await ctx.send(f"⚠️ **{name}** is already in the Twitch list.")
+        return
+    streamers.append(name)
+    notify_data["streamers"] = streamers
+    save_notify_data(notify_data)
+    await ctx.send(f"✅ Added **{name}** to Twitch notifications.")
+    logging.info(f"Added Twitch streamer {name}")
+
+@commands.command(name="addyoutube")
+@commands.has_permissions(administrator=True)
+async def add_youtube(ctx, channel_id: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if channel_id in youtube_channels:
+        await ctx.send(f"⚠️ Channel `{channel_id}` already tracked.")
+        return
+    youtube_channels[channel_id] = ""
+    notify_data["youtube_channels"] = youtube_channels
+    save_notify_data(notify_data)
+    await ctx.send(f"✅ Added YouTube channel `{channel_id}`. I’ll notify on the next upload.")
+    logging.info(f"Added YouTube channel {channel_id}")
+
+@commands.command(name="removestreamer")
+@commands.has_permissions(administrator=True)
+async def remove_streamer(ctx, twitch_name: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    name = twitch_name.lower()
+    if name not in streamers:
+        await ctx.send(f"⚠️ **{name}** is not in the Twitch list.")
+        return
+    streamers.remove(name)
+    notify_data["streamers"] = streamers
+    save_notify_data(notify_data)
+    await ctx.send(f"✅ Removed **{name}** from Twitch notifications.")
+    logging.info(f"Removed Twitch streamer {name}")
+
+@commands.command(name="removeyoutube")
+@commands.has_permissions(administrator=True)
+async def remove_youtube(ctx, channel_id: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if channel_id not in youtube_channels:
+        await ctx.send(f"⚠️ Channel `{channel_id}` is not tracked.")
+        return
+    youtube_channels.pop(channel_id, None)
+    notify_data["youtube_channels"] = youtube_channels
+    save_notify_data(notify_data)
+    await ctx.send(f"✅ Removed YouTube channel `{channel_id}`.")
+    logging.info(f"Removed YouTube channel {channel_id}")
+
+# Custom Notification Channels
+@commands.command(name="settwitchchannel")
+@commands.has_permissions(administrator=True)
+async def set_twitch_channel(ctx, channel: discord.TextChannel):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    global TWITCH_CHANNEL_ID
+    TWITCH_CHANNEL_ID = channel.id
+    await ctx.send(f"✅ Twitch notifications will now go to {channel.mention}.")
+    logging.info(f"Twitch notification channel set to {channel.id}")
+
+@commands.command(name="setyoutubechannel")
+@commands.has_permissions(administrator=True)
+async def set_youtube_channel(ctx, channel: discord.TextChannel):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    global YOUTUBE_CHANNEL_ID
+    YOUTUBE_CHANNEL_ID = channel.id
+    await ctx.send(f"✅ YouTube notifications will now go to {channel.mention}.")
+    logging.info(f"YouTube notification channel set to {channel.id}")
+
+# =========================
+# LIST FOLLOWED STREAMERS & YOUTUBE CHANNELS
+# =========================
+@commands.command(name="listfollows")
+async def list_follows(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    twitch_list = streamers if streamers else ["(none)"]
+    youtube_list = list(youtube_channels.keys()) if youtube_channels else ["(none)"]
+    embed = discord.Embed(title="📺 Followed Channels", color=discord.Color.blue())
+    embed.add_field(name="Twitch Streamers", value="\n".join(twitch_list), inline=False)
+    embed.add_field(name="YouTube Channels", value="\n".join(youtube_list), inline=False)
+    await ctx.send(embed=embed)
+
+# =========================
+# EXTENSION SETUP
+# =========================
+HANDOFF_STATE = ["TWITCH_ACCESS_TOKEN", "TWITCH_TOKEN_EXPIRES", "last_twitch_status", "TWITCH_CHANNEL_ID", "YOUTUBE_CHANNEL_ID"]
+
+def schedule_notifier_jobs():
+    scheduler.add("twitch", twitch_notifier, interval=TWITCH_INTERVAL * 60, delay=0)
+    scheduler.add("youtube", youtube_notifier, interval=YOUTUBE_INTERVAL * 60, delay=0)
+
+async def setup(bot):
+    setup_extension(__name__, globals(), global_jobs=schedule_notifier_jobs, memory=lambda: {"last_twitch_status": last_twitch_status})
+
+async def teardown(bot):
+    teardown_extension(__name__, globals(), HANDOFF_STATE, job_prefixes=("twitch", "youtube"))
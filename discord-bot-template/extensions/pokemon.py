@@ -0,0 +1,1160 @@
+import copy
+import math
+import random
+from core import *  # noqa: F401,F403 - shared config, data stores, helpers and the bot
+
+# =========================
+# POKÉMON GAME
+# =========================
+active_pokemon = {}  # guild_id -> tuple (name, rarity, shiny)
+
+# =========================
+# SPAWN TABLES
+# =========================
+# Each guild's spawn odds are compiled into an alias table (Vose) so a spawn is O(1) to sample.
+# Settings live in config.json under "spawn_tables" -> guild_id:
+#   {"pool": [species] or null, "weights": {species: weight}, "shiny_rate": float,
+#    "shiny_overrides": {species: rate},
+#    "events": [{"name", "start", "end", "rarity_multipliers": {rarity: x}, "shiny_multiplier": x}]}
+# Unweighted species split their rarity's SPAWN_* weight evenly, which matches the old two-step roll.
+class AliasTable:
+    def __init__(self, items, weights):
+        n = len(items)
+        total = float(sum(weights))
+        self.items = list(items)
+        self.probabilities = [w / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+        scaled = [p * n for p in self.probabilities]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s_i, l_i = small.pop(), large.pop()
+            self.prob[s_i] = scaled[s_i]
+            self.alias[s_i] = l_i
+            scaled[l_i] -= 1.0 - scaled[s_i]
+            (small if scaled[l_i] < 1.0 else large).append(l_i)
+        for i in small + large:  # Leftovers are 1.0 up to float error
+            self.prob[i] = 1.0
+
+    def sample(self, rng=random):
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+class SpawnTable:
+    def __init__(self, alias_table, shiny_rate, shiny_overrides, events):
+        self.alias_table = alias_table
+        self.shiny_rate = shiny_rate
+        self.shiny_overrides = shiny_overrides
+        self.events = events
+
+    def sample(self, rng=random):
+        name = self.alias_table.sample(rng)
+        shiny = rng.random() < self.shiny_overrides.get(name, self.shiny_rate)
+        return name, SPECIES_RARITY[name], shiny
+
+def active_spawn_events(settings, now):
+    return [event for event in settings.get("events", []) if event["start"] <= now < event["end"]]
+
+def compile_spawn_table(settings, events):
+    pool = settings.get("pool") or ALL_GEN1
+    species_weights = settings.get("weights", {})
+    rarity_counts = {}
+    for name in pool:
+        rarity_counts[SPECIES_RARITY[name]] = rarity_counts.get(SPECIES_RARITY[name], 0) + 1
+    shiny_multiplier = 1.0
+    for event in events:
+        shiny_multiplier *= event.get("shiny_multiplier", 1.0)
+    items, weights = [], []
+    for name in pool:
+        rarity = SPECIES_RARITY[name]
+        weight = species_weights.get(name, SPAWN_WEIGHTS[rarity] / rarity_counts[rarity])
+        for event in events:
+            weight *= event.get("rarity_multipliers", {}).get(rarity, 1.0)
+        if weight > 0:
+            items.append(name)
+            weights.append(weight)
+    if not items:
+        raise ValueError("spawn pool has no species with a positive weight")
+    shiny_rate = min(1.0, settings.get("shiny_rate", SHINY_RATE) * shiny_multiplier)
+    shiny_overrides = {name: min(1.0, rate * shiny_multiplier) for name, rate in settings.get("shiny_overrides", {}).items()}
+    return SpawnTable(AliasTable(items, weights), shiny_rate, shiny_overrides, [event["name"] for event in events])
+
+class SpawnTables:
+    """Compiled spawn tables per guild, rebuilt only when settings change or an event starts/ends."""
+
+    def __init__(self):
+        self._tables = {}  # guild_id -> (signature, SpawnTable)
+        self._revisions = {}  # guild_id -> settings revision, bumped by invalidate()
+
+    def get(self, guild_id, now=None) -> SpawnTable:
+        guild_id = str(guild_id)
+        now = time.time() if now is None else now
+        settings = guild_setting(guild_id, "spawn_tables", {})
+        events = active_spawn_events(settings, now)
+        signature = (self._revisions.get(guild_id, 0), tuple(event["name"] for event in events))
+        cached = self._tables.get(guild_id)
+        if cached and cached[0] == signature:
+            return cached[1]
+        table = compile_spawn_table(settings, events)
+        self._tables[guild_id] = (signature, table)
+        logging.info(f"Compiled spawn table for guild {guild_id}: {len(table.alias_table.items)} species, events {list(signature[1])}")
+        return table
+
+    def invalidate(self, guild_id=None):
+        if guild_id is None:
+            self._tables.clear()
+            for key in self._revisions:
+                self._revisions[key] += 1
+            return
+        guild_id = str(guild_id)
+        self._revisions[guild_id] = self._revisions.get(guild_id, 0) + 1
+        self._tables.pop(guild_id, None)
+
+spawn_tables = SpawnTables()
+
+def update_spawn_settings(guild_id, settings):
+    # Compile before saving: a change that leaves nothing spawnable raises ValueError and is never stored
+    compile_spawn_table(settings, active_spawn_events(settings, time.time()))
+    set_guild_setting(guild_id, "spawn_tables", settings)
+    spawn_tables.invalidate(guild_id)
+
+SPAWN_CHECK_ALPHA = 0.001  # p-value below which the sampler is reported as not matching its table
+
+def spawn_distribution_check(table: SpawnTable, samples: int, rng=random):
+    """Chi-square goodness of fit of sampled species against the table's probabilities."""
+    alias_table = table.alias_table
+    index = {name: i for i, name in enumerate(alias_table.items)}
+    observed = [0] * len(alias_table.items)
+    for _ in range(samples):
+        observed[index[alias_table.sample(rng)]] += 1
+    chi2 = sum((o - samples * p) ** 2 / (samples * p) for o, p in zip(observed, alias_table.probabilities))
+    df = max(1, len(observed) - 1)
+    # Wilson-Hilferty approximation of the chi-square upper tail
+    z = ((chi2 / df) ** (1 / 3) - (1 - 2 / (9 * df))) / math.sqrt(2 / (9 * df))
+    p_value = 0.5 * math.erfc(z / math.sqrt(2))
+    by_rarity = {}
+    for name, o, p in zip(alias_table.items, observed, alias_table.probabilities):
+        obs, exp = by_rarity.get(SPECIES_RARITY[name], (0, 0.0))
+        by_rarity[SPECIES_RARITY[name]] = (obs + o, exp + p)
+    return chi2, df, p_value, by_rarity
+
+def schedule_spawns(guild_id, reset=False):
+    key = f"spawn:{guild_id}"
+    if not bot.pokemon_spawning or not guild_channel_id(guild_id, "spawn_channels", POKEMON_CHANNEL_ID):
+        scheduler.remove(key)
+        return
+    minutes = guild_setting(guild_id, "spawn_intervals", SPAWN_INTERVAL)
+    scheduler.add(key, partial(spawn_pokemon, str(guild_id)), interval=minutes * 60, reset=reset)
+
+async def spawn_pokemon(guild_id):
+    if not bot.pokemon_spawning or bot.is_shutdown:
+        return
+    channel_id = guild_channel_id(guild_id, "spawn_channels", POKEMON_CHANNEL_ID)
+    channel = bot.get_channel(channel_id)
+    if not channel:
+        logging.error(f"Pokémon channel not found for guild {guild_id}: ID {channel_id}")
+        return
+    # Waits for a catch window still announcing its results, so the channel never shows a new spawn before them
+    async with locks.hold(spawn_lock(guild_id)):
+        pokemon, rarity, shiny = spawn_tables.get(guild_id).sample()
+        active_pokemon[guild_id] = (pokemon, rarity, shiny)
+        shiny_text = " ✨SHINY✨" if shiny else ""
+        await channel.send(
+            f"A wild **{pokemon}** ({rarity}){shiny_text} appeared! "
+            f"Type `{get_prefix(bot, channel)}catch {pokemon}` to try and catch it!"
+        )
+
+@commands.command(name="startpokemon")
+@commands.has_permissions(administrator=True)
+async def startpokemon(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if bot.pokemon_spawning:
+        await ctx.send("Pokémon spawns are already running!")
+    else:
+        bot.pokemon_spawning = True
+        for guild in bot.guilds:
+            schedule_spawns(guild.id)
+        await ctx.send("🐾 Pokémon spawning has started!")
+        logging.info("Pokémon spawning started")
+
+@commands.command(name="stoppokemon")
+@commands.has_permissions(administrator=True)
+async def stoppokemon(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if not bot.pokemon_spawning:
+        await ctx.send("Pokémon spawns are not running!")
+    else:
+        bot.pokemon_spawning = False
+        scheduler.remove_prefix("spawn:")
+        await ctx.send("🛑 Pokémon spawning has been stopped.")
+        logging.info("Pokémon spawning stopped")
+
+@commands.command(name="setspawnchannel")
+@commands.has_permissions(administrator=True)
+async def set_spawn_channel(ctx, channel: discord.TextChannel):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    set_guild_setting(ctx.guild.id, "spawn_channels", channel.id)
+    schedule_spawns(ctx.guild.id)
+    await ctx.send(f"✅ Pokémon will now spawn in {channel.mention}.")
+    logging.info(f"Spawn channel set to {channel.id} for guild {ctx.guild.id}")
+
+@commands.command(name="setspawninterval")
+@commands.has_permissions(administrator=True)
+async def set_spawn_interval(ctx, minutes: int):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if minutes < 1:
+        await ctx.send("❌ Spawn interval must be at least 1 minute.")
+        return
+    set_guild_setting(ctx.guild.id, "spawn_intervals", minutes)
+    schedule_spawns(ctx.guild.id, reset=True)
+    await ctx.send(f"✅ Pokémon will spawn every {minutes} minutes.")
+    logging.info(f"Spawn interval set to {minutes} minutes for guild {ctx.guild.id}")
+
+@commands.command(name="setspawnweight")
+@commands.has_permissions(administrator=True)
+async def set_spawn_weight(ctx, species: str, weight: float = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    name = SPECIES_BY_LOWER.get(species.lower())
+    if not name:
+        await ctx.send(f"❌ Unknown Pokémon `{species}`.")
+        return
+    if weight is not None and weight < 0:
+        await ctx.send("❌ Weight must be 0 or greater.")
+        return
+    settings = copy.deepcopy(guild_setting(ctx.guild.id, "spawn_tables", {}))
+    if weight is None:
+        settings.get("weights", {}).pop(name, None)
+    else:
+        settings.setdefault("weights", {})[name] = weight
+    try:
+        update_spawn_settings(ctx.guild.id, settings)
+    except ValueError as e:
+        await ctx.send(f"❌ Change not saved: {e}.")
+        return
+    shown = "default" if weight is None else weight
+    await ctx.send(f"✅ Spawn weight for **{name}** set to {shown}.")
+    logging.info(f"Spawn weight for {name} set to {shown} in guild {ctx.guild.id}")
+
+@commands.command(name="setshinyrate")
+@commands.has_permissions(administrator=True)
+async def set_shiny_rate(ctx, rate: float, species: str = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if not 0 <= rate <= 1:
+        await ctx.send("❌ Shiny rate must be between 0 and 1.")
+        return
+    settings = copy.deepcopy(guild_setting(ctx.guild.id, "spawn_tables", {}))
+    if species:
+        name = SPECIES_BY_LOWER.get(species.lower())
+        if not name:
+            await ctx.send(f"❌ Unknown Pokémon `{species}`.")
+            return
+        settings.setdefault("shiny_overrides", {})[name] = rate
+        target = f"**{name}**"
+    else:
+        settings["shiny_rate"] = rate
+        target = "all Pokémon"
+    try:
+        update_spawn_settings(ctx.guild.id, settings)
+    except ValueError as e:
+        await ctx.send(f"❌ Change not saved: {e}.")
+        return
+    await ctx.send(f"✨ Shiny rate for {target} set to {rate:.2%}.")
+    logging.info(f"Shiny rate for {target} set to {rate} in guild {ctx.guild.id}")
+
+@commands.command(name="spawnpool")
+@commands.has_permissions(administrator=True)
+async def spawn_pool(ctx, action: str, *species: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    settings = copy.deepcopy(guild_setting(ctx.guild.id, "spawn_tables", {}))
+    if action == "reset":
+        settings.pop("pool", None)
+    elif action in ("add", "remove"):
+        names = [SPECIES_BY_LOWER.get(sp.lower()) for sp in species]
+        if not names or None in names:
+            await ctx.send("❌ List one or more valid Pokémon names.")
+            return
+        pool = set(settings.get("pool") or ALL_GEN1)
+        pool = pool | set(names) if action == "add" else pool - set(names)
+        if not pool:
+            await ctx.send("❌ The spawn pool can't be empty.")
+            return
+        settings["pool"] = [name for name in ALL_GEN1 if name in pool]
+    else:
+        await ctx.send("❌ Use `spawnpool add <names...>`, `spawnpool remove <names...>` or `spawnpool reset`.")
+        return
+    try:
+        update_spawn_settings(ctx.guild.id, settings)
+    except ValueError as e:
+        await ctx.send(f"❌ Change not saved: {e}.")
+        return
+    await ctx.send(f"✅ Spawn pool now has {len(settings.get('pool') or ALL_GEN1)} Pokémon.")
+    logging.info(f"Spawn pool {action} {list(species)} in guild {ctx.guild.id}")
+
+@commands.command(name="spawnevent")
+@commands.has_permissions(administrator=True)
+async def spawn_event(ctx, action: str, name: str = None, hours: float = None, *modifiers: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    settings = copy.deepcopy(guild_setting(ctx.guild.id, "spawn_tables", {}))
+    now = time.time()
+    events = [event for event in settings.get("events", []) if event["end"] > now]
+    if action == "list":
+        lines = [f"**{e['name']}** until <t:{int(e['end'])}:f> {e.get('rarity_multipliers', {})} shiny×{e.get('shiny_multiplier', 1.0)}" for e in events]
+        await ctx.send("\n".join(lines) or "📭 No spawn events scheduled.")
+        return
+    if action == "remove" and name:
+        events = [event for event in events if event["name"] != name]
+    elif action == "add" and name and hours and hours > 0:
+        event = {"name": name, "start": now, "end": now + hours * 3600, "rarity_multipliers": {}, "shiny_multiplier": 1.0}
+        for modifier in modifiers:
+            key, _, value = modifier.partition("=")
+            try:
+                factor = float(value)
+            except ValueError:
+                await ctx.send(f"❌ Bad modifier `{modifier}`, use e.g. `legendary=5` or `shiny=2`.")
+                return
+            if key == "shiny":
+                event["shiny_multiplier"] = factor
+            elif key in SPAWN_WEIGHTS:
+                event["rarity_multipliers"][key] = factor
+            else:
+                await ctx.send(f"❌ Unknown modifier `{key}`.")
+                return
+        events = [e for e in events if e["name"] != name] + [event]
+    else:
+        await ctx.send("❌ Use `spawnevent add <name> <hours> [rarity=x] [shiny=x]`, `spawnevent remove <name>` or `spawnevent list`.")
+        return
+    settings["events"] = events
+    try:
+        update_spawn_settings(ctx.guild.id, settings)
+    except ValueError as e:
+        await ctx.send(f"❌ Change not saved: {e}.")
+        return
+    await ctx.send(f"✅ Spawn event **{name}** {'added' if action == 'add' else 'removed'}.")
+    logging.info(f"Spawn event {name} {action} in guild {ctx.guild.id}")
+
+@commands.command(name="spawntest")
+@commands.has_permissions(administrator=True)
+async def spawn_test(ctx, samples: int = 100000):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    samples = max(1000, min(samples, 1000000))
+    table = spawn_tables.get(ctx.guild.id)
+    chi2, df, p_value, by_rarity = await asyncio.to_thread(spawn_distribution_check, table, samples)
+    embed = discord.Embed(title=f"🎲 Spawn distribution check ({samples:,} samples)", color=discord.Color.teal())
+    for rarity, (observed, expected) in by_rarity.items():
+        embed.add_field(name=rarity.capitalize(), value=f"{observed / samples:.2%} (expected {expected:.2%})", inline=True)
+    verdict = "✅ matches" if p_value >= SPAWN_CHECK_ALPHA else "⚠️ does NOT match"
+    embed.add_field(name="Chi-square", value=f"χ²={chi2:.1f}, df={df}, p={p_value:.3f} — sampler {verdict} the table", inline=False)
+    embed.set_footer(text=f"Shiny rate {table.shiny_rate:.2%} • Active events: {', '.join(table.events) or 'none'}")
+    await ctx.send(embed=embed)
+
+@commands.command(name="pokemonstatus")
+async def pokemonstatus(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    active = active_pokemon.get(str(ctx.guild.id)) if ctx.guild else None
+    if not bot.pokemon_spawning:
+        await ctx.send("🛑 Pokémon spawning is currently **OFF**.")
+    elif active:
+        name, rarity, shiny = active
+        shiny_text = " ✨SHINY✨" if shiny else ""
+        await ctx.send(f"✅ Spawning is **ON**. Active Pokémon: **{name}** ({rarity}){shiny_text}")
+    else:
+        await ctx.send("✅ Spawning is **ON**, but no Pokémon is currently active.")
+
+@commands.command(name="setcatchcd")
+@commands.has_permissions(administrator=True)
+async def setcatchcd(ctx, seconds: int):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if seconds < 0:
+        await ctx.send("❌ Cooldown must be 0 or greater.")
+    else:
+        # Enforced by the central rate limiter as one catch per `seconds`
+        set_rate_limit(ctx.guild.id, "catch", (1, seconds))
+        await ctx.send(f"✅ Catch cooldown set to {seconds} seconds.")
+        logging.info(f"Catch cooldown set to {seconds} seconds for guild {ctx.guild.id}")
+
+# Catch attempts for a spawn are collected for a short window and resolved together,
+# so a busy channel costs one save, one reply and one role update per spawn.
+class CatchWindow:
+    def __init__(self, guild_id, spawn, channel):
+        self.guild_id = guild_id
+        self.spawn = spawn  # the active_pokemon tuple this window belongs to
+        self.channel = channel
+        self.attempts = {}  # user_id -> (member, guessed_right), in arrival order
+        self.task = None
+
+catch_windows = {}  # guild_id -> CatchWindow
+
+def name_list(members, limit=15):
+    names = [member.display_name for member in members[:limit]]
+    if len(members) > limit:
+        names.append(f"… and {len(members) - limit} more")
+    return ", ".join(names)
+
+async def resolve_catch_window(window: CatchWindow, delay):
+    await asyncio.sleep(delay)
+    guild_id = window.guild_id
+    if catch_windows.get(guild_id) is window:
+        del catch_windows[guild_id]
+    pokemon, rarity, shiny = window.spawn
+    chance = CATCH_SHINY if shiny else CATCH_RATES[rarity]
+    # The spawn lock spans resolution and the results message (see spawn_pokemon)
+    async with locks.hold(spawn_lock(guild_id)):
+        gd = guild_store.get(guild_id)
+        streaks = gd.streaks
+        winner, escaped, too_late, wrong = None, [], [], []
+        lines = []
+        for user_id, (member, guessed_right) in window.attempts.items():
+            if not guessed_right:
+                wrong.append(member)
+            elif winner:
+                too_late.append(member)
+            elif random.random() <= chance:
+                winner = member
+                gd.add_pokemon(user_id, {"name": pokemon, "rarity": rarity, "shiny": shiny})
+                streaks[user_id] = streaks.get(user_id, 0) + 1
+            else:
+                streaks[user_id] = 0
+                escaped.append(member)
+        # Only a right guess uses up the spawn; if everyone guessed wrong it stays out for the next window
+        if (winner or escaped) and active_pokemon.get(guild_id) is window.spawn:
+            del active_pokemon[guild_id]
+        if winner or escaped:
+            try:
+                gd.save_pokemon()
+            except Exception as e:
+                lines.append("⚠️ Error saving Pokémon data. Catches and streaks may not have been saved.")
+                logging.error(f"Failed to save Pokémon data resolving catches in guild {guild_id}: {e}")
+        shiny_text = " ✨SHINY✨" if shiny else ""
+        if winner:
+            winner_id = str(winner.id)
+            msg = f"✅ {winner.mention} caught **{pokemon}** ({rarity}){shiny_text}!"
+            if streaks[winner_id] >= 3:
+                msg += f" 🔥 {winner.display_name} is on fire with {streaks[winner_id]} catches in a row!"
+            lines.append(msg)
+        elif escaped:
+            lines.append(f"💨 The wild {pokemon} escaped!")
+        if escaped:
+            lines.append(f"💨 It broke free from: {name_list(escaped)}")
+        if too_late:
+            lines.append(f"⏱️ Too slow: {name_list(too_late)}")
+        if wrong:
+            lines.append(f"❌ Wrong Pokémon: {name_list(wrong)}")
+        if winner:
+            user, leveled_up = add_xp(gd, str(winner.id), LEVEL_CONFIG['catch_xp'])
+            if leveled_up and LEVEL_CONFIG.get('announce_levelup', True):
+                lines.append(f"🎉 {winner.mention} leveled up to **Level {user['level']}**!")
+        try:
+            await window.channel.send("\n".join(lines))
+        except Exception as e:
+            logging.error(f"Failed to announce catch results for {pokemon} in guild {guild_id}: {e}")
+    logging.info(f"Resolved catch window for {pokemon} in guild {guild_id}: {len(window.attempts)} attempts, winner {winner.display_name if winner else None}")
+    if winner:
+        try:
+            await update_roles(window.channel.guild)
+        except Exception as e:
+            logging.error(f"Failed to update roles after a catch in guild {guild_id}: {e}")
+
+@commands.command(name="catch")
+async def catch(ctx, *, name: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    guild_id = str(ctx.guild.id) if ctx.guild else None
+    spawn = active_pokemon.get(guild_id)
+    if not spawn:
+        await ctx.send("❌ There is no Pokémon to catch right now!")
+        return
+    # No awaits below: the window lookup and the attempt registration happen atomically on the loop
+    window = catch_windows.get(guild_id)
+    if window is None or window.spawn is not spawn:
+        window = catch_windows[guild_id] = CatchWindow(guild_id, spawn, ctx.channel)
+        delay = guild_setting(guild_id, "catch_windows", CATCH_WINDOW)
+        window.task = track_task(resolve_catch_window(window, delay))
+    user_id = str(ctx.author.id)
+    if user_id not in window.attempts:
+        window.attempts[user_id] = (ctx.author, name.strip().lower() == spawn[0].lower())
+
+@commands.command(name="setcatchwindow")
+@commands.has_permissions(administrator=True)
+async def set_catch_window(ctx, seconds: float):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if not 0 <= seconds <= 30:
+        await ctx.send("❌ Catch window must be between 0 and 30 seconds.")
+        return
+    set_guild_setting(ctx.guild.id, "catch_windows", seconds)
+    await ctx.send(f"✅ Catch attempts will be collected for {seconds:g}s after the first one.")
+    logging.info(f"Catch window set to {seconds}s for guild {ctx.guild.id}")
+
+# Discord embed limits: 1024 chars per field value, 25 fields and 6000 chars per embed
+EMBED_FIELD_LIMIT = 1024
+POKEDEX_FIELDS_PER_PAGE = 6
+POKEDEX_CHARS_PER_PAGE = 5000
+
+def chunk_items(items, limit=EMBED_FIELD_LIMIT, sep=", "):
+    chunks, current, size = [], [], 0
+    for item in items:
+        extra = len(item) + (len(sep) if current else 0)
+        if current and size + extra > limit:
+            chunks.append(sep.join(current))
+            current, size = [], 0
+            extra = len(item)
+        current.append(item)
+        size += extra
+    if current:
+        chunks.append(sep.join(current))
+    return chunks
+
+def pokedex_pages(title, summary: PokedexSummary, footer=""):
+    fields = []
+    for group in POKEDEX_GROUPS:
+        counts = summary.groups[group]
+        if not counts:
+            continue
+        items = [name if n == 1 else f"{name} ×{n}" for name, n in sorted(counts.items())]
+        for i, chunk in enumerate(chunk_items(items)):
+            label = f"{group.capitalize()} ({summary.totals[group]})" if i == 0 else f"{group.capitalize()} (cont.)"
+            fields.append((label, chunk))
+    pages, current, size = [], [], 0
+    for name, value in fields:
+        if current and (len(current) >= POKEDEX_FIELDS_PER_PAGE or size + len(name) + len(value) > POKEDEX_CHARS_PER_PAGE):
+            pages.append(current)
+            current, size = [], 0
+        current.append((name, value))
+        size += len(name) + len(value)
+    if current:
+        pages.append(current)
+    embeds = []
+    for i, page in enumerate(pages, 1):
+        embed = discord.Embed(title=title, color=discord.Color.green())
+        for name, value in page:
+            embed.add_field(name=name, value=value, inline=False)
+        page_text = f"Page {i}/{len(pages)}" if len(pages) > 1 else ""
+        text = " • ".join(t for t in (footer, page_text) if t)
+        if text:
+            embed.set_footer(text=text)
+        embeds.append(embed)
+    return embeds
+
+class EmbedPaginator(discord.ui.View):
+    def __init__(self, pages, author_id, timeout=120):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.author_id = author_id
+        self.index = 0
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author_id
+
+    async def show(self, interaction: discord.Interaction):
+        await interaction.response.edit_message(embed=self.pages[self.index], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = (self.index - 1) % len(self.pages)
+        await self.show(interaction)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index = (self.index + 1) % len(self.pages)
+        await self.show(interaction)
+
+@commands.command(name="pokedex")
+async def pokedex_cmd(ctx, member: discord.Member = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    user = member or ctx.author
+    user_id = str(user.id)
+    gd = get_guild_data(ctx.guild)
+    summary = gd.summary(user_id)
+    if not summary.total():
+        await ctx.send(f"📭 {user.display_name} has not caught any Pokémon yet!")
+        return
+    footer = ""
+    streak_count = gd.streaks.get(user_id, 0)
+    if streak_count > 0:
+        footer = f"🔥 Current streak: {streak_count}"
+    pages = pokedex_pages(f"📘 Pokédex for {user.display_name}", summary, footer)
+    if len(pages) == 1:
+        await ctx.send(embed=pages[0])
+    else:
+        await ctx.send(embed=pages[0], view=EmbedPaginator(pages, ctx.author.id))
+
+# =========================
+# POKÉDEX SEARCH
+# =========================
+# Collection-wide queries run against the guild's OwnershipIndex: filters narrow to a few
+# (species, rarity, shiny) keys first, and pages are rendered only when shown.
+DEXSEARCH_LINES_PER_PAGE = 20
+DEXSEARCH_ITEMS_PER_LINE = 8
+DEXSEARCH_TYPES = {t.lower(): t for stats in POKEMON_STATS.values() for t in stats["types"]}
+DEXSEARCH_USAGE = "Filters: a species, type, rarity, `shiny` or `plain`, `@user` or `mine`, and `missing` to invert."
+USER_MENTION = re.compile(r"<@!?(\d+)>$")
+
+def parse_dexsearch(ctx, query):
+    """Returns ({species, rarity, shiny, type_}, owner_id, missing) or raises ValueError naming the bad word."""
+    filters = {"species": None, "rarity": None, "shiny": None, "type_": None}
+    owner_id, missing = None, False
+    words = query.split()
+    i = 0
+    while i < len(words):
+        word = words[i].lower()
+        pair = f"{word} {words[i + 1].lower()}" if i + 1 < len(words) else None
+        mention = USER_MENTION.match(word)
+        if pair in SPECIES_BY_LOWER:  # "Mr. Mime"
+            filters["species"] = SPECIES_BY_LOWER[pair]
+            i += 1
+        elif word in SPECIES_BY_LOWER:
+            filters["species"] = SPECIES_BY_LOWER[word]
+        elif word in DEXSEARCH_TYPES:
+            filters["type_"] = DEXSEARCH_TYPES[word]
+        elif word in POKEMON_RARITIES:
+            filters["rarity"] = word
+        elif word in ("shiny", "plain"):
+            filters["shiny"] = word == "shiny"
+        elif word in ("mine", "me"):
+            owner_id = str(ctx.author.id)
+        elif mention:
+            owner_id = mention.group(1)
+        elif word in ("missing", "needs"):
+            missing = True
+        else:
+            raise ValueError(words[i])
+        i += 1
+    return filters, owner_id, missing
+
+def describe_filters(species=None, rarity=None, shiny=None, type_=None):
+    words = ["shiny" if shiny else "non-shiny" if shiny is False else "", rarity or "", type_ or "", species or "Pokémon"]
+    return " ".join(w for w in words if w)
+
+def entry_label(key, count):
+    name, _, shiny = key
+    return f"{'✨' if shiny else ''}{name}" + (f" ×{count}" if count > 1 else "")
+
+class SearchPages:
+    """Lazily rendered result pages, indexable like the list EmbedPaginator expects."""
+
+    def __init__(self, title, header, lines):
+        self.title = title
+        self.header = header
+        self.lines = lines
+
+    def __len__(self):
+        return max(1, math.ceil(len(self.lines) / DEXSEARCH_LINES_PER_PAGE))
+
+    def __getitem__(self, index):
+        start = index * DEXSEARCH_LINES_PER_PAGE
+        body = "\n".join(self.lines[start:start + DEXSEARCH_LINES_PER_PAGE])
+        embed = discord.Embed(title=self.title, description=f"{self.header}\n\n{body}", color=discord.Color.green())
+        if len(self) > 1:
+            embed.set_footer(text=f"Page {index + 1}/{len(self)}")
+        return embed
+
+def dexsearch_results(index: OwnershipIndex, filters, owner_id, missing):
+    """(header, lines) for a search; work is proportional to the matching keys and owners."""
+    keys = index.keys(**filters)
+    what = describe_filters(**filters)
+    if missing and owner_id:
+        # Species in the filter the owner has none of, e.g. "missing shiny Electric mine"
+        species, rarity, type_ = filters["species"], filters["rarity"], filters["type_"]
+        owned = {key[0] for _, key, _ in index.owned(keys, owner_id)}
+        lines = [name for name in ALL_GEN1 if name not in owned and (species is None or name == species)
+                 and (rarity is None or SPECIES_RARITY[name] == rarity)
+                 and (type_ is None or type_ in POKEMON_STATS.get(name, {}).get("types", []))]
+        return f"<@{owner_id}> is missing {len(lines)} {what} species.", lines
+    if missing:
+        lacking = index.lacking(keys)
+        return f"{len(lacking)} of {len(index.trainers)} trainers have no {what}.", [f"<@{uid}>" for uid in lacking]
+    rows = index.owned(keys, owner_id)
+    if owner_id:
+        rows.sort(key=lambda row: (POKEDEX_GROUPS.index("shiny" if row[1][2] else row[1][1]), row[1][0]))
+        total = sum(count for _, _, count in rows)
+        return f"<@{owner_id}> owns {total} {what} across {len(rows)} kinds.", [entry_label(key, count) for _, key, count in rows]
+    by_owner = {}
+    for uid, key, count in rows:
+        by_owner.setdefault(uid, []).append((key, count))
+    ranked = sorted(by_owner.items(), key=lambda item: -sum(count for _, count in item[1]))
+    lines = []
+    for uid, owned in ranked:
+        owned.sort(key=lambda item: -item[1])
+        labels = [entry_label(key, count) for key, count in owned[:DEXSEARCH_ITEMS_PER_LINE]]
+        if len(owned) > DEXSEARCH_ITEMS_PER_LINE:
+            labels.append(f"+{len(owned) - DEXSEARCH_ITEMS_PER_LINE} more")
+        lines.append(f"<@{uid}> ({sum(count for _, count in owned)}): {', '.join(labels)}")
+    total = sum(count for _, _, count in rows)
+    return f"{len(ranked)} trainers own {total} {what}.", lines
+
+@commands.command(name="dexsearch")
+async def dexsearch(ctx, *, query: str = ""):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if not query.strip():
+        await ctx.send(f"🔎 Usage: `{get_prefix(bot, ctx.message)}dexsearch <filters>`, e.g. `shiny Mewtwo`, `electric mine`, `missing Ditto`. {DEXSEARCH_USAGE}")
+        return
+    try:
+        filters, owner_id, missing = parse_dexsearch(ctx, query)
+    except ValueError as e:
+        await ctx.send(f"❌ Unknown filter `{e}`. {DEXSEARCH_USAGE}")
+        return
+    index = get_guild_data(ctx.guild).ownership_index()
+    header, lines = dexsearch_results(index, filters, owner_id, missing)
+    if not lines:
+        await ctx.send(f"📭 {header}")
+        return
+    pages = SearchPages(f"🔎 Pokédex search: {query.strip()}", header, lines)
+    if len(pages) == 1:
+        await ctx.send(embed=pages[0])
+    else:
+        await ctx.send(embed=pages[0], view=EmbedPaginator(pages, ctx.author.id))
+
+@commands.command(name="top")
+async def top(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    pokedex = get_guild_data(ctx.guild).pokedex
+    if not pokedex:
+        await ctx.send("📭 No Pokémon have been caught yet!")
+        return
+    leaderboard = []
+    for user_id, mons in pokedex.items():
+        total = len(mons)
+        shiny_count = sum(1 for m in mons if m["shiny"])
+        leaderboard.append((user_id, total, shiny_count))
+    leaderboard.sort(key=lambda x: (x[1], x[2]), reverse=True)
+    embed = discord.Embed(title="🏆 Top Pokémon Trainers", color=discord.Color.gold())
+    for i, (user_id, total, shinies) in enumerate(leaderboard[:10], 1):
+        try:
+            user = await bot.fetch_user(int(user_id))
+            name = user.display_name
+        except Exception:
+            name = f"User {user_id}"
+        embed.add_field(name=f"#{i} {name}", value=f"{total} Pokémon ({shinies} shiny)", inline=False)
+    await ctx.send(embed=embed)
+
+@commands.command(name="battletop")
+async def battletop(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    battle_stats = get_guild_data(ctx.guild).battle_stats
+    if not battle_stats:
+        await ctx.send("📭 No battles have been fought yet!")
+        return
+    leaders = []
+    for uid, stats in battle_stats.items():
+        total = stats["wins"] + stats["losses"]
+        if total > 0:
+            perc = (stats["wins"] / total) * 100
+            leaders.append((uid, perc, stats["wins"]))
+    leaders.sort(key=lambda x: (x[1], x[2]), reverse=True)
+    embed = discord.Embed(title="🏆 Top Battle Trainers (Win %)", color=discord.Color.gold())
+    for i, (uid, perc, wins) in enumerate(leaders[:10], 1):
+        try:
+            user = await bot.fetch_user(int(uid))
+            name = user.display_name
+        except Exception:
+            name = f"User {uid}"
+        embed.add_field(name=f"#{i} {name}", value=f"{perc:.1f}% win rate ({wins} wins)", inline=False)
+    await ctx.send(embed=embed)
+
+# Pokémon Trading
+class TradeOffer:
+    def __init__(self, trade_id, guild_id, initiator_id, target_id, give, want, expires):
+        self.trade_id = trade_id
+        self.guild_id = guild_id
+        self.initiator_id = initiator_id
+        self.target_id = target_id
+        self.give = give  # entries the initiator hands over
+        self.want = want  # entries the initiator asks for in return (may be empty)
+        self.expires = expires
+
+class TradeBook:
+    """Open trade offers indexed by initiator and by target, expired through a heap and capped in size."""
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._offers = {}  # trade_id -> TradeOffer
+        self._by_initiator = {}  # (guild_id, initiator_id) -> trade_id; one open offer per initiator
+        self._by_target = {}  # (guild_id, target_id) -> {trade_id: None}, oldest first
+        self._expiry = []  # heap of (expires, trade_id); removed offers leave stale entries behind
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self._offers)
+
+    def add(self, guild_id, initiator_id, target_id, give, want, now=None):
+        now = time.time() if now is None else now
+        self.expire(now)
+        old_id = self._by_initiator.get((guild_id, initiator_id))
+        if old_id is not None:
+            self.remove(old_id)
+        while len(self._offers) >= self.max_size:
+            self._pop_oldest()
+        offer = TradeOffer(next(self._ids), guild_id, initiator_id, target_id, give, want, now + self.ttl)
+        self._offers[offer.trade_id] = offer
+        self._by_initiator[(guild_id, initiator_id)] = offer.trade_id
+        self._by_target.setdefault((guild_id, target_id), {})[offer.trade_id] = None
+        heapq.heappush(self._expiry, (offer.expires, offer.trade_id))
+        return offer
+
+    def for_target(self, guild_id, target_id, initiator_id=None, now=None):
+        self.expire(now)
+        trade_ids = self._by_target.get((guild_id, target_id), {})
+        for trade_id in reversed(list(trade_ids)):
+            offer = self._offers[trade_id]
+            if initiator_id is None or offer.initiator_id == initiator_id:
+                return offer
+        return None
+
+    def from_initiator(self, guild_id, initiator_id, now=None):
+        self.expire(now)
+        trade_id = self._by_initiator.get((guild_id, initiator_id))
+        return self._offers.get(trade_id) if trade_id is not None else None
+
+    def remove(self, trade_id):
+        offer = self._offers.pop(trade_id, None)
+        if offer is None:
+            return None
+        self._by_initiator.pop((offer.guild_id, offer.initiator_id), None)
+        targets = self._by_target.get((offer.guild_id, offer.target_id))
+        if targets is not None:
+            targets.pop(trade_id, None)
+            if not targets:
+                del self._by_target[(offer.guild_id, offer.target_id)]
+        return offer
+
+    def _pop_oldest(self):
+        while self._expiry:
+            _, trade_id = heapq.heappop(self._expiry)
+            if self.remove(trade_id):
+                return
+
+    def expire(self, now=None):
+        now = time.time() if now is None else now
+        expired = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, trade_id = heapq.heappop(self._expiry)
+            if self.remove(trade_id):
+                expired += 1
+        # Stale heap entries from accepted/cancelled offers are dropped once they outnumber live ones
+        if len(self._expiry) > 2 * len(self._offers) + 64:
+            self._expiry = [(offer.expires, offer.trade_id) for offer in self._offers.values()]
+            heapq.heapify(self._expiry)
+        return expired
+
+trade_book = TradeBook(TRADE_TTL, TRADE_BOOK_MAX)
+
+async def expire_trades():
+    expired = trade_book.expire()
+    if expired:
+        logging.info(f"Expired {expired} trade offers, {len(trade_book)} open")
+
+def pick_entries(entries, names):
+    # Picks one distinct entry per requested name; "shiny <name>" asks for a shiny one.
+    # Returns (picked, None) or (None, name_that_was_missing).
+    picked, used = [], set()
+    for raw in names:
+        want_shiny = raw.lower().startswith("shiny ")
+        name = raw[6:].strip() if want_shiny else raw
+        for i, entry in enumerate(entries):
+            if i not in used and entry["name"].lower() == name.lower() and (entry["shiny"] or not want_shiny):
+                used.add(i)
+                picked.append(dict(entry))
+                break
+        else:
+            return None, raw
+    return picked, None
+
+def describe_entries(entries):
+    if not entries:
+        return "nothing"
+    return ", ".join(f"{'✨' if e['shiny'] else ''}{e['name']}" for e in entries)
+
+@commands.command(name="trade")
+async def trade(ctx, member: discord.Member, *, offer: str):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    user_id = str(ctx.author.id)
+    target_id = str(member.id)
+    if user_id == target_id:
+        await ctx.send("❌ You cannot trade with yourself!")
+        return
+    gd = get_guild_data(ctx.guild)
+    pokedex = gd.pokedex
+    if user_id not in pokedex or target_id not in pokedex:
+        await ctx.send("❌ Both users must have Pokémon in their Pokédex!")
+        return
+    give_text, _, want_text = offer.partition(" for ")
+    give_names = [n.strip() for n in give_text.split(",") if n.strip()]
+    want_names = [n.strip() for n in want_text.split(",") if n.strip()]
+    # The pair's locks span the ownership check, the offer and its announcement, so an accept
+    # between the same two users waits until the offer it answers has actually been posted
+    async with locks.hold(user_lock(gd.guild_id, user_id), user_lock(gd.guild_id, target_id)):
+        give, missing = pick_entries(pokedex.get(user_id, []), give_names)
+        if not give:
+            await ctx.send(f"❌ {ctx.author.display_name} doesn't have {missing or 'that'}!")
+            return
+        want, missing = pick_entries(pokedex.get(target_id, []), want_names)
+        if want is None:
+            await ctx.send(f"❌ {member.display_name} doesn't have {missing}!")
+            return
+        trade_book.add(gd.guild_id, user_id, target_id, give, want)
+        wants = f" for {describe_entries(want)}" if want else ""
+        await ctx.send(f"{member.mention}, {ctx.author.display_name} wants to trade {describe_entries(give)}{wants}! Reply `{get_prefix(bot, ctx.message)}accept` within {TRADE_TTL}s to confirm.")
+    logging.info(f"Trade initiated: {ctx.author.display_name} offers {describe_entries(give)}{wants} to {member.display_name}")
+
+@commands.command(name="accept")
+async def accept_trade(ctx, member: discord.Member = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    user_id = str(ctx.author.id)
+    gd = get_guild_data(ctx.guild)
+    offer = trade_book.for_target(gd.guild_id, user_id, str(member.id) if member else None)
+    if not offer:
+        await ctx.send("❌ No pending trade found for you!")
+        return
+    received = describe_entries(offer.give)
+    returned = f" and gave {describe_entries(offer.want)}" if offer.want else ""
+    # Same pair locks as `trade`: the swap and its confirmation complete before either user's next offer or accept
+    async with locks.hold(user_lock(gd.guild_id, offer.initiator_id), user_lock(gd.guild_id, user_id)):
+        if trade_book.remove(offer.trade_id) is None:
+            await ctx.send("❌ That trade was replaced or cancelled while you were accepting it.")
+            return
+        try:
+            gd.swap_pokemon(offer.initiator_id, offer.give, user_id, offer.want)
+        except ValueError:
+            await ctx.send("❌ Trade cancelled: one of the Pokémon is no longer available.")
+            return
+        except Exception as e:
+            await ctx.send("⚠️ Error saving Pokémon data. Trade was not completed.")
+            logging.error(f"Failed to save Pokémon data in accept_trade: {e}")
+            return
+        await ctx.send(f"✅ Trade complete: {ctx.author.display_name} received {received} from <@{offer.initiator_id}>{returned}!")
+    logging.info(f"Trade completed: {ctx.author.display_name} received {received} from User {offer.initiator_id}{returned}")
+
+@commands.command(name="decline")
+async def decline_trade(ctx, member: discord.Member = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    guild_id = get_guild_data(ctx.guild).guild_id
+    offer = trade_book.for_target(guild_id, str(ctx.author.id), str(member.id) if member else None)
+    if not offer:
+        await ctx.send("❌ No pending trade found for you!")
+        return
+    trade_book.remove(offer.trade_id)
+    await ctx.send(f"🚫 {ctx.author.display_name} declined the trade from <@{offer.initiator_id}>.")
+
+@commands.command(name="canceltrade")
+async def cancel_trade(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    guild_id = get_guild_data(ctx.guild).guild_id
+    offer = trade_book.from_initiator(guild_id, str(ctx.author.id))
+    if not offer:
+        await ctx.send("❌ You have no open trade offer.")
+        return
+    trade_book.remove(offer.trade_id)
+    await ctx.send(f"🚫 {ctx.author.display_name} cancelled their trade offer.")
+
+# Pokémon Battles
+@commands.command(name="battle")
+async def battle(ctx, opponent: discord.Member):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    if opponent.id == ctx.author.id:
+        await ctx.send("❌ You cannot battle yourself!")
+        return
+    user_id = str(ctx.author.id)
+    opp_id = str(opponent.id)
+    gd = get_guild_data(ctx.guild)
+    pokedex, battle_stats = gd.pokedex, gd.battle_stats
+    if user_id not in pokedex or opp_id not in pokedex:
+        await ctx.send("❌ Both users must have Pokémon!")
+        return
+    user_pokemon = random.choice(pokedex[user_id])
+    opp_pokemon = random.choice(pokedex[opp_id])
+    user_pok = POKEMON_STATS[user_pokemon["name"]]
+    opp_pok = POKEMON_STATS[opp_pokemon["name"]]
+    user_eff = get_effectiveness(user_pok["types"][0], opp_pok["types"])
+    opp_eff = get_effectiveness(opp_pok["types"][0], user_pok["types"])
+    user_score = user_pok["bst"] * user_eff * (1.1 if user_pokemon["shiny"] else 1.0)
+    opp_score = opp_pok["bst"] * opp_eff * (1.1 if opp_pokemon["shiny"] else 1.0)
+    if user_score == opp_score:
+        winner = random.choice([ctx.author, opponent])
+    else:
+        prob_user = user_score / (user_score + opp_score)
+        winner = ctx.author if random.random() < prob_user else opponent
+    winner_id = str(winner.id)
+    loser_id = opp_id if winner_id == user_id else user_id
+    battle_stats.setdefault(winner_id, {"wins": 0, "losses": 0})["wins"] += 1
+    battle_stats.setdefault(loser_id, {"wins": 0, "losses": 0})["losses"] += 1
+    gd.save_battle_stats()
+    gd.battle_log.append(BATTLE_KIND_BATTLE, user_id, opp_id, user_pokemon, opp_pokemon, winner_id == user_id)
+    user, leveled_up = add_xp(gd, winner_id, LEVEL_CONFIG.get("battle_win_xp", 25))
+    await ctx.send(f"⚔️ {ctx.author.display_name}'s {user_pokemon['name']} vs {opponent.display_name}'s {opp_pokemon['name']}! **{winner.display_name}** wins!")
+    if leveled_up and LEVEL_CONFIG.get('announce_levelup', True):
+        await ctx.send(f"🎉 {winner.mention} leveled up to **Level {user['level']}**!")
+    logging.info(f"Battle: {ctx.author.display_name} vs {opponent.display_name}, winner: {winner.display_name}")
+
+def longest_run(flags):
+    if not len(flags):
+        return 0
+    padded = np.concatenate(([0], flags.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return int((edges[1::2] - edges[::2]).max()) if len(edges) else 0
+
+def battle_log_stats(cols, user_id=None, min_fights=10):
+    kind = np.asarray(cols["kind"])
+    a, b = np.asarray(cols["user_a"]), np.asarray(cols["user_b"])
+    a_won = np.asarray(cols["a_won"]).astype(bool)
+    result = {"battles": int((kind == BATTLE_KIND_BATTLE).sum()), "duels": int((kind == BATTLE_KIND_DUEL).sum())}
+
+    # Species win rates and matchups (battles only)
+    is_battle = kind == BATTLE_KIND_BATTLE
+    sa, sb, won = cols["species_a"][is_battle].astype(np.int64), cols["species_b"][is_battle].astype(np.int64), a_won[is_battle]
+    winner_species = np.where(won, sa, sb)
+    loser_species = np.where(won, sb, sa)
+    appearances = np.bincount(sa, minlength=256) + np.bincount(sb, minlength=256)
+    wins = np.bincount(winner_species, minlength=256)
+    eligible = np.flatnonzero(appearances[:len(ALL_GEN1)] >= min_fights)
+    rates = wins[eligible] / appearances[eligible]
+    order = np.argsort(-rates)[:5]
+    result["top_species"] = [(ALL_GEN1[eligible[i]], float(rates[i]), int(appearances[eligible[i]])) for i in order]
+    pair_wins = np.bincount(winner_species * 256 + loser_species, minlength=65536).reshape(256, 256)
+    pair_totals = pair_wins + pair_wins.T
+    winners, losers = np.nonzero((pair_totals >= min_fights) & (pair_wins > pair_wins.T))
+    matchup_rates = pair_wins[winners, losers] / pair_totals[winners, losers]
+    order = np.argsort(-matchup_rates)[:5]
+    result["top_matchups"] = [
+        (ALL_GEN1[winners[i]], ALL_GEN1[losers[i]], float(matchup_rates[i]), int(pair_totals[winners[i], losers[i]]))
+        for i in order
+    ]
+
+    # XP farming suspects: user pairs with many fights where one side nearly always wins
+    if len(a):
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        ids, ranks = np.unique(np.concatenate((lo, hi)), return_inverse=True)
+        pair_codes = ranks[:len(a)].astype(np.int64) * len(ids) + ranks[len(a):]
+        codes, inverse, counts = np.unique(pair_codes, return_inverse=True, return_counts=True)
+        lo_wins = np.bincount(inverse, weights=(np.where(a_won, a, b) == lo), minlength=len(codes))
+        share = np.maximum(lo_wins, counts - lo_wins) / counts
+        suspects = np.flatnonzero((counts >= FARMING_MIN_BATTLES) & (share >= 0.9))
+        suspects = suspects[np.argsort(-counts[suspects])][:5]
+        result["farming"] = [
+            (int(ids[codes[i] // len(ids)]), int(ids[codes[i] % len(ids)]), int(counts[i]), float(share[i]))
+            for i in suspects
+        ]
+    else:
+        result["farming"] = []
+
+    if user_id is not None:
+        uid = np.uint64(int(user_id))
+        mine = (a == uid) | (b == uid)
+        my_wins = np.where(a[mine] == uid, a_won[mine], ~a_won[mine])
+        my_species = np.where(a[mine] == uid, cols["species_a"][mine], cols["species_b"][mine])
+        my_species = my_species[my_species != NO_SPECIES]
+        favorite = int(np.bincount(my_species).argmax()) if len(my_species) else None
+        current = len(my_wins) - 1 - np.flatnonzero(~my_wins)[-1] if (~my_wins).any() else len(my_wins)
+        result["user"] = {
+            "fights": int(mine.sum()),
+            "wins": int(my_wins.sum()),
+            "best_streak": longest_run(my_wins),
+            "current_streak": int(current),
+            "favorite": ALL_GEN1[favorite] if favorite is not None else None,
+        }
+    return result
+
+@commands.command(name="battlestats")
+async def battlestats(ctx, member: discord.Member = None):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    gd = get_guild_data(ctx.guild)
+    start = time.perf_counter()
+    stats = await asyncio.to_thread(lambda: battle_log_stats(gd.battle_log.columns(), member.id if member else None))
+    elapsed = (time.perf_counter() - start) * 1000
+    if not stats["battles"] and not stats["duels"]:
+        await ctx.send("📭 No battles have been recorded yet!")
+        return
+    embed = discord.Embed(title="📊 Battle Statistics", color=discord.Color.gold())
+    embed.add_field(name="Fights", value=f"{stats['battles']:,} battles, {stats['duels']:,} duels", inline=False)
+    if member:
+        u = stats["user"]
+        rate = u["wins"] / u["fights"] * 100 if u["fights"] else 0.0
+        embed.add_field(
+            name=f"{member.display_name}",
+            value=f"{u['wins']}/{u['fights']} won ({rate:.1f}%)\nBest streak {u['best_streak']}, current {u['current_streak']}\nFavorite: {u['favorite'] or '—'}",
+            inline=False
+        )
+    top_species = "\n".join(f"{name}: {rate:.0%} of {n}" for name, rate, n in stats["top_species"])
+    embed.add_field(name="Top Species (win %)", value=top_species or "Not enough battles yet", inline=True)
+    matchups = "\n".join(f"{w} > {l}: {rate:.0%} of {n}" for w, l, rate, n in stats["top_matchups"])
+    embed.add_field(name="Most Lopsided Matchups", value=matchups or "Not enough battles yet", inline=True)
+    if stats["farming"] and ctx.author.guild_permissions.administrator:
+        farming = "\n".join(f"<@{x}> vs <@{y}>: {n} fights, {share:.0%} one-sided" for x, y, n, share in stats["farming"])
+        embed.add_field(name="⚠️ Possible XP Farming", value=farming, inline=False)
+    embed.set_footer(text=f"Computed in {elapsed:.0f} ms")
+    await ctx.send(embed=embed)
+
+@commands.command(name="forceroles")
+@commands.has_permissions(administrator=True)
+async def forceroles(ctx):
+    if bot.is_shutdown:
+        await ctx.send("❌ Bot is currently shut down. Use `!restartbot` to restart.")
+        return
+    guild = ctx.guild or bot.get_guild(GUILD_ID)
+    if not guild:
+        await ctx.send("⚠️ Guild not found for role updates.")
+        return
+    await update_roles(guild)
+    await ctx.send("🔄 Roles refreshed.")
+    logging.info("Roles refreshed via !forceroles")
+
+# =========================
+# EXTENSION SETUP
+# =========================
+# Live game state handed to the next version of this module on `reload pokemon`
+HANDOFF_STATE = ["active_pokemon", "catch_windows", "trade_book"]
+
+def schedule_pokemon_jobs():
+    scheduler.add("trade_expiry", expire_trades, interval=30)
+
+async def setup(bot):
+    setup_extension(__name__, globals(), global_jobs=schedule_pokemon_jobs, guild_jobs=schedule_spawns, on_reload=spawn_tables.invalidate,
+                    memory=lambda: {"active spawns": active_pokemon, "catch windows": catch_windows, "pending trades": trade_book, "spawn tables": spawn_tables})
+
+async def teardown(bot):
+    teardown_extension(__name__, globals(), HANDOFF_STATE, job_prefixes=("spawn:", "trade_expiry"))
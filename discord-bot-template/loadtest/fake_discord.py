@@ -0,0 +1,442 @@
+"""Local stand-in for the Discord gateway and REST API, for end-to-end load tests.
+
+Speaks enough of the gateway (HELLO, IDENTIFY, READY, GUILD_CREATE, MESSAGE_CREATE,
+heartbeats) and of REST (users, messages, roles, DMs) for the bot to run against it
+unchanged when started with DISCORD_API_BASE pointing here. REST routes are rate
+limited per bucket and globally and answer with Discord's headers and 429 bodies.
+
+    python -m loadtest.fake_discord --port 8080 --guilds 2 --users 500
+
+Scenario scripts (loadtest/scenarios.py) drive it in-process: FakeDiscord.send_message()
+injects a user message and on_bot_message callbacks observe everything the bot posts.
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from aiohttp import WSMsgType, web
+
+DISCORD_EPOCH = 1420070400000
+API_PREFIX = "/api/v10"
+HEARTBEAT_INTERVAL = 41250  # ms, what Discord sends in HELLO
+
+# (limit, window seconds) per route bucket, close to what Discord applies to bots
+RATE_LIMITS = {
+    "messages": (5, 5.0),       # per channel
+    "message_edit": (5, 5.0),   # per channel
+    "message_delete": (5, 1.0), # per channel
+    "roles": (250, 48 * 3600),  # role creation per guild
+    "role_edit": (10, 10.0),    # per guild
+    "member_roles": (10, 10.0), # per guild
+    "users": (30, 1.0),
+    "default": (50, 1.0),
+}
+GLOBAL_LIMIT = 50  # requests per second across all routes
+
+def json_response(payload, status=200, headers=None):
+    # discord.py only decodes bodies whose content type is exactly application/json (no charset),
+    # and treats a 429 without the proxy's Via header as a Cloudflare ban instead of retrying it
+    return web.Response(body=json.dumps(payload).encode(), status=status,
+                        headers={**(headers or {}), "Content-Type": "application/json", "Via": "1.1 google"})
+
+def iso_now():
+    return datetime.now(timezone.utc).isoformat()
+
+class Snowflakes:
+    def __init__(self):
+        self.counter = itertools.count()
+
+    def next(self):
+        return str(((int(time.time() * 1000) - DISCORD_EPOCH) << 22) | (next(self.counter) & 0x3FFFFF))
+
+class Bucket:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def take(self, now):
+        """Returns seconds to wait, or 0 if the request may go through."""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        if self.remaining <= 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return 0.0
+
+class FakeDiscord:
+    """In-memory guilds, channels, members and roles behind a fake gateway and REST API."""
+
+    def __init__(self, guilds=1, users=100, channels=("general", "pokemon", "commands"), host="127.0.0.1", port=8080,
+                 rate_limits=True):
+        self.host = host
+        self.port = port
+        self.ids = Snowflakes()
+        self.bot_user = self.user(self.ids.next(), "LoadTestBot", bot=True)
+        self.users = {}  # user_id -> user payload
+        self.guilds = {}  # guild_id -> {"guild": payload, "channels": {name: id}}
+        self.channel_guild = {}  # channel_id -> guild_id
+        self.sockets = set()
+        self.seq = 0
+        self.identified = asyncio.Event()
+        self.on_bot_message = []  # callbacks(message payload) for every message the bot posts
+        self.rate_limits = rate_limits  # False serves every request, to measure the bot without Discord's limits
+        self.buckets = {}
+        self.global_bucket = Bucket(GLOBAL_LIMIT, 1.0)
+        self.stats = Counter()  # "REST <route>", "429 <route>", "gateway <event>"
+        self.user_ids = [self.add_user(f"user{i}")["id"] for i in range(users)]
+        for g in range(guilds):
+            self.add_guild(f"Load Test {g + 1}", channels)
+
+    # Payloads
+    @staticmethod
+    def user(user_id, name, bot=False):
+        return {"id": user_id, "username": name, "global_name": name, "discriminator": "0", "avatar": None, "bot": bot, "public_flags": 0}
+
+    def add_user(self, name):
+        user = self.user(self.ids.next(), name)
+        self.users[user["id"]] = user
+        return user
+
+    @staticmethod
+    def member(user, roles=()):
+        return {"user": user, "roles": list(roles), "nick": None, "avatar": None, "joined_at": iso_now(), "deaf": False, "mute": False, "flags": 0, "pending": False}
+
+    @staticmethod
+    def role(role_id, name, position=0, permissions="0", color=0):
+        return {"id": role_id, "name": name, "color": color, "hoist": False, "icon": None, "unicode_emoji": None, "position": position,
+                "permissions": permissions, "managed": False, "mentionable": False, "flags": 0}
+
+    def add_guild(self, name, channel_names):
+        guild_id = self.ids.next()
+        bot_role = self.role(self.ids.next(), "LoadTestBot", position=1, permissions="8")  # administrator
+        channels = {}
+        channel_payloads = []
+        for position, channel_name in enumerate(channel_names):
+            channel_id = self.ids.next()
+            channels[channel_name] = channel_id
+            self.channel_guild[channel_id] = guild_id
+            channel_payloads.append({"id": channel_id, "type": 0, "guild_id": guild_id, "name": channel_name, "position": position,
+                                     "permission_overwrites": [], "nsfw": False, "topic": None, "rate_limit_per_user": 0,
+                                     "parent_id": None, "last_message_id": None})
+        members = [self.member(self.bot_user, [bot_role["id"]])] + [self.member(self.users[user_id]) for user_id in self.user_ids]
+        guild = {
+            "id": guild_id, "name": name, "icon": None, "splash": None, "discovery_splash": None, "owner_id": self.user_ids[0] if self.user_ids else self.bot_user["id"],
+            "afk_channel_id": None, "afk_timeout": 300, "verification_level": 0, "default_message_notifications": 0,
+            "explicit_content_filter": 0, "mfa_level": 0, "premium_tier": 0, "nsfw_level": 0, "system_channel_id": None,
+            "system_channel_flags": 0, "preferred_locale": "en-US", "features": [], "emojis": [], "stickers": [],
+            "roles": [self.role(guild_id, "@everyone", permissions="104324673"), bot_role],
+            "channels": channel_payloads, "threads": [], "members": members, "member_count": len(members),
+            "presences": [], "voice_states": [], "stage_instances": [], "guild_scheduled_events": [],
+            "large": len(members) > 250, "unavailable": False, "joined_at": iso_now(), "premium_subscription_count": 0,
+        }
+        self.guilds[guild_id] = {"guild": guild, "channels": channels, "roles": {role["id"]: role for role in guild["roles"]},
+                                 "members": {member["user"]["id"]: member for member in members}}
+        return guild_id
+
+    def message(self, channel_id, author, content, member=None, embeds=(), reference=None):
+        guild_id = self.channel_guild.get(channel_id)
+        payload = {"id": self.ids.next(), "channel_id": channel_id, "author": author, "content": content, "timestamp": iso_now(),
+                   "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+                   "attachments": [], "embeds": list(embeds), "pinned": False, "type": 0 if reference is None else 19, "flags": 0, "components": []}
+        if guild_id:
+            payload["guild_id"] = guild_id
+            if member is not None:
+                payload["member"] = {key: value for key, value in member.items() if key != "user"}
+        if reference:
+            payload["message_reference"] = reference
+        return payload
+
+    # Gateway
+    async def dispatch(self, event, data):
+        self.seq += 1
+        frame = json.dumps({"op": 0, "t": event, "s": self.seq, "d": data})
+        self.stats[f"gateway {event}"] += 1
+        for ws in list(self.sockets):
+            try:
+                await ws.send_str(frame)
+            except ConnectionError:
+                self.sockets.discard(ws)
+
+    async def gateway(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"op": 10, "d": {"heartbeat_interval": HEARTBEAT_INTERVAL}}))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                frame = json.loads(msg.data)
+                op = frame.get("op")
+                if op == 1:  # HEARTBEAT
+                    await ws.send_str(json.dumps({"op": 11}))
+                elif op in (2, 6):  # IDENTIFY, RESUME: always start a fresh session
+                    self.sockets.add(ws)
+                    await self.send_ready(ws)
+                elif op == 8:  # REQUEST_GUILD_MEMBERS
+                    await self.send_member_chunk(ws, frame["d"])
+                else:
+                    self.stats[f"gateway op {op}"] += 1
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    async def send_ready(self, ws):
+        self.seq += 1
+        ready = {"v": 10, "user": self.bot_user, "guilds": [{"id": guild_id, "unavailable": True} for guild_id in self.guilds],
+                 "session_id": self.ids.next(), "resume_gateway_url": f"ws://{self.host}:{self.port}/gateway",
+                 "application": {"id": self.bot_user["id"], "flags": 0}, "private_channels": [], "relationships": []}
+        await ws.send_str(json.dumps({"op": 0, "t": "READY", "s": self.seq, "d": ready}))
+        for entry in self.guilds.values():
+            self.seq += 1
+            await ws.send_str(json.dumps({"op": 0, "t": "GUILD_CREATE", "s": self.seq, "d": entry["guild"]}))
+        self.identified.set()
+
+    async def send_member_chunk(self, ws, data):
+        entry = self.guilds.get(str(data.get("guild_id")))
+        if entry is None:
+            return
+        self.seq += 1
+        chunk = {"guild_id": entry["guild"]["id"], "members": list(entry["members"].values()), "chunk_index": 0, "chunk_count": 1, "nonce": data.get("nonce")}
+        await ws.send_str(json.dumps({"op": 0, "t": "GUILD_MEMBERS_CHUNK", "s": self.seq, "d": chunk}))
+
+    async def send_message(self, guild_id, channel_name, user_id, content):
+        """Injects a message from a simulated user; returns its payload."""
+        entry = self.guilds[guild_id]
+        member = entry["members"][user_id]
+        payload = self.message(entry["channels"][channel_name], member["user"], content, member=member)
+        for mention in _mentions(content):
+            if mention in entry["members"]:
+                mentioned = entry["members"][mention]
+                payload["mentions"].append({**mentioned["user"], "member": {key: value for key, value in mentioned.items() if key != "user"}})
+        await self.dispatch("MESSAGE_CREATE", payload)
+        return payload
+
+    # REST
+    def rate_limit(self, route, major):
+        if not self.rate_limits:
+            self.stats[f"REST {route}"] += 1
+            return {}
+        now = time.monotonic()
+        limit, window = RATE_LIMITS.get(route, RATE_LIMITS["default"])
+        bucket = self.buckets.get((route, major))
+        if bucket is None:
+            bucket = self.buckets[(route, major)] = Bucket(limit, window)
+        bucket_hash = hashlib.md5(f"{route}:{major}".encode()).hexdigest()[:16]
+        wait = self.global_bucket.take(now)
+        if wait:
+            self.stats[f"429 global {route}"] += 1
+            return json_response({"message": "You are being rate limited.", "retry_after": round(wait, 3), "global": True},
+                                 status=429, headers={"Retry-After": str(round(wait, 3)), "X-RateLimit-Global": "true", "X-RateLimit-Scope": "global"})
+        wait = bucket.take(now)
+        headers = {"X-RateLimit-Limit": str(bucket.limit), "X-RateLimit-Remaining": str(max(bucket.remaining, 0)),
+                   "X-RateLimit-Reset": f"{time.time() + bucket.reset_at - now:.3f}", "X-RateLimit-Reset-After": f"{bucket.reset_at - now:.3f}",
+                   "X-RateLimit-Bucket": bucket_hash}
+        if wait:
+            self.stats[f"429 {route}"] += 1
+            return json_response({"message": "You are being rate limited.", "retry_after": round(wait, 3), "global": False},
+                                 status=429, headers={**headers, "Retry-After": str(round(wait, 3)), "X-RateLimit-Scope": "user"})
+        self.stats[f"REST {route}"] += 1
+        return headers
+
+    @staticmethod
+    async def body(request):
+        if request.content_type.startswith("multipart/"):
+            # Files are read and dropped; only the JSON part matters here
+            payload = {}
+            async for part in await request.multipart():
+                data = await part.read()
+                if part.name == "payload_json":
+                    payload = json.loads(data)
+            return payload
+        if request.can_read_body:
+            return await request.json()
+        return {}
+
+    async def rest(self, request):
+        path = request.match_info["path"]
+        parts = path.strip("/").split("/")
+        method = request.method
+        route, major, handler = self.route(method, parts)
+        limited = self.rate_limit(route, major)
+        if isinstance(limited, web.Response):
+            return limited
+        if handler is None:
+            self.stats[f"REST unknown {method} /{path}"] += 1
+            return json_response({"message": "404: Not Found", "code": 0}, status=404, headers=limited)
+        status, payload = await handler(request, parts)
+        if payload is None:
+            return web.Response(status=status, headers=limited)
+        return json_response(payload, status=status, headers=limited)
+
+    def route(self, method, parts):
+        # Returns (rate limit route, major parameter, handler)
+        if parts[:1] == ["gateway"]:
+            return "default", "", self.get_gateway
+        if parts[:1] == ["users"]:
+            if parts == ["users", "@me", "channels"] and method == "POST":
+                return "default", "", self.create_dm
+            if len(parts) == 2 and method == "GET":
+                return "users", "", self.get_user
+        if parts[-2:] == ["applications", "@me"] and method == "GET":
+            return "default", "", self.get_application
+        if parts[:1] == ["channels"] and len(parts) >= 3 and parts[2] == "messages":
+            channel_id = parts[1]
+            if len(parts) == 3 and method == "POST":
+                return "messages", channel_id, self.create_message
+            if len(parts) == 4 and method == "PATCH":
+                return "message_edit", channel_id, self.edit_message
+            if len(parts) == 4 and method == "DELETE":
+                return "message_delete", channel_id, self.delete_message
+        if parts[:1] == ["guilds"] and len(parts) >= 3:
+            guild_id = parts[1]
+            if parts[2] == "roles" and len(parts) == 3 and method == "POST":
+                return "roles", guild_id, self.create_role
+            if parts[2] == "roles" and len(parts) == 4 and method == "PATCH":
+                return "role_edit", guild_id, self.edit_role
+            if parts[2] == "members" and len(parts) == 6 and parts[4] == "roles" and method in ("PUT", "DELETE"):
+                return "member_roles", guild_id, self.member_role
+        return "default", "", None
+
+    async def get_gateway(self, request, parts):
+        data = {"url": f"ws://{self.host}:{self.port}/gateway"}
+        if parts[-1] == "bot":
+            data.update(shards=1, session_start_limit={"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1})
+        return 200, data
+
+    async def get_user(self, request, parts):
+        user_id = parts[1]
+        if user_id == "@me" or user_id == self.bot_user["id"]:
+            return 200, self.bot_user
+        if user_id in self.users:
+            return 200, self.users[user_id]
+        return 404, {"message": "Unknown User", "code": 10013}
+
+    async def get_application(self, request, parts):
+        owner = self.users[self.user_ids[0]] if self.user_ids else self.bot_user
+        return 200, {"id": self.bot_user["id"], "name": self.bot_user["username"], "icon": None, "description": "", "bot_public": True,
+                     "bot_require_code_grant": False, "owner": owner, "verify_key": "", "flags": 0, "team": None}
+
+    async def create_dm(self, request, parts):
+        body = await self.body(request)
+        user = self.users.get(str(body.get("recipient_id")), self.bot_user)
+        return 200, {"id": self.ids.next(), "type": 1, "recipients": [user], "last_message_id": None, "flags": 0}
+
+    async def create_message(self, request, parts):
+        body = await self.body(request)
+        payload = self.message(parts[1], self.bot_user, body.get("content") or "", member=None, embeds=body.get("embeds") or (), reference=body.get("message_reference"))
+        guild_id = self.channel_guild.get(parts[1])
+        if guild_id:
+            payload["member"] = {key: value for key, value in self.guilds[guild_id]["members"][self.bot_user["id"]].items() if key != "user"}
+        for callback in self.on_bot_message:
+            callback(payload)
+        await self.dispatch("MESSAGE_CREATE", payload)
+        return 200, payload
+
+    async def edit_message(self, request, parts):
+        body = await self.body(request)
+        payload = self.message(parts[1], self.bot_user, body.get("content") or "", embeds=body.get("embeds") or ())
+        payload["id"] = parts[3]
+        payload["edited_timestamp"] = iso_now()
+        return 200, payload
+
+    async def delete_message(self, request, parts):
+        return 204, None
+
+    async def create_role(self, request, parts):
+        body = await self.body(request)
+        entry = self.guilds.get(parts[1])
+        if entry is None:
+            return 404, {"message": "Unknown Guild", "code": 10004}
+        role = self.role(self.ids.next(), body.get("name", "new role"), position=len(entry["roles"]), permissions=str(body.get("permissions", "0")), color=body.get("color", 0))
+        entry["roles"][role["id"]] = role
+        await self.dispatch("GUILD_ROLE_CREATE", {"guild_id": parts[1], "role": role})
+        return 200, role
+
+    async def edit_role(self, request, parts):
+        body = await self.body(request)
+        entry = self.guilds.get(parts[1])
+        role = entry and entry["roles"].get(parts[3])
+        if role is None:
+            return 404, {"message": "Unknown Role", "code": 10011}
+        role.update({key: value for key, value in body.items() if key in role})
+        await self.dispatch("GUILD_ROLE_UPDATE", {"guild_id": parts[1], "role": role})
+        return 200, role
+
+    async def member_role(self, request, parts):
+        entry = self.guilds.get(parts[1])
+        member = entry and entry["members"].get(parts[3])
+        if member is None or parts[5] not in entry["roles"]:
+            return 404, {"message": "Unknown Member", "code": 10007}
+        roles = [role_id for role_id in member["roles"] if role_id != parts[5]]
+        if request.method == "PUT":
+            roles.append(parts[5])
+        member["roles"] = roles
+        await self.dispatch("GUILD_MEMBER_UPDATE", {"guild_id": parts[1], **member})
+        return 204, None
+
+    # Server
+    def app(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/gateway", self.gateway)
+        app.router.add_route("*", API_PREFIX + "/{path:.*}", self.rest)
+        return app
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+        logging.info(f"Fake Discord listening on http://{self.host}:{self.port} ({len(self.guilds)} guilds, {len(self.users)} users)")
+        return f"http://{self.host}:{self.port}"
+
+    async def stop(self):
+        for ws in list(self.sockets):
+            await ws.close()
+        await self.runner.cleanup()
+
+def _mentions(content):
+    mentions = []
+    for token in content.split():
+        if token.startswith("<@") and token.endswith(">"):
+            mentions.append(token.strip("<@!>"))
+    return mentions
+
+async def serve(args):
+    fake = FakeDiscord(guilds=args.guilds, users=args.users, host=args.host, port=args.port,
+                       rate_limits=not args.no_rate_limits)
+    base = await fake.start()
+    for guild_id, entry in fake.guilds.items():
+        print(f"guild {guild_id}: " + ", ".join(f"#{name}={channel_id}" for name, channel_id in entry["channels"].items()))
+    print(f"Start the bot with DISCORD_API_BASE={base} DISCORD_TOKEN=anything")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local fake Discord gateway and REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--guilds", type=int, default=1)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--no-rate-limits", action="store_true", help="never answer 429")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
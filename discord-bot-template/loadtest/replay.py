@@ -0,0 +1,226 @@
+"""Replay a recorded event trace (`trace on` / TRACE_EVENTS=1) against the fake Discord.
+
+Rebuilds the trace's guilds, channels and users in loadtest/fake_discord.py, runs bot.py on a
+scratch data volume and feeds the recorded messages back at 1x, Nx or maximum speed. The replay
+bot records its own trace, from which per-command latency (message received to handler done) is
+reported next to what production saw for the same commands.
+
+    python -m loadtest.replay traces/20250101-120000.ndjson --speed 4
+    python -m loadtest.replay trace.ndjson --max --from 3600 --to 3900
+"""
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from .fake_discord import FakeDiscord
+from .scenarios import CHAT_WORDS, SPAWN_PATTERN, bot_rss_mb, percentile, prepare_volume, start_bot, wait_until_serving
+
+MENTION = re.compile(r"<(@&|@|#)(\d+)>")
+PROBE_GUILD = 0  # The readiness probe's guild is the first the replay bot sees, so it is guild 0 in the replay trace
+
+def read_trace(path, start_s=0.0, end_s=None):
+    """Returns (guild rows, message rows, command rows); message times are shifted to start at the window."""
+    guilds, messages, commands = {}, [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a torn last line from a crash
+            t, kind = row[0], row[1]
+            if kind == "guild":
+                guilds[row[2]] = row
+            elif t < start_s * 1000 or (end_s is not None and t >= end_s * 1000):
+                continue
+            elif kind == "m":
+                messages.append(row)
+            elif kind == "c":
+                commands.append(row)
+    offset = messages[0][0] if messages else 0
+    for row in messages:
+        row[0] -= offset
+    return guilds, messages, commands
+
+class Replay:
+    def __init__(self, guilds, messages, port=0, rate_limits=True):
+        self.messages = messages
+        self.spawns = {}  # fake guild id -> name of the Pokémon the bot last spawned
+        self.bot_messages = 0
+        channels = defaultdict(set)  # trace guild -> trace channels
+        users = set()
+        for _, _, g, c, u, data in messages:
+            channels[g].add(c)
+            users.add(u)
+            if isinstance(data, str):
+                users.update(int(n) for sigil, n in MENTION.findall(data) if sigil == "@")
+        for g, row in guilds.items():
+            if row[3] is not None:
+                channels[g].add(row[3])
+        self.fake = FakeDiscord(guilds=0, users=max(users, default=0) + 1, port=port, rate_limits=rate_limits)
+        self.fake.on_bot_message.append(self.observe)
+        self.probe_guild = self.fake.add_guild("Replay Probe", ["commands"])
+        self.guild_ids = {}  # trace guild -> fake guild id
+        self.channel_ids = {}  # trace channel -> (fake guild id, channel name, fake channel id)
+        for g in sorted(channels):
+            guild_id = self.fake.add_guild(f"Trace Guild {g}", [f"c{c}" for c in sorted(channels[g])])
+            self.guild_ids[g] = guild_id
+            for c in channels[g]:
+                self.channel_ids[c] = (guild_id, f"c{c}", self.fake.guilds[guild_id]["channels"][f"c{c}"])
+        self.spawn_channels = {g: row[3] for g, row in guilds.items() if row[3] is not None and g in self.guild_ids}
+        self.spawn_minutes = {g: row[5] for g, row in guilds.items() if g in self.guild_ids}
+
+    def config(self, speed, spawn_seconds):
+        # Spawns keep their recorded cadence relative to the replayed traffic
+        config = {"prefixes": {}, "spawn_channels": {}, "spawn_intervals": {}}
+        for g, c in self.spawn_channels.items():
+            guild_id = self.guild_ids[g]
+            config["spawn_channels"][guild_id] = int(self.channel_ids[c][2])
+            config["spawn_intervals"][guild_id] = spawn_seconds / 60 if speed is None else self.spawn_minutes[g] / speed
+        return config
+
+    def observe(self, message):
+        self.bot_messages += 1
+        match = SPAWN_PATTERN.search(message.get("content", ""))
+        if match:
+            self.spawns[message.get("guild_id")] = match.group(1)
+
+    def content(self, guild_id, data):
+        if isinstance(data, int):
+            text = ""
+            while len(text) < data:
+                text += random.choice(CHAT_WORDS) + " "
+            return text[:data]
+
+        def remap(match):
+            sigil, n = match.group(1), int(match.group(2))
+            if sigil == "@":
+                return f"<@{self.fake.user_ids[n]}>"
+            if sigil == "#" and n in self.channel_ids:
+                return f"<#{self.channel_ids[n][2]}>"
+            return "_"
+
+        content = MENTION.sub(remap, data)
+        words = content.split()
+        if words and words[0] == "!catch" and guild_id in self.spawns:
+            # Spawns differ from production, so catches aim at whatever is out now
+            return f"!catch {self.spawns[guild_id]}"
+        return content
+
+    async def run(self, speed):
+        start = time.perf_counter()
+        for t, _, _, c, u, data in self.messages:
+            if speed is not None:
+                delay = start + t / 1000 / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            guild_id, channel_name, _ = self.channel_ids[c]
+            await self.fake.send_message(guild_id, channel_name, self.fake.user_ids[u], self.content(guild_id, data))
+        return time.perf_counter() - start
+
+def command_latencies(rows, skip_guild=None):
+    # command -> (runs, failures, [ms from message received to handler done])
+    stats = defaultdict(lambda: [0, 0, []])
+    for row in rows:
+        if row[2] == skip_guild:
+            continue
+        name, ok, total_ms, run_ms = row[5]
+        entry = stats[name]
+        entry[0] += 1
+        entry[1] += 0 if ok else 1
+        entry[2].append(total_ms if total_ms is not None else run_ms)
+    return stats
+
+def report(args, replay, recorded, replayed, elapsed, rss):
+    sent = len(replay.messages)
+    speed = "max speed" if args.max else f"{args.speed:g}x"
+    span = replay.messages[-1][0] / 1000 if replay.messages else 0
+    print(f"\n== replay {os.path.basename(args.trace)}: {sent} events over {span:.0f}s at {speed}, took {elapsed:.1f}s ==")
+    print(f"  events sent      {sent} ({sent / max(elapsed, 1e-9):.0f}/s)")
+    print(f"  bot messages     {replay.bot_messages}")
+    print(f"  bot RSS          {rss:.0f} MB")
+    rest = sum(count for key, count in replay.fake.stats.items() if key.startswith("REST "))
+    limited = sum(count for key, count in replay.fake.stats.items() if key.startswith("429 "))
+    print(f"  REST requests    {rest}, 429 responses {limited}")
+    print("\n  latency, message received to handler done (ms)")
+    print(f"    {'command':<16} {'prod n':>7} {'p50':>7} {'p99':>7}   {'replay n':>8} {'failed':>6} {'p50':>7} {'p90':>7} {'p99':>7} {'max':>7}")
+    for name in sorted(set(recorded) | set(replayed), key=lambda n: -replayed.get(n, recorded.get(n))[0]):
+        prod = recorded.get(name, [0, 0, []])
+        new = replayed.get(name, [0, 0, []])
+        print(f"    {name:<16} {prod[0]:>7} {percentile(prod[2], 50):7.1f} {percentile(prod[2], 99):7.1f}   "
+              f"{new[0]:>8} {new[1]:>6} " + " ".join(f"{percentile(new[2], p):7.1f}" for p in (50, 90, 99)) + f" {max(new[2], default=0):7.1f}")
+
+async def run(args):
+    guilds, messages, recorded_rows = read_trace(args.trace, args.start, args.end)
+    if not messages:
+        print(f"No messages in {args.trace} for that window", file=sys.stderr)
+        return 1
+    replay = Replay(guilds, messages, port=args.port, rate_limits=not args.no_rate_limits)
+    speed = None if args.max else args.speed
+    base = await replay.fake.start()
+    root = args.data_dir or tempfile.mkdtemp(prefix="rainbot-replay-")
+    volume = os.path.join(root, "data")
+    prepare_volume(volume, replay.config(speed, args.spawn_seconds), args.memes, args.jokes)
+    log_file = os.path.join(root, "bot.log")
+    bot = await start_bot(base, volume, log_file, replay.probe_guild, extra_env={"TRACE_EVENTS": "1"})
+    try:
+        if not await wait_until_serving(replay.fake, args.startup_timeout, replay.probe_guild):
+            print(f"Bot did not answer within {args.startup_timeout}s, see {log_file}", file=sys.stderr)
+            return 1
+        replay.bot_messages = 0
+        elapsed = await replay.run(speed)
+        await asyncio.sleep(args.drain)  # let queued commands finish before the bot flushes its trace
+        rss = bot_rss_mb(bot.pid)
+    finally:
+        if bot.returncode is None:
+            bot.send_signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(bot.wait(), 30)
+            except asyncio.TimeoutError:
+                bot.kill()
+        await replay.fake.stop()
+    replayed_rows = []
+    for path in sorted(glob.glob(os.path.join(volume, "traces", "*.ndjson"))):
+        replayed_rows.extend(read_trace(path)[2])
+    report(args, replay, command_latencies(recorded_rows), command_latencies(replayed_rows, skip_guild=PROBE_GUILD), elapsed, rss)
+    if not args.data_dir and not args.keep:
+        shutil.rmtree(root, ignore_errors=True)
+    elif args.keep:
+        print(f"Data volume, replay trace and log kept at {root}")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded event trace against the bot on a fake Discord")
+    parser.add_argument("trace", help="trace file from the volume's traces/ directory")
+    pace = parser.add_mutually_exclusive_group()
+    pace.add_argument("--speed", type=float, default=1.0, help="replay N times faster than recorded")
+    pace.add_argument("--max", action="store_true", help="send events as fast as possible")
+    parser.add_argument("--from", dest="start", type=float, default=0.0, help="start at this many seconds into the trace")
+    parser.add_argument("--to", dest="end", type=float, help="stop at this many seconds into the trace")
+    parser.add_argument("--spawn-seconds", type=float, default=10, help="seconds between spawns per guild with --max")
+    parser.add_argument("--memes", type=int, default=1000)
+    parser.add_argument("--jokes", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=0, help="fake Discord port (0 picks a free one)")
+    parser.add_argument("--no-rate-limits", action="store_true", help="never answer 429, so latency is the bot's own")
+    parser.add_argument("--data-dir", help="directory for the data volume (data/) and bot.log instead of a temporary one")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary data volume, replay trace and log")
+    parser.add_argument("--drain", type=float, default=5, help="seconds to wait for commands to finish after the last event")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    args = parser.parse_args(argv)
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""End-to-end load scenarios: the real bot against the fake Discord on one machine.
+
+Starts loadtest/fake_discord.py in-process, launches bot.py as a subprocess pointed
+at it (DISCORD_API_BASE) with a scratch data volume, then has simulated users chat,
+catch, battle, duel and use fun commands at a fixed event rate. Prints throughput,
+REST and 429 counts, bot memory and per-command latency to the bot's first reply.
+
+    python -m loadtest.scenarios mixed --users 2000 --rate 200 --duration 60
+    python -m loadtest.scenarios catch --users 5000 --rate 500 --spawn-seconds 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import re
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from collections import defaultdict, deque
+
+from .fake_discord import FakeDiscord
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPAWN_PATTERN = re.compile(r"A wild \*\*(.+?)\*\*")
+CHAT_WORDS = "pokemon catch battle gg nice shiny rare legendary trade level meme lol wow again".split()
+
+# action -> weight per scenario
+SCENARIOS = {
+    "chat": {"chat": 1},
+    "catch": {"catch": 8, "chat": 2},
+    "battle": {"battle": 5, "duel": 4, "chat": 1},
+    "fun": {"meme": 4, "joke": 4, "level": 1, "chat": 1},
+    "mixed": {"chat": 60, "catch": 15, "battle": 6, "duel": 6, "meme": 4, "joke": 4, "level": 4, "leaderboard": 1},
+}
+# Actions whose reply is timed, and the channel they are sent in
+TIMED_ACTIONS = {"battle": "commands", "duel": "commands", "meme": "commands", "joke": "commands", "level": "commands", "leaderboard": "commands"}
+
+class Scenario:
+    def __init__(self, fake, weights):
+        self.fake = fake
+        self.actions = list(weights)
+        self.weights = list(weights.values())
+        self.spawns = {}  # guild_id -> name of the Pokémon the bot last spawned
+        self.pending = defaultdict(deque)  # channel_id -> deque of (action, sent at)
+        self.latencies = defaultdict(list)  # action -> seconds to the bot's first reply
+        self.sent = defaultdict(int)
+        self.bot_messages = 0
+        fake.on_bot_message.append(self.observe)
+
+    def observe(self, message):
+        self.bot_messages += 1
+        match = SPAWN_PATTERN.search(message.get("content", ""))
+        if match:
+            self.spawns[message.get("guild_id")] = match.group(1)
+            return
+        queue = self.pending.get(message["channel_id"])
+        if queue:
+            action, sent_at = queue.popleft()
+            self.latencies[action].append(time.perf_counter() - sent_at)
+
+    def content(self, action, guild_id, user_id):
+        if action == "chat":
+            return " ".join(random.choices(CHAT_WORDS, k=random.randint(3, 12)))
+        if action == "catch":
+            return f"!catch {self.spawns.get(guild_id) or 'Pikachu'}"
+        if action in ("battle", "duel"):
+            opponent = random.choice(self.fake.user_ids)
+            while opponent == user_id and len(self.fake.user_ids) > 1:
+                opponent = random.choice(self.fake.user_ids)
+            return f"!{action} <@{opponent}>"
+        return f"!{action}"
+
+    async def send(self, action):
+        guild_id = random.choice(list(self.fake.guilds))
+        user_id = random.choice(self.fake.user_ids)
+        channel = TIMED_ACTIONS.get(action, "pokemon" if action == "catch" else "general")
+        content = self.content(action, guild_id, user_id)
+        if action in TIMED_ACTIONS:
+            self.pending[self.fake.guilds[guild_id]["channels"][channel]].append((action, time.perf_counter()))
+        await self.fake.send_message(guild_id, channel, user_id, content)
+        self.sent[action] += 1
+
+    async def run(self, rate, duration):
+        # Fixed-rate open loop: events go out on schedule whether or not the bot keeps up
+        start = time.perf_counter()
+        interval = 1.0 / rate
+        n = 0
+        while time.perf_counter() - start < duration:
+            await self.send(random.choices(self.actions, self.weights)[0])
+            n += 1
+            delay = start + n * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return time.perf_counter() - start
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def bot_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def spawn_config(fake, spawn_seconds):
+    config = {"prefixes": {}, "spawn_channels": {}, "spawn_intervals": {}}
+    for guild_id, entry in fake.guilds.items():
+        config["spawn_channels"][guild_id] = int(entry["channels"]["pokemon"])
+        config["spawn_intervals"][guild_id] = spawn_seconds / 60
+    return config
+
+def prepare_volume(path, config, memes, jokes):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "config.json"), "w") as f:
+        json.dump(config, f)
+    with open(os.path.join(path, "memes.json"), "w") as f:
+        json.dump([{"title": f"Meme {i}", "url": f"https://example.invalid/meme/{i}.png"} for i in range(memes)], f)
+    with open(os.path.join(path, "jokes.json"), "w") as f:
+        json.dump([{"setup": f"Joke {i}?", "punchline": "Load test."} for i in range(jokes)], f)
+
+async def start_bot(base, volume, log_file, guild_id, extra_env=None):
+    env = {
+        **os.environ,
+        "DISCORD_TOKEN": "load-test-token",
+        "DISCORD_API_BASE": base,
+        "VOLUME_PATH": volume,
+        "GUILD_ID": guild_id,
+        "LOG_FILE": log_file,
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "MEME_CHECK_INTERVAL": "0",
+        "SNAPSHOT_INTERVAL": "100000",
+        **(extra_env or {}),
+    }
+    # Run next to the scratch volume so the bot doesn't pick up a local .env or seed files
+    return await asyncio.create_subprocess_exec(sys.executable, os.path.join(BOT_DIR, "bot.py"), cwd=os.path.dirname(volume), env=env,
+                                                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+
+async def wait_until_serving(fake, timeout, guild_id=None, channel="commands"):
+    # The bot is ready once a probe command gets an answer
+    guild_id = guild_id or next(iter(fake.guilds))
+    channel_id = fake.guilds[guild_id]["channels"][channel]
+    answered = asyncio.Event()
+
+    def observe(message):
+        if message["channel_id"] == channel_id:
+            answered.set()
+
+    fake.on_bot_message.append(observe)
+    try:
+        deadline = time.monotonic() + timeout
+        await asyncio.wait_for(fake.identified.wait(), timeout)
+        while time.monotonic() < deadline:
+            await fake.send_message(guild_id, channel, fake.user_ids[0], "!level")
+            try:
+                await asyncio.wait_for(answered.wait(), 1.0)
+                return True
+            except asyncio.TimeoutError:
+                pass
+        return False
+    finally:
+        fake.on_bot_message.remove(observe)
+
+def report(args, scenario, fake, elapsed, rss):
+    sent = sum(scenario.sent.values())
+    print(f"\n== {args.scenario}: {args.users} users, {args.guilds} guilds, {elapsed:.1f}s ==")
+    print(f"  events sent      {sent} ({sent / elapsed:.0f}/s, target {args.rate}/s)")
+    print(f"  bot messages     {scenario.bot_messages} ({scenario.bot_messages / elapsed:.1f}/s)")
+    print(f"  bot RSS          {rss:.0f} MB")
+    rest = sum(count for key, count in fake.stats.items() if key.startswith("REST "))
+    limited = sum(count for key, count in fake.stats.items() if key.startswith("429 "))
+    print(f"  REST requests    {rest}, 429 responses {limited}")
+    for key, count in sorted(fake.stats.items()):
+        if key.startswith(("REST ", "429 ")):
+            print(f"    {key:<32} {count}")
+    print("\n  latency to first reply (ms)   sent  replied     p50     p90     p99     max")
+    for action in sorted(scenario.sent):
+        values = scenario.latencies.get(action, [])
+        if action not in TIMED_ACTIONS:
+            print(f"    {action:<26} {scenario.sent[action]:>6}        -")
+            continue
+        print(f"    {action:<26} {scenario.sent[action]:>6} {len(values):>8} " + " ".join(
+            f"{percentile(values, p) * 1000:7.1f}" for p in (50, 90, 99)) + f" {max(values, default=0) * 1000:7.1f}")
+
+async def run(args):
+    fake = FakeDiscord(guilds=args.guilds, users=args.users, port=args.port, rate_limits=not args.no_rate_limits)
+    base = await fake.start()
+    scenario = Scenario(fake, SCENARIOS[args.scenario])
+    root = args.data_dir or tempfile.mkdtemp(prefix="rainbot-loadtest-")
+    volume = os.path.join(root, "data")
+    prepare_volume(volume, spawn_config(fake, args.spawn_seconds), args.memes, args.jokes)
+    log_file = os.path.join(root, "bot.log")
+    bot = await start_bot(base, volume, log_file, next(iter(fake.guilds)))
+    try:
+        if not await wait_until_serving(fake, args.startup_timeout):
+            print(f"Bot did not answer within {args.startup_timeout}s, see {log_file}", file=sys.stderr)
+            return 1
+        scenario.bot_messages = 0
+        elapsed = await scenario.run(args.rate, args.duration)
+        await asyncio.sleep(args.drain)  # let queued replies arrive before reporting
+        report(args, scenario, fake, elapsed, bot_rss_mb(bot.pid))
+        return 0
+    finally:
+        if bot.returncode is None:
+            bot.send_signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(bot.wait(), 30)
+            except asyncio.TimeoutError:
+                bot.kill()
+        await fake.stop()
+        if not args.data_dir and not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+        elif args.keep:
+            print(f"Data volume and log kept at {root}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the bot against a fake Discord under simulated load")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--guilds", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=100, help="user events per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--spawn-seconds", type=float, default=10, help="seconds between Pokémon spawns per guild")
+    parser.add_argument("--memes", type=int, default=1000)
+    parser.add_argument("--jokes", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=0, help="fake Discord port (0 picks a free one)")
+    parser.add_argument("--no-rate-limits", action="store_true", help="never answer 429, so latency is the bot's own")
+    parser.add_argument("--data-dir", help="directory for the data volume (data/) and bot.log instead of a temporary one")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary data volume and log")
+    parser.add_argument("--drain", type=float, default=5, help="seconds to wait for replies after the load stops")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+# core reads its configuration and prepares the data volume at import time,
+# so point it at a scratch volume and log file before any test imports it.
+SCRATCH = tempfile.mkdtemp(prefix="rainbot-tests-")
+atexit.register(shutil.rmtree, SCRATCH, ignore_errors=True)
+os.environ["VOLUME_PATH"] = os.path.join(SCRATCH, "data")
+os.environ["LOG_FILE"] = os.path.join(SCRATCH, "bot.log")
+os.environ.setdefault("DISCORD_TOKEN", "test-token")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+import io
+import json
+import random
+
+import pytest
+
+import analytics
+
+def sketch_of(values):
+    sketch = analytics.Sketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+def test_sketch_keeps_one_apart_from_zero():
+    assert sketch_of([1, 1, 1, 2]).percentile(50) == 1.0
+    assert sketch_of([0, 0, 1]).percentile(50) == 0.0
+    assert sketch_of([0, 0, 1]).percentile(100) == 1.0
+
+def test_sketch_percentiles_within_relative_error():
+    rng = random.Random(5)
+    values = [rng.randint(1, 10000) for _ in range(5000)]
+    sketch = sketch_of(values)
+    ordered = sorted(values)
+    for p in analytics.PERCENTILES:
+        exact = ordered[int(p / 100 * (len(ordered) - 1))]
+        assert sketch.percentile(p) == pytest.approx(exact, rel=0.021)
+    assert sketch.mean() == pytest.approx(sum(values) / len(values))
+
+def test_sketch_merge_matches_single_sketch():
+    values = [0, 1, 1, 3, 7, 0, 250, 1, 12]
+    merged = sketch_of(values[:4])
+    merged.merge(sketch_of(values[4:]))
+    whole = sketch_of(values)
+    assert (merged.count, merged.zero_count, merged.min, merged.max) == (whole.count, whole.zero_count, whole.min, whole.max)
+    assert [merged.percentile(p) for p in (10, 50, 90)] == [whole.percentile(p) for p in (10, 50, 90)]
+
+def test_empty_sketch():
+    assert analytics.Sketch().percentile(50) == 0.0
+    assert analytics.Sketch().mean() == 0.0
+
+DOCUMENT = {
+    "pokedex": {
+        "1": [{"name": "Pikachu", "rarity": "uncommon", "shiny": False}],
+        "22": [],
+        "333": [{"name": "Mr. Mime", "rarity": "uncommon", "shiny": True}, {"name": "Ditto", "rarity": "rare", "shiny": False}],
+        "we\"ird\\key": [{"name": "Farfetch'd", "rarity": "uncommon", "shiny": False}],
+    },
+    "streaks": {"1": 12345, "22": 0, "333": 7},
+}
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 64, 1 << 16])
+def test_json_stream_across_chunk_boundaries(monkeypatch, chunk_size):
+    monkeypatch.setattr(analytics, "CHUNK_SIZE", chunk_size)
+    text = json.dumps(DOCUMENT, indent=1)
+    assert list(analytics.JsonStream(io.StringIO(text)).items(("pokedex",))) == list(DOCUMENT["pokedex"].items())
+    assert dict(analytics.JsonStream(io.StringIO(text)).items(("streaks",))) == DOCUMENT["streaks"]
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 4, 1 << 16])
+def test_json_stream_number_at_chunk_end(monkeypatch, chunk_size):
+    # With 4-char chunks "1234" fills a chunk exactly and its number continues in the next one
+    monkeypatch.setattr(analytics, "CHUNK_SIZE", chunk_size)
+    text = '{"a":12345678,"b":9}'
+    assert dict(analytics.JsonStream(io.StringIO(text)).items()) == {"a": 12345678, "b": 9}
+    assert dict(analytics.JsonStream(io.StringIO('{"a":42}')).items()) == {"a": 42}
+
+@pytest.mark.parametrize("chunk_size", [1, 1 << 16])
+def test_json_stream_empty_objects(monkeypatch, chunk_size):
+    monkeypatch.setattr(analytics, "CHUNK_SIZE", chunk_size)
+    assert list(analytics.JsonStream(io.StringIO("{}")).items()) == []
+    assert list(analytics.JsonStream(io.StringIO(' { "pokedex" : { } } ')).items(("pokedex",))) == []
+    assert list(analytics.JsonStream(io.StringIO('{"streaks": {"1": 2}}')).items(("pokedex",))) == []
+    assert dict(analytics.JsonStream(io.StringIO('{"x": {}, "y": []}')).items()) == {"x": {}, "y": []}
+
+def test_json_stream_rejects_truncated_input():
+    with pytest.raises(ValueError):
+        list(analytics.JsonStream(io.StringIO('{"a": 1, ')).items())
@@ -0,0 +1,51 @@
+import os
+
+import core
+from extensions import pokemon
+
+PIKACHU = {"name": "Pikachu", "rarity": "uncommon", "shiny": False}
+ONIX = {"name": "Onix", "rarity": "uncommon", "shiny": True}
+MEW = {"name": "Mew", "rarity": "legendary", "shiny": False}
+
+def log_of(tmp_path, fights):
+    log = core.BattleLog(str(tmp_path / "battles"))
+    for fight in fights:
+        log.append(*fight)
+    return log
+
+def test_species_rates_matchups_and_user_streaks(tmp_path):
+    fights = (
+        [(core.BATTLE_KIND_BATTLE, 1, 2, PIKACHU, ONIX, True)] * 8
+        + [(core.BATTLE_KIND_BATTLE, 2, 1, ONIX, PIKACHU, True)] * 2
+        + [(core.BATTLE_KIND_BATTLE, 3, 1, MEW, PIKACHU, False)]
+        + [(core.BATTLE_KIND_DUEL, 1, 3, None, None, False)] * 2
+    )
+    stats = pokemon.battle_log_stats(log_of(tmp_path, fights).columns(), user_id=1, min_fights=10)
+    assert (stats["battles"], stats["duels"]) == (11, 2)
+    assert stats["top_species"] == [("Pikachu", 9 / 11, 11), ("Onix", 2 / 10, 10)]
+    assert stats["top_matchups"] == [("Pikachu", "Onix", 0.8, 10)]
+    assert stats["user"] == {"fights": 13, "wins": 9, "best_streak": 8, "current_streak": 0, "favorite": "Pikachu"}
+
+def test_farming_pairs_are_flagged_regardless_of_side(tmp_path, monkeypatch):
+    monkeypatch.setattr(pokemon, "FARMING_MIN_BATTLES", 5)
+    fights = (
+        [(core.BATTLE_KIND_DUEL, 7, 8, None, None, True)] * 3
+        + [(core.BATTLE_KIND_DUEL, 8, 7, None, None, False)] * 3
+        + [(core.BATTLE_KIND_DUEL, 5, 6, None, None, i % 2 == 0) for i in range(6)]
+    )
+    stats = pokemon.battle_log_stats(log_of(tmp_path, fights).columns())
+    assert stats["farming"] == [(7, 8, 6, 1.0)]
+    assert "user" not in stats
+
+def test_empty_log_and_torn_rows(tmp_path):
+    log = log_of(tmp_path, [])
+    stats = pokemon.battle_log_stats(log.columns(), user_id=1)
+    assert stats["battles"] == stats["duels"] == 0 and stats["farming"] == []
+    assert stats["user"]["fights"] == 0 and stats["user"]["favorite"] is None
+    log.append(core.BATTLE_KIND_DUEL, 1, 2, None, None, True)
+    log.append(core.BATTLE_KIND_DUEL, 1, 2, None, None, True)
+    # A crash mid-append leaves the last column a row short; only whole rows are read
+    last = log.column_path(list(core.BATTLE_LOG_COLUMNS)[-1])
+    with open(last, "r+b") as f:
+        f.truncate(os.path.getsize(last) - 1)
+    assert len(log.columns()["ts"]) == 1
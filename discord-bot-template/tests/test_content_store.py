@@ -0,0 +1,59 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import core
+
+def write_ndjson(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+@pytest.fixture
+def store(tmp_path):
+    return core.ContentStore(str(tmp_path / "memes.ndjson"), label="memes")
+
+def test_offsets_skip_blank_lines_and_the_missing_final_newline(store):
+    records = [{"url": "a"}, {"url": "bé"}, {"url": "c"}]
+    write_ndjson(store.path, [json.dumps(records[0]) + "\n", "\n", json.dumps(records[1], ensure_ascii=False) + "\n\n", json.dumps(records[2])])
+    assert store.load() == (0, 3)
+    assert [store.get(i) for i in range(len(store))] == records
+
+@pytest.mark.parametrize("chunk", [1, 3, 64 << 20])
+def test_index_matches_across_scan_chunks(monkeypatch, store, chunk):
+    monkeypatch.setattr(core, "INDEX_CHUNK", chunk)
+    lines = [json.dumps({"joke": "x" * i}) + "\n" for i in range(40)]
+    write_ndjson(store.path, lines)
+    store.load()
+    assert store.data[1].tolist() == np.cumsum([0] + [len(line) for line in lines[:-1]]).tolist()
+
+def test_index_is_cached_and_invalidated_on_change(store):
+    write_ndjson(store.path, ['{"n": 1}\n', '{"n": 2}\n'])
+    store.load()
+    assert os.path.exists(store.index_path)
+    assert store.load() is None
+    reloaded = core.ContentStore(store.path, label="memes")
+    reloaded.load()
+    assert reloaded.load_index(reloaded.stamp[:2]).tolist() == [0, 9]
+    write_ndjson(store.path, ['{"n": 1}\n', '{"n": 2}\n', '{"n": 3}\n'])
+    os.utime(store.path, ns=(0, 1))
+    assert store.load() == (2, 3)
+    assert store.get(2) == {"n": 3}
+
+def test_pick_skips_unreadable_and_rejected_records(store):
+    write_ndjson(store.path, ['{"n": 1}\n', "not json\n", '{"n": 2}\n', '{"n": 3}\n'])
+    store.load()
+    picked = [store.pick("guild", accept=lambda item: item["n"] != 2) for _ in range(4)]
+    assert sorted(item["n"] for item in picked if item) == [1, 1, 3, 3]
+
+def test_legacy_json_is_converted(tmp_path):
+    legacy = tmp_path / "memes.json"
+    legacy.write_text(json.dumps([{"url": "a"}, {"url": "b"}]), encoding="utf-8")
+    store = core.ContentStore(str(tmp_path / "memes.ndjson"), str(legacy), "memes")
+    assert store.load() == (0, 2)
+    assert store.get(1) == {"url": "b"}
+
+def test_empty_store(store):
+    assert store.load() == (0, 0)
+    assert store.pick("guild") is None
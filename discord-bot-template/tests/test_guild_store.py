@@ -0,0 +1,20 @@
+import core
+
+def test_lru_eviction_saves_and_skips_pinned_guilds():
+    store = core.GuildStore(ttl=3600, max_guilds=1)
+    with store.pinned("101") as gd:
+        gd.levels["7"] = {"xp": 40, "level": 1}
+        store.get("102")  # over capacity, but the only candidate is pinned
+        assert store.peek("101") is gd
+        assert len(store) == 2
+    store.get("103")
+    assert store.peek("101") is None and store.peek("102") is None
+    assert core.GuildData("101").levels["7"] == {"xp": 40, "level": 1}
+
+def test_idle_eviction_skips_pinned_guilds():
+    store = core.GuildStore(ttl=0, max_guilds=10)
+    store.get("201")
+    with store.pinned("202") as gd:
+        assert store.evict_idle() == ["201"]
+        assert store.peek("202") is gd
+    assert store.evict_idle() == ["202"]
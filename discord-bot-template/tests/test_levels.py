@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+import numpy as np
+
+import core
+
+def test_level_curve_lookups_agree_with_thresholds():
+    curve = core.LevelCurve("quadratic", 25)
+    assert curve.xp_for(3) == 225
+    assert [curve.level_for(xp) for xp in (0, 24, 25, 99, 100, 224, 225)] == [0, 0, 1, 1, 2, 2, 3]
+    xp = np.array([0, 24, 25, 99, 100, 224, 225, 10 ** 12])
+    assert curve.levels_for(xp).tolist() == [curve.level_for(int(value)) for value in xp]
+    assert curve.level_for(10 ** 12) == core.MAX_LEVEL
+    assert curve.xp_for(core.MAX_LEVEL + 5) == curve.xp_for(core.MAX_LEVEL)
+
+def test_configure_rebuilds_in_place():
+    curve = core.LevelCurve("quadratic", 25)
+    curve.configure("linear", 10)
+    assert (curve.name, curve.base) == ("linear", 10)
+    assert curve.level_for(35) == 3 and curve.levels_for(np.array([35])).tolist() == [3]
+
+def test_recompute_levels_counts_and_applies():
+    levels = {"1": {"xp": 100, "level": 2}, "2": {"xp": 100, "level": 0}, "3": {"xp": 0, "level": 4}}
+    curve = core.LevelCurve("linear", 25)
+    assert core.recompute_levels(levels, curve, apply=False) == (3, 2, 1)
+    assert [user["level"] for user in levels.values()] == [2, 0, 4]
+    assert core.recompute_levels(levels, curve) == (3, 2, 1)
+    assert [user["level"] for user in levels.values()] == [4, 4, 0]
+    assert core.recompute_levels(levels, curve) == (3, 0, 0)
+    assert core.recompute_levels({}, curve) == (0, 0, 0)
+
+def test_recompute_all_levels_covers_resident_and_on_disk_guilds():
+    curve = core.LevelCurve("linear", 10)
+    on_disk = core.GuildData("301")
+    on_disk.levels["1"] = {"xp": 50, "level": 0}
+    on_disk.save_levels()
+    resident = core.guild_store.get("302")
+    resident.levels["2"] = {"xp": 30, "level": 9}
+    assert core.guild_store.peek("301") is None
+
+    totals = asyncio.run(core.recompute_all_levels(curve))
+    assert totals[1] >= 1 and totals[2] >= 1
+    assert core.guild_store.peek("301") is None
+    assert core.GuildData("301").levels["1"] == {"xp": 50, "level": 5}
+    assert resident.levels["2"] == {"xp": 30, "level": 3}
+    assert core.GuildData("302").levels["2"] == {"xp": 30, "level": 3}
+    assert os.path.exists(os.path.join(core.GUILDS_PATH, "301", os.path.basename(core.LEVELS_FILE)))
+
+def test_bulk_xp_grant_revoke_and_multiply():
+    curve = core.level_curve
+    gd = core.GuildData("311")
+    gd.levels["1"] = {"xp": curve.xp_for(2), "level": 2}
+    assert core.bulk_xp(gd, ["1", "2"], "grant", curve.xp_for(3)) == (2, 2, 0)
+    assert gd.levels["2"] == {"xp": curve.xp_for(3), "level": 3}
+    # Revoking more than a user has floors at zero; unknown users are skipped rather than created
+    assert core.bulk_xp(gd, ["1", "2", "9"], "revoke", curve.xp_for(3)) == (2, 0, 2)
+    assert gd.levels["1"] == {"xp": curve.xp_for(2), "level": 2}
+    assert gd.levels["2"] == {"xp": 0, "level": 0}
+    assert "9" not in gd.levels
+    assert core.bulk_xp(gd, ["1"], "multiply", 4) == (1, 1, 0)
+    assert gd.levels["1"] == {"xp": curve.xp_for(2) * 4, "level": curve.level_for(curve.xp_for(2) * 4)}
+    assert core.GuildData("311").levels == gd.levels
+    assert core.bulk_xp(gd, ["nobody"], "revoke", 5) == (0, 0, 0)
+
+def test_add_xp_applies_the_guild_multiplier(monkeypatch):
+    gd = core.GuildData("312")
+    monkeypatch.setitem(core.xp_multipliers, "312", 2.5)
+    user, _ = core.add_xp(gd, "1", 10)
+    assert user["xp"] == 25 and user["level"] == core.level_curve.level_for(25)
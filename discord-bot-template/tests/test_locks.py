@@ -0,0 +1,95 @@
+import asyncio
+
+import core
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+def test_same_user_waits_and_is_counted_as_contended():
+    locks = core.KeyedLocks()
+    key = core.user_lock(1, 2)
+    order = []
+
+    async def first(release):
+        async with locks.hold(key):
+            order.append("first in")
+            await release.wait()
+            order.append("first out")
+
+    async def second():
+        async with locks.hold(key):
+            order.append("second in")
+
+    async def main():
+        release = asyncio.Event()
+        a = asyncio.create_task(first(release))
+        await asyncio.sleep(0)
+        b = asyncio.create_task(second())
+        await asyncio.sleep(0.01)
+        assert order == ["first in"]
+        release.set()
+        await asyncio.gather(a, b)
+
+    run(main())
+    assert order == ["first in", "first out", "second in"]
+    assert locks.stats["user"]["acquired"] == 2
+    assert locks.stats["user"]["contended"] == 1
+    assert locks.live() == 0
+
+def test_unrelated_users_never_wait():
+    locks = core.KeyedLocks()
+
+    async def main():
+        release = asyncio.Event()
+
+        async def holder():
+            async with locks.hold(core.user_lock(1, 2)):
+                await release.wait()
+
+        task = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        async with locks.hold(core.user_lock(1, 3), core.spawn_lock(1)):
+            pass
+        release.set()
+        await task
+
+    run(main())
+    assert all(stats["contended"] == 0 for stats in locks.stats.values())
+
+def test_two_party_acquisition_is_ordered():
+    # Opposite argument order would deadlock without sorted acquisition
+    locks = core.KeyedLocks()
+    a, b = core.user_lock(1, 2), core.user_lock(1, 3)
+
+    async def pair(first, second):
+        async with locks.hold(first, second):
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(pair(a, b) if i % 2 else pair(b, a) for i in range(6)))
+
+    run(main())
+    assert locks.live() == 0
+
+def test_cancelled_waiter_drops_its_reference():
+    locks = core.KeyedLocks()
+    key = core.spawn_lock(1)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def holder():
+            async with locks.hold(key):
+                await release.wait()
+
+        task = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(locks.hold(key).__aenter__())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        release.set()
+        await task
+
+    run(main())
+    assert locks.live() == 0
@@ -0,0 +1,40 @@
+import logging
+
+import pytest
+
+import core
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(core.time, "monotonic", lambda: now[0])
+    return now
+
+def record(lineno=10, level=logging.INFO, msg="joined %s"):
+    return logging.LogRecord("bot", level, "core.py", lineno, msg, ("guild",), None)
+
+def test_burst_then_one_in_sample_every(clock):
+    limit = core.CallSiteRateLimit(rate=1, burst=3, sample_every=4)
+    records = [record() for _ in range(11)]
+    passed = [r for r in records if limit.filter(r)]
+    # 3 from the burst, then every 4th of the rest carries the count of what it stood in for
+    assert len(passed) == 5
+    assert [r.getMessage() for r in passed[3:]] == ["joined guild [3 similar suppressed]"] * 2
+
+def test_tokens_refill_with_time(clock):
+    limit = core.CallSiteRateLimit(rate=2, burst=2, sample_every=100)
+    assert [limit.filter(record()) for _ in range(3)] == [True, True, False]
+    clock[0] += 0.5
+    passed = record()
+    assert limit.filter(passed) and passed.getMessage() == "joined guild [1 similar suppressed]"
+    assert not limit.filter(record())
+    clock[0] += 60
+    # The bucket never holds more than the burst
+    assert [limit.filter(record()) for _ in range(3)] == [True, True, False]
+
+def test_call_sites_and_warnings_are_independent(clock):
+    limit = core.CallSiteRateLimit(rate=1, burst=1, sample_every=100)
+    assert limit.filter(record(lineno=10))
+    assert not limit.filter(record(lineno=10))
+    assert limit.filter(record(lineno=11))
+    assert all(limit.filter(record(lineno=10, level=logging.WARNING)) for _ in range(5))
@@ -0,0 +1,50 @@
+import core
+
+PIKACHU = {"name": "Pikachu", "rarity": "uncommon", "shiny": False}
+SHINY_PIKACHU = {"name": "Pikachu", "rarity": "uncommon", "shiny": True}
+CHARIZARD = {"name": "Charizard", "rarity": "rare", "shiny": False}
+PIDGEY = {"name": "Pidgey", "rarity": "common", "shiny": False}
+
+def snapshot(index):
+    return index.postings, index.facets, index.trainers
+
+def assert_index_matches_pokedex(gd):
+    assert snapshot(gd.ownership_index()) == snapshot(core.OwnershipIndex(gd.pokedex))
+
+def test_filters_intersect_facets():
+    index = core.OwnershipIndex({"a": [PIKACHU, PIKACHU, CHARIZARD], "b": [SHINY_PIKACHU], "c": [PIDGEY]})
+    assert sorted(index.keys(species="Pikachu")) == [("Pikachu", "uncommon", False), ("Pikachu", "uncommon", True)]
+    assert index.keys(species="Pikachu", shiny=True) == [("Pikachu", "uncommon", True)]
+    assert index.keys(type_="Flying", rarity="rare") == [("Charizard", "rare", False)]
+    assert index.keys(type_="Flying", rarity="common") == [("Pidgey", "common", False)]
+    assert index.keys(species="Mew") == []
+    assert index.owned(index.keys(species="Pikachu", shiny=False)) == [("a", ("Pikachu", "uncommon", False), 2)]
+    assert index.owned(index.keys(species="Pikachu"), user_id="b") == [("b", ("Pikachu", "uncommon", True), 1)]
+    assert index.lacking(index.keys(species="Pikachu")) == ["c"]
+    assert index.trainers == {"a": 3, "b": 1, "c": 1}
+
+def test_index_follows_catch_swap_and_release():
+    gd = core.GuildData("451")
+    gd.add_pokemon("a", PIKACHU)
+    gd.add_pokemon("b", CHARIZARD)
+    gd.ownership_index()
+    gd.add_pokemon("a", SHINY_PIKACHU)
+    gd.add_pokemon("c", PIDGEY)
+    assert_index_matches_pokedex(gd)
+    gd.swap_pokemon("a", [PIKACHU], "b", [CHARIZARD])
+    assert gd.ownership_index().owned([("Charizard", "rare", False)]) == [("a", ("Charizard", "rare", False), 1)]
+    assert_index_matches_pokedex(gd)
+    gd.remove_pokemon("c", PIDGEY)
+    assert ("type", "Flying") in gd.ownership_index().facets  # Charizard still files under Flying
+    assert ("species", "Pidgey") not in gd.ownership_index().facets
+    assert "c" not in gd.ownership_index().trainers
+    assert_index_matches_pokedex(gd)
+    gd.replace_pokemon("a", [PIDGEY, PIDGEY])
+    gd.replace_pokemon("b", None)
+    assert_index_matches_pokedex(gd)
+    assert gd.ownership_index().trainers == {"a": 2}
+
+def test_removing_an_unindexed_entry_is_a_no_op():
+    index = core.OwnershipIndex({"a": [PIKACHU]})
+    index.remove("a", CHARIZARD)
+    assert snapshot(index) == snapshot(core.OwnershipIndex({"a": [PIKACHU]}))
@@ -0,0 +1,49 @@
+import pytest
+
+import core
+
+PIKACHU = {"name": "Pikachu", "rarity": "uncommon", "shiny": False}
+SHINY_PIKACHU = {"name": "Pikachu", "rarity": "uncommon", "shiny": True}
+MEWTWO = {"name": "Mewtwo", "rarity": "legendary", "shiny": False}
+PIDGEY = {"name": "Pidgey", "rarity": "common", "shiny": False}
+
+def snapshot(summary):
+    return summary.groups, summary.totals
+
+def assert_summaries_match_pokedex(gd):
+    for user_id, summary in gd.summaries.items():
+        assert snapshot(summary) == snapshot(core.PokedexSummary(gd.pokedex.get(user_id, [])))
+
+def test_summary_groups_shinies_apart():
+    summary = core.PokedexSummary([PIKACHU, PIKACHU, SHINY_PIKACHU, MEWTWO])
+    assert summary.groups["uncommon"] == {"Pikachu": 2}
+    assert summary.groups["shiny"] == {"Pikachu": 1}
+    assert summary.totals["legendary"] == 1 and summary.total() == 4
+    summary.remove(PIKACHU)
+    summary.remove(PIKACHU)
+    assert summary.groups["uncommon"] == {} and summary.totals["uncommon"] == 0
+
+def test_cached_summaries_follow_catch_swap_and_release():
+    gd = core.GuildData("401")
+    gd.add_pokemon("a", PIKACHU)
+    gd.add_pokemon("a", MEWTWO)
+    gd.add_pokemon("b", PIDGEY)
+    gd.summary("a"), gd.summary("b")
+    gd.add_pokemon("a", SHINY_PIKACHU)
+    assert_summaries_match_pokedex(gd)
+    gd.swap_pokemon("a", [MEWTWO], "b", [PIDGEY])
+    assert gd.summary("a").groups["common"] == {"Pidgey": 1}
+    assert_summaries_match_pokedex(gd)
+    gd.remove_pokemon("a", PIKACHU)
+    assert_summaries_match_pokedex(gd)
+    gd.replace_pokemon("b", None)
+    assert gd.summary("b").total() == 0
+    assert_summaries_match_pokedex(gd)
+
+def test_failed_swap_leaves_summaries_untouched():
+    gd = core.GuildData("402")
+    gd.add_pokemon("a", PIKACHU)
+    before = snapshot(gd.summary("a"))
+    with pytest.raises(ValueError):
+        gd.swap_pokemon("a", [MEWTWO], "b", [])
+    assert snapshot(gd.summary("a")) == before and gd.pokedex["a"] == [PIKACHU]
@@ -0,0 +1,59 @@
+import pytest
+
+import core
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core.time, "monotonic", clock)
+    return clock
+
+def test_burst_then_refill_one_interval_at_a_time(clock):
+    limiter = core.RateLimiter()
+    # meme defaults to 3 uses per 30s: a burst of 3, then one more every 10s
+    assert [limiter.hit(1, 2, "meme") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit(1, 2, "meme") == pytest.approx(10.0)
+    clock.now += 4
+    assert limiter.hit(1, 2, "meme") == pytest.approx(6.0)
+    clock.now += 6
+    assert limiter.hit(1, 2, "meme") == 0.0
+    assert limiter.hit(1, 2, "meme") == pytest.approx(10.0)
+    assert limiter.limited == 3
+
+def test_idle_bucket_refills_to_the_full_burst(clock):
+    limiter = core.RateLimiter()
+    for _ in range(3):
+        limiter.hit(1, 2, "joke")
+    clock.now += 30
+    assert [limiter.hit(1, 2, "joke") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit(1, 2, "joke") > 0
+    clock.now += 3600
+    limiter.sweep()
+    assert limiter.buckets == {}
+
+def test_buckets_are_per_user_and_command(clock):
+    limiter = core.RateLimiter()
+    assert limiter.hit(1, 2, "battle") == limiter.hit(1, 2, "battle") == 0.0
+    assert limiter.hit(1, 2, "battle") > 0
+    assert limiter.hit(1, 3, "battle") == 0.0
+    assert limiter.hit(1, 2, "duel") == 0.0
+    assert limiter.hit(1, 2, "unlimited") == 0.0
+
+def test_guild_overrides_and_disabling(clock):
+    limiter = core.RateLimiter()
+    core.set_rate_limit(501, "meme", (1, 5))
+    try:
+        assert limiter.hit(501, 2, "meme") == 0.0
+        assert limiter.hit(501, 2, "meme") == pytest.approx(5.0)
+        core.set_rate_limit(501, "meme", (0, 5))
+        assert all(limiter.hit(501, 2, "meme") == 0.0 for _ in range(10))
+    finally:
+        core.set_rate_limit(501, "meme", None)
+    assert limiter.rule(501, "meme") == core.DEFAULT_RATE_LIMITS["meme"]
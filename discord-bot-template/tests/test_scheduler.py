@@ -0,0 +1,55 @@
+import pytest
+
+import core
+
+async def noop():
+    pass
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(core.time, "time", lambda: now[0])
+    return now
+
+def test_pop_due_fires_in_order_and_reschedules(tmp_path, clock):
+    scheduler = core.Scheduler(str(tmp_path / "schedule.json"))
+    scheduler.add("slow", noop, interval=60)
+    scheduler.add("fast", noop, interval=10)
+    scheduler.add("later", noop, interval=10, delay=100)
+    assert scheduler.pop_due(clock[0] + 5) == []
+    assert [job.key for job in scheduler.pop_due(clock[0] + 60)] == ["fast", "slow"]
+    # Each job fires once per pop and comes back one interval after the pop
+    assert scheduler.jobs["fast"].next_fire == clock[0] + 70
+    assert [job.key for job in scheduler.pop_due(clock[0] + 100)] == ["fast", "later"]
+
+def test_replaced_and_removed_jobs_leave_only_stale_entries(tmp_path, clock):
+    scheduler = core.Scheduler(str(tmp_path / "schedule.json"))
+    scheduler.add("job", noop, interval=10)
+    scheduler.add("job", noop, interval=50, reset=True)
+    scheduler.add("gone", noop, interval=10)
+    scheduler.remove("gone")
+    assert scheduler.pop_due(clock[0] + 20) == []
+    assert [job.key for job in scheduler.pop_due(clock[0] + 50)] == ["job"]
+
+def test_next_fire_times_survive_a_restart(tmp_path, clock):
+    path = str(tmp_path / "schedule.json")
+    scheduler = core.Scheduler(path)
+    scheduler.add("daily", noop, interval=86400)
+    scheduler.add("kept", noop, interval=600)
+    scheduler.persist()
+
+    restarted = core.Scheduler(path)
+    assert restarted.add("daily", noop, interval=86400).next_fire == clock[0] + 86400
+    assert restarted.add("daily", noop, interval=86400, reset=True).next_fire == clock[0] + 86400
+    # Missed while offline: due as soon as the bot is back
+    clock[0] += 1000
+    assert restarted.add("kept", noop, interval=600).next_fire == clock[0]
+    restarted.remove("daily")
+    restarted.persist()
+    assert set(core.Scheduler(path)._next_fires) == {"kept"}
+
+def test_daily_jobs_fire_at_the_local_time():
+    after = 1_700_000_000  # 2023-11-14 22:13:20 UTC
+    assert core.next_daily_time("23:00", "UTC", after) == 1_700_002_800
+    assert core.next_daily_time("09:00", "UTC", after) == 1_700_038_800
+    assert core.next_daily_time("09:00", "Europe/Berlin", after) == 1_700_035_200
@@ -0,0 +1,19 @@
+import random
+
+import pytest
+
+import core
+
+@pytest.mark.parametrize("n", [1, 2, 3, 5, 16, 17, 1000, 4097])
+def test_every_index_once_per_cycle(n):
+    random.seed(n)
+    bag = core.ShuffleBag(n)
+    for _ in range(3):
+        assert sorted(bag.next() for _ in range(n)) == list(range(n))
+
+def test_cycles_reshuffle():
+    random.seed(7)
+    bag = core.ShuffleBag(200)
+    first = [bag.next() for _ in range(200)]
+    second = [bag.next() for _ in range(200)]
+    assert first != second and first != list(range(200))
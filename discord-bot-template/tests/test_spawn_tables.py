@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from extensions import pokemon
+
+SAMPLES = 200000
+EVENT = {"name": "Legend Week", "start": 0, "end": 4102444800,
+         "rarity_multipliers": {"legendary": 10, "common": 0.5}, "shiny_multiplier": 3.0}
+
+def assert_fits(table, seed):
+    chi2, df, p_value, _ = pokemon.spawn_distribution_check(table, SAMPLES, random.Random(seed))
+    assert p_value >= pokemon.SPAWN_CHECK_ALPHA, f"chi2={chi2:.1f}, df={df}, p={p_value:.3g}"
+
+def test_alias_table_samples_match_weights():
+    alias_table = pokemon.AliasTable(["Pidgey", "Rattata", "Pikachu", "Mewtwo"], [50, 30, 15, 5])
+    assert alias_table.probabilities == pytest.approx([0.5, 0.3, 0.15, 0.05])
+    assert_fits(pokemon.SpawnTable(alias_table, 0.0, {}, []), seed=1)
+
+def test_default_table_keeps_rarity_weights():
+    table = pokemon.compile_spawn_table({}, [])
+    _, _, _, by_rarity = pokemon.spawn_distribution_check(table, 1000, random.Random(2))
+    total = sum(pokemon.SPAWN_WEIGHTS.values())
+    for rarity, weight in pokemon.SPAWN_WEIGHTS.items():
+        assert by_rarity[rarity][1] == pytest.approx(weight / total)
+    assert_fits(table, seed=2)
+
+def test_custom_pool_with_override_and_event():
+    settings = {"pool": ["Pidgey", "Rattata", "Pikachu", "Raichu", "Mewtwo"], "weights": {"Pikachu": 0.5}, "events": [EVENT]}
+    table = pokemon.compile_spawn_table(settings, pokemon.active_spawn_events(settings, 1000))
+    common = pokemon.SPAWN_WEIGHTS["common"] / 2 * 0.5
+    expected = {"Pidgey": common, "Rattata": common, "Pikachu": 0.5,
+                "Raichu": pokemon.SPAWN_WEIGHTS["rare"], "Mewtwo": pokemon.SPAWN_WEIGHTS["legendary"] * 10}
+    total = sum(expected.values())
+    probabilities = dict(zip(table.alias_table.items, table.alias_table.probabilities))
+    assert probabilities == pytest.approx({name: w / total for name, w in expected.items()})
+    assert table.shiny_rate == pytest.approx(min(1.0, pokemon.SHINY_RATE * 3.0))
+    assert table.events == ["Legend Week"]
+    assert_fits(table, seed=3)
+
+def test_check_rejects_a_mismatched_table():
+    # Negative control: samples drawn from one distribution, checked against another
+    table = pokemon.SpawnTable(pokemon.AliasTable(["Pidgey", "Rattata", "Pikachu", "Mewtwo"], [50, 30, 15, 5]), 0.0, {}, [])
+    table.alias_table.probabilities = [0.45, 0.35, 0.15, 0.05]
+    _, _, p_value, _ = pokemon.spawn_distribution_check(table, SAMPLES, random.Random(4))
+    assert p_value < pokemon.SPAWN_CHECK_ALPHA
+
+def test_events_apply_only_inside_their_window():
+    settings = {"events": [dict(EVENT, start=100, end=200)]}
+    assert pokemon.active_spawn_events(settings, 99) == []
+    assert [e["name"] for e in pokemon.active_spawn_events(settings, 150)] == ["Legend Week"]
+    assert pokemon.active_spawn_events(settings, 200) == []
+
+@pytest.mark.parametrize("settings, events", [
+    ({"pool": ["Mewtwo"], "weights": {"Mewtwo": 0}}, []),
+    ({}, [{"name": "Nothing", "start": 0, "end": 1, "rarity_multipliers": dict.fromkeys(pokemon.SPAWN_WEIGHTS, 0)}]),
+])
+def test_zero_weights_raise(settings, events):
+    with pytest.raises(ValueError, match="positive weight"):
+        pokemon.compile_spawn_table(settings, events)
+
+def test_update_rejects_unspawnable_settings():
+    pokemon.update_spawn_settings("900", {"pool": ["Mewtwo"]})
+    with pytest.raises(ValueError):
+        pokemon.update_spawn_settings("900", {"pool": ["Mewtwo"], "weights": {"Mewtwo": 0}})
+    assert pokemon.guild_setting("900", "spawn_tables", {}) == {"pool": ["Mewtwo"]}
+    assert pokemon.spawn_tables.get("900").alias_table.items == ["Mewtwo"]
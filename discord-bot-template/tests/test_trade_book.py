@@ -0,0 +1,52 @@
+from extensions import pokemon
+
+def offer(book, initiator, target, now, guild="1"):
+    return book.add(guild, initiator, target, ["Pikachu"], ["Eevee"], now=now)
+
+def test_offers_expire_after_ttl():
+    book = pokemon.TradeBook(ttl=60, max_size=10)
+    first = offer(book, "a", "b", now=0)
+    offer(book, "c", "b", now=30)
+    assert book.for_target("1", "b", now=59).initiator_id == "c"
+    assert book.for_target("1", "b", "a", now=59) is first
+    assert book.from_initiator("1", "a", now=60) is None
+    assert book.for_target("1", "b", now=60).initiator_id == "c"
+    assert book.expire(now=90) == 1
+    assert book.for_target("1", "b", now=90) is None and len(book) == 0
+
+def test_new_offer_replaces_the_initiators_open_one():
+    book = pokemon.TradeBook(ttl=60, max_size=10)
+    first = offer(book, "a", "b", now=0)
+    second = offer(book, "a", "c", now=1)
+    assert len(book) == 1
+    assert book.from_initiator("1", "a", now=2) is second
+    assert book.for_target("1", "b", now=2) is None
+    assert book.remove(first.trade_id) is None
+    # The replaced offer's heap entry is stale and must not expire the new one
+    assert book.expire(now=60) == 0 and book.from_initiator("1", "a", now=60) is second
+
+def test_offers_are_scoped_per_guild():
+    book = pokemon.TradeBook(ttl=60, max_size=10)
+    offer(book, "a", "b", now=0, guild="1")
+    offer(book, "a", "b", now=0, guild="2")
+    assert len(book) == 2
+    assert book.for_target("2", "b", now=1).guild_id == "2"
+
+def test_size_cap_drops_the_oldest_offer():
+    book = pokemon.TradeBook(ttl=60, max_size=3)
+    for i in range(5):
+        offer(book, f"u{i}", "t", now=i)
+    assert len(book) == 3
+    assert [book.from_initiator("1", f"u{i}", now=5) is not None for i in range(5)] == [False, False, True, True, True]
+
+def test_removed_offers_leave_no_index_entries():
+    book = pokemon.TradeBook(ttl=60, max_size=10)
+    trade = offer(book, "a", "b", now=0)
+    assert book.remove(trade.trade_id) is trade
+    assert book.remove(trade.trade_id) is None
+    assert book._by_initiator == {} and book._by_target == {}
+    # Stale heap entries are compacted once they outnumber the live offers
+    for i in range(200):
+        book.remove(offer(book, "a", "b", now=1).trade_id)
+    book.expire(now=2)
+    assert len(book._expiry) <= 64